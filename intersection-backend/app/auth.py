@@ -1,8 +1,13 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+import hashlib
 import os
+import threading
+import time
 
 from .config import settings
 
@@ -10,29 +15,22 @@ SECRET_KEY = settings.JWT_SECRET or "dev-secret-for-local-testing"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 30
 
-pwd_context = CryptContext(schemes=["argon2", "bcrypt_sha256", "bcrypt"], deprecated="auto")
+def _argon2_settings() -> dict:
+    # 설정값이 없으면 passlib 기본값 (값을 바꾸면 기존 해시는 로그인 시 새 파라미터로 다시 해시됨)
+    options = {}
+    if settings.PASSWORD_ARGON2_TIME_COST is not None:
+        options["argon2__time_cost"] = settings.PASSWORD_ARGON2_TIME_COST
+    if settings.PASSWORD_ARGON2_MEMORY_COST is not None:
+        options["argon2__memory_cost"] = settings.PASSWORD_ARGON2_MEMORY_COST
+    return options
 
-def verify_password(plain_password, hashed_password):
-    if hashed_password is None:
-        return False
-    # bcrypt has a 72-byte input limit — make sure we verify using the same truncation
-    try:
-        if isinstance(plain_password, str):
-            plain_bytes = plain_password.encode("utf-8")
-        else:
-            plain_bytes = bytes(plain_password)
-    except Exception:
-        plain_bytes = str(plain_password).encode("utf-8")
 
-    if len(plain_bytes) > 72:
-        # warn in server logs to help debugging
-        print("[auth.verify_password] plain_password length >72 bytes, truncating for verification")
-        plain_password = plain_bytes[:72].decode("utf-8", errors="ignore")
+pwd_context = CryptContext(schemes=["argon2", "bcrypt_sha256", "bcrypt"], deprecated="auto", **_argon2_settings())
 
-    return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
+def _truncate_password(password, caller: str) -> str:
     # bcrypt backend supports up to 72 bytes of password; truncate to avoid exceptions
+    # (hash / verify must use the same truncation)
     try:
         if isinstance(password, str):
             password_bytes = password.encode("utf-8")
@@ -42,12 +40,29 @@ def get_password_hash(password):
         password_bytes = str(password).encode("utf-8")
 
     if len(password_bytes) > 72:
-        print("[auth.get_password_hash] password length >72 bytes, truncating before hashing")
+        # warn in server logs to help debugging
+        print(f"[auth.{caller}] password length >72 bytes, truncating")
         password_bytes = password_bytes[:72]
 
     # passlib expects str input; decode truncated bytes safely
-    safe_password = password_bytes.decode("utf-8", errors="ignore")
-    return pwd_context.hash(safe_password)
+    return password_bytes.decode("utf-8", errors="ignore")
+
+def verify_password(plain_password, hashed_password):
+    if hashed_password is None:
+        return False
+    return pwd_context.verify(_truncate_password(plain_password, "verify_password"), hashed_password)
+
+def verify_and_update_password(plain_password, hashed_password) -> tuple[bool, Optional[str]]:
+    """
+    비밀번호 확인 + 해시 파라미터/방식이 바뀌었으면 새 해시도 함께 반환 → (일치 여부, 새 해시 또는 None)
+    (pwd_context.needs_update 가 True인 해시만 다시 계산)
+    """
+    if hashed_password is None:
+        return False, None
+    return pwd_context.verify_and_update(_truncate_password(plain_password, "verify_and_update_password"), hashed_password)
+
+def get_password_hash(password):
+    return pwd_context.hash(_truncate_password(password, "get_password_hash"))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -65,3 +80,75 @@ def decode_access_token(token: str):
         return payload
     except JWTError:
         return None
+
+
+# ------------------------------------------------------
+# 검증된 토큰 캐시
+# ------------------------------------------------------
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """검증된 토큰의 주체 (DB 조회 없이 알 수 있는 정보만)"""
+    user_id: int
+    expires_at: float  # 토큰 만료 시각 (epoch 초)
+
+
+class TokenPrincipalCache:
+    """토큰 해시 → TokenPrincipal LRU 캐시 (항목마다 TTL, 토큰 만료 시각 이후에는 사용하지 않음)"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple[TokenPrincipal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes, now: float) -> Optional[TokenPrincipal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, valid_until = entry
+            if now >= valid_until:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, key: bytes, principal: TokenPrincipal, now: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (principal, min(principal.expires_at, now + self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenPrincipalCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def get_token_principal(token: Optional[str]) -> Optional[TokenPrincipal]:
+    """토큰을 검증해 주체를 반환합니다. (유효하지 않으면 None, 검증 결과는 캐시)"""
+    if not token:
+        return None
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    principal = token_cache.get(key, now)
+    if principal is not None:
+        return principal
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    user_id = payload.get("user_id")
+    if not user_id:
+        return None
+    try:
+        principal = TokenPrincipal(user_id=int(user_id), expires_at=float(payload.get("exp") or now + token_cache.ttl))
+    except (TypeError, ValueError):
+        return None
+    token_cache.put(key, principal, now)
+    return principal
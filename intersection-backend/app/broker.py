@@ -0,0 +1,119 @@
+"""
+채팅 이벤트 pub/sub 브로커
+
+uvicorn 워커(또는 서버)가 여러 개일 때, 워커 A에 연결된 사용자가 보낸 메시지를
+워커 B에 연결된 상대방에게도 전달하기 위한 계층입니다.
+각 워커는 시작할 때 브로커를 구독하고, 받은 이벤트를 자기 워커의 WebSocket 연결로 전달합니다.
+
+- memory:   단일 프로세스용 (기본값). publish 즉시 같은 프로세스의 핸들러를 호출
+- postgres: PostgreSQL LISTEN/NOTIFY 사용. 별도 인프라 없이 여러 워커/서버 간 전달
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+
+import psycopg
+
+from .config import settings
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+
+class ChatBroker:
+    """브로커 공통 인터페이스"""
+
+    # 한 번에 보낼 수 있는 이벤트 크기 (None이면 제한 없음)
+    max_payload_bytes: Optional[int] = None
+
+    async def start(self, handler: EventHandler) -> None:
+        raise NotImplementedError
+
+    async def publish(self, event: dict) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class InMemoryBroker(ChatBroker):
+    """같은 프로세스 안에서만 전달하는 브로커"""
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+
+    async def publish(self, event: dict) -> None:
+        if self._handler is not None:
+            await self._handler(event)
+
+
+class PostgresBroker(ChatBroker):
+    """PostgreSQL LISTEN/NOTIFY 기반 브로커"""
+
+    # NOTIFY payload 최대 8000 bytes (여유분 제외)
+    max_payload_bytes = 7900
+
+    def __init__(self, dsn: str, channel: str = "chat_events"):
+        self.dsn = dsn
+        self.channel = channel
+        self._handler: Optional[EventHandler] = None
+        self._listen_conn: Optional[psycopg.AsyncConnection] = None
+        self._publish_conn: Optional[psycopg.AsyncConnection] = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+        self._publish_conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+        await self._connect_listener()
+        self._listen_task = asyncio.create_task(self._listen_forever())
+
+    async def _connect_listener(self) -> None:
+        self._listen_conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+        await self._listen_conn.execute(f"LISTEN {self.channel}")
+
+    async def _listen_forever(self) -> None:
+        while True:
+            try:
+                async for notify in self._listen_conn.notifies():
+                    try:
+                        await self._handler(json.loads(notify.payload))
+                    except Exception as exc:
+                        print(f"[broker.postgres] handler error: {exc}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # DB 재시작/페일오버 등으로 LISTEN 연결이 끊어진 경우 재연결
+                print(f"[broker.postgres] listener disconnected: {exc}, reconnecting")
+                await asyncio.sleep(1)
+                try:
+                    await self._connect_listener()
+                except Exception as reconnect_exc:
+                    print(f"[broker.postgres] reconnect failed: {reconnect_exc}")
+
+    async def publish(self, event: dict) -> None:
+        payload = json.dumps(event, ensure_ascii=False)
+        if self._publish_conn is None or self._publish_conn.closed:
+            self._publish_conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+        await self._publish_conn.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+
+    async def stop(self) -> None:
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.closed:
+                await conn.close()
+
+
+def create_broker() -> ChatBroker:
+    """설정(CHAT_BROKER)에 맞는 브로커 생성"""
+    if settings.CHAT_BROKER == "postgres":
+        # SQLAlchemy URL(postgresql+psycopg://)을 psycopg가 이해하는 형식으로 변환
+        dsn = settings.DATABASE_URL.replace("postgresql+psycopg://", "postgresql://", 1)
+        return PostgresBroker(dsn)
+    return InMemoryBroker()
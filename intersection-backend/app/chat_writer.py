@@ -0,0 +1,128 @@
+"""
+WebSocket 채팅 메시지 배치 저장 (write-behind)
+
+메시지마다 트랜잭션을 여는 대신, 여러 채팅방에서 들어온 메시지를 큐에 모았다가
+배치 크기(CHAT_WRITE_BATCH_SIZE) 또는 대기 시간(CHAT_WRITE_FLUSH_MS)이 차면
+multi-row INSERT 1번 + 채팅방 UPDATE 1번 + 커밋 1번으로 저장합니다.
+보낸 사람은 배치가 커밋된 뒤 메시지 ID가 담긴 응답을 받습니다.
+배치가 실패하면 메시지를 하나씩 다시 저장해, 문제가 있는 메시지를 보낸 사람만 오류를 받습니다.
+"""
+import asyncio
+from typing import Optional
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from .config import settings
+from .db import engine, run_db
+from .models import ChatMessage, get_kst_now
+from .services import record_chat_messages_batch
+
+
+def _write_batch(rows: list[dict], synchronous_commit: bool) -> list[int]:
+    with Session(engine) as session:
+        if not synchronous_commit and engine.dialect.name == "postgresql":
+            # 이 트랜잭션만 WAL flush를 기다리지 않고 커밋
+            session.execute(text("SET LOCAL synchronous_commit = off"))
+        ids = record_chat_messages_batch(session, rows)
+        session.commit()
+        return ids
+
+
+def _write_each(rows: list[dict], synchronous_commit: bool) -> list:
+    """배치가 실패했을 때 메시지마다 따로 저장 → rows 순서대로 메시지 ID 또는 예외"""
+    results = []
+    for row in rows:
+        try:
+            results.append(_write_batch([row], synchronous_commit)[0])
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+class ChatMessageWriter:
+    def __init__(self, batch_size: int, flush_interval: float, synchronous_commit: bool = True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous_commit = synchronous_commit
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """큐에 남은 메시지를 모두 저장한 뒤 종료"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, room_id: int, sender_id: int, content: str) -> ChatMessage:
+        """메시지를 큐에 넣고, 배치가 커밋되면 ID가 채워진 메시지를 반환"""
+        row = {
+            "room_id": room_id,
+            "sender_id": sender_id,
+            "content": content,
+            "is_read": False,
+            "created_at": get_kst_now(),
+        }
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        message_id = await future
+        return ChatMessage(id=message_id, **row)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        rows = [row for row, _ in batch]
+        try:
+            results = await run_db(_write_batch, rows, self.synchronous_commit)
+        except Exception as exc:
+            print(f"[chat_writer] batch of {len(rows)} messages failed, retrying one by one: {exc}")
+            try:
+                results = await run_db(_write_each, rows, self.synchronous_commit)
+            except Exception as retry_exc:
+                # DB 작업 스레드에 넘기지도 못함 (종료 중 등) → 배치 전체 실패
+                results = [retry_exc] * len(rows)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def create_chat_writer() -> Optional[ChatMessageWriter]:
+    """설정(CHAT_WRITE_MODE)이 배치 모드일 때만 writer 생성 (per_message면 None)"""
+    if settings.CHAT_WRITE_MODE not in ("batch", "batch_async"):
+        return None
+    return ChatMessageWriter(
+        batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+        flush_interval=settings.CHAT_WRITE_FLUSH_MS / 1000,
+        synchronous_commit=settings.CHAT_WRITE_MODE == "batch",
+    )
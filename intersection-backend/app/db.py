@@ -1,19 +1,194 @@
-from sqlmodel import create_engine, SQLModel, Session
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event, inspect
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlmodel import create_engine, Session
 from typing import Optional
 from .config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
+
+class PoolMetrics:
+    """커넥션 풀 체크아웃 대기 시간 / 사용량 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.failures = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float, failed: bool = False):
+        with self._lock:
+            if failed:
+                # 풀 대기 시간 초과 또는 새 연결 실패
+                self.failures += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "checkout_failures": self.failures,
+                "invalidations": self.invalidations,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """체크아웃에 걸린 시간(풀 대기 + 새 연결)을 기록하는 QueuePool"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait(time.perf_counter() - start, failed=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
 # Use the sqlite "check_same_thread" arg only for sqlite; Postgres doesn't need it
 connect_args = {}
+engine_options = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+else:
+    engine_options = {
+        "poolclass": MeteredQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER:
+        # PgBouncer transaction pooling: 서버 커넥션이 바뀌므로 prepared statement를 쓰지 않음
+        connect_args["prepare_threshold"] = None
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args, **engine_options)
+
+# 🔎 인덱스 없는 쿼리 점검 (DB_INDEX_AUDIT=warn|error)
+from .index_audit import index_audit  # noqa: E402
+
+index_audit.install(engine)
+
+
+if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS and not DATABASE_URL.startswith("sqlite"):
+    # PgBouncer는 접속 시 options 파라미터를 받지 않으므로 트랜잭션마다 설정
+    @event.listens_for(engine, "begin")
+    def _set_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    # pre-ping 실패, 끊긴 커넥션 감지 등
+    pool_metrics.record_invalidation()
+
+
+def get_pool_status() -> dict:
+    """커넥션 풀 현재 상태 + 누적 통계"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    status.update(pool_metrics.snapshot())
+    return status
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 마이그레이션 도입 전 create_all 로 만든 DB가 해당하는 리비전
+BASELINE_REVISION = "0001"
+# 워커 여러 개가 동시에 시작해도 마이그레이션은 하나만 실행 (PostgreSQL advisory lock 키)
+MIGRATION_LOCK_KEY = 20261017
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    # migrations/env.py 가 새 엔진 대신 이 연결을 사용
+    config.attributes["connection"] = connection
+    return config
 
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    """
+    DB 스키마를 최신 마이그레이션(migrations/)까지 올립니다. (alembic upgrade head)
+    alembic_version 테이블이 없는 기존 DB는 baseline으로 표시한 뒤 이후 마이그레이션만 적용합니다.
+    """
+    if not settings.DB_MIGRATE_ON_STARTUP:
+        return
+    from alembic import command
+
+    # 앱 엔진은 statement_timeout(DB_STATEMENT_TIMEOUT_MS)이 걸려 있어, 인덱스 생성/백필이나
+    # 다른 워커의 마이그레이션을 기다리는 lock 대기가 중간에 끊길 수 있으므로 제한 없는 별도 연결 사용
+    migration_engine = engine
+    if not DATABASE_URL.startswith("sqlite"):
+        migration_connect_args = {"prepare_threshold": None} if settings.DB_PGBOUNCER else {}
+        migration_engine = create_engine(DATABASE_URL, poolclass=NullPool, connect_args=migration_connect_args)
+
+    try:
+        with migration_engine.connect() as connection:
+            locked = connection.dialect.name == "postgresql"
+            if locked:
+                # DB/역할 기본값으로 걸린 제한 시간도 해제
+                connection.exec_driver_sql("SET statement_timeout = 0")
+                connection.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_KEY})")
+            try:
+                tables = inspect(connection).get_table_names()
+                # 마이그레이션이 자체 트랜잭션을 시작하도록 (advisory lock은 세션 단위라 유지됨)
+                connection.commit()
+                config = alembic_config(connection)
+                if "user" in tables and "alembic_version" not in tables:
+                    command.stamp(config, BASELINE_REVISION)
+                command.upgrade(config, "head")
+            finally:
+                if locked:
+                    connection.exec_driver_sql(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_KEY})")
+                    connection.commit()
+    finally:
+        if migration_engine is not engine:
+            migration_engine.dispose()
+
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+# 비동기 핸들러에서 동기 DB 작업을 이벤트 루프 밖에서 실행하기 위한 전용 스레드 풀
+# (워커 수를 제한해 커넥션 풀 대기 없이 DB 작업이 처리되도록 함)
+db_executor = ThreadPoolExecutor(max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 DB 함수를 전용 스레드 풀에서 실행하고 결과를 기다립니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
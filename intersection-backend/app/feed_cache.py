@@ -0,0 +1,248 @@
+"""
+📰 피드 캐시
+
+GET /posts/ 응답(직렬화된 PostRead JSON bytes + 다음 커서)을 (커뮤니티, 커서, limit) 단위로 저장합니다.
+게시글 작성/수정/삭제 시 해당 커뮤니티와 전체 피드의 "세대(generation)" 번호를 올려
+이전 세대의 페이지가 더 이상 조회되지 않게 합니다. (오래된 항목은 LRU/TTL로 정리)
+조회 전에 읽은 세대 번호로 저장하므로, 조회 도중 무효화되면 그 결과는 새 세대에 섞이지 않습니다.
+
+- memory: 프로세스 내 LRU (기본값). 워커가 여러 개면 다른 워커의 무효화는 TTL 후에 반영
+- redis:  Redis 호환 저장소 공유 (워커 간 무효화 즉시 반영, `pip install redis` 필요)
+- off:    캐시 사용 안 함
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .config import settings
+
+# 커뮤니티 구분 없는 전체 피드의 scope
+ALL_POSTS_SCOPE = "all"
+
+
+def feed_scope(community_id: Optional[int]) -> str:
+    return ALL_POSTS_SCOPE if community_id is None else f"community:{community_id}"
+
+
+def post_scopes(community_id: Optional[int]) -> list[str]:
+    """게시글 하나가 바뀌었을 때 무효화할 scope 목록"""
+    scopes = [ALL_POSTS_SCOPE]
+    if community_id is not None:
+        scopes.append(feed_scope(community_id))
+    return scopes
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    body: bytes  # 직렬화된 List[PostRead]
+    next_cursor: Optional[str]
+
+
+class FeedCacheStats:
+    """적중/미스/무효화 누적 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+class FeedCache:
+    """피드 캐시 공통 인터페이스 (캐시 없음 = off)"""
+
+    backend = "off"
+
+    def __init__(self):
+        self.stats = FeedCacheStats()
+
+    def generation(self, scope: str) -> int:
+        """scope의 현재 세대 번호 (get/put 전에 읽어 둠)"""
+        return 0
+
+    def get(self, scope: str, generation: int, page_key: str) -> Optional[FeedPage]:
+        self.stats.record(hit=False)
+        return None
+
+    def put(self, scope: str, generation: int, page_key: str, page: FeedPage) -> None:
+        pass
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        self.stats.record_invalidation()
+
+    def clear(self) -> None:
+        pass
+
+    def status(self) -> dict:
+        return {"backend": self.backend, **self.stats.snapshot()}
+
+
+class InMemoryFeedCache(FeedCache):
+    """(scope, 세대, page_key) → FeedPage LRU 캐시 (항목마다 TTL)"""
+
+    backend = "memory"
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple[str, int, str], tuple[FeedPage, float]]" = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, scope: str) -> int:
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def get(self, scope: str, generation: int, page_key: str) -> Optional[FeedPage]:
+        now = time.monotonic()
+        key = (scope, generation, page_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry[1]:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self.stats.record(hit=entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, scope: str, generation: int, page_key: str, page: FeedPage) -> None:
+        if self.max_size <= 0:
+            return
+        key = (scope, generation, page_key)
+        with self._lock:
+            self._entries[key] = (page, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+        self.stats.record_invalidation()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def status(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {**super().status(), "size": size, "max_size": self.max_size}
+
+
+class RedisFeedCache(FeedCache):
+    """
+    Redis 호환 저장소 기반 캐시
+    세대 번호는 `feed:gen:<scope>` (INCR), 페이지는 `feed:page:<scope>:<세대>:<page_key>` (TTL) 키에 저장합니다.
+    Redis 장애 시에는 캐시 미스로 처리해 DB에서 바로 읽습니다.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "feed"):
+        super().__init__()
+        import redis  # 선택 의존성: redis 모드에서만 필요
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _generation_key(self, scope: str) -> str:
+        return f"{self.prefix}:gen:{scope}"
+
+    def _page_key(self, scope: str, generation: int, page_key: str) -> str:
+        return f"{self.prefix}:page:{scope}:{generation}:{page_key}"
+
+    def generation(self, scope: str) -> int:
+        try:
+            return int(self.client.get(self._generation_key(scope)) or 0)
+        except Exception as exc:
+            print(f"[feed_cache.redis] generation failed: {exc}")
+            self.stats.record_error()
+            # 세대를 알 수 없으면 어떤 페이지와도 겹치지 않는 값 (조회/저장 모두 무의미해짐)
+            return -1
+
+    def get(self, scope: str, generation: int, page_key: str) -> Optional[FeedPage]:
+        value = None
+        try:
+            if generation >= 0:
+                value = self.client.get(self._page_key(scope, generation, page_key))
+        except Exception as exc:
+            print(f"[feed_cache.redis] get failed: {exc}")
+            self.stats.record_error()
+        self.stats.record(hit=value is not None)
+        if value is None:
+            return None
+        # 저장 형식: <다음 커서>\n<본문>
+        next_cursor, body = value.split(b"\n", 1)
+        return FeedPage(body=body, next_cursor=next_cursor.decode() or None)
+
+    def put(self, scope: str, generation: int, page_key: str, page: FeedPage) -> None:
+        if generation < 0:
+            return
+        try:
+            value = (page.next_cursor or "").encode() + b"\n" + page.body
+            self.client.set(self._page_key(scope, generation, page_key), value, ex=max(1, int(self.ttl)))
+        except Exception as exc:
+            print(f"[feed_cache.redis] put failed: {exc}")
+            self.stats.record_error()
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        try:
+            pipeline = self.client.pipeline()
+            for scope in scopes:
+                pipeline.incr(self._generation_key(scope))
+            pipeline.execute()
+        except Exception as exc:
+            print(f"[feed_cache.redis] invalidate failed: {exc}")
+            self.stats.record_error()
+        self.stats.record_invalidation()
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(key)
+
+
+def create_feed_cache() -> FeedCache:
+    """설정(FEED_CACHE)에 맞는 피드 캐시 생성"""
+    if settings.FEED_CACHE == "redis":
+        return RedisFeedCache(settings.FEED_CACHE_REDIS_URL, settings.FEED_CACHE_TTL)
+    if settings.FEED_CACHE == "memory":
+        return InMemoryFeedCache(settings.FEED_CACHE_SIZE, settings.FEED_CACHE_TTL)
+    return FeedCache()
+
+
+feed_cache = create_feed_cache()
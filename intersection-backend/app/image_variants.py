@@ -0,0 +1,252 @@
+"""
+🖼️ 이미지 변형 (썸네일 / WebP 축소본)
+
+새 이미지가 업로드되면 백그라운드 프로세스 풀에서 WebP 변형을 만들어 저장소(app.storage)의 원본 옆에 저장합니다.
+    ab/cd/<해시>.jpg  →  ab/cd/<해시>_thumb.webp (128px 정사각), ab/cd/<해시>_medium.webp (긴 변 1080px)
+완료되면 UploadedFile.variants 에 이름을 기록하고, UserRead / PostRead 는 완료된 변형의 URL만 내려줍니다.
+(업로드 응답은 변형 생성을 기다리지 않음)
+
+- Pillow 선택 의존성: 없으면 변형을 만들지 않고 원본 URL만 사용
+- 대기 작업이 IMAGE_VARIANT_MAX_PENDING 을 넘거나 서버가 재시작되어 빠진 변형은
+  `python -m app.maintenance build-image-variants` 로 채움
+"""
+import importlib.util
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from .config import settings
+from .db import engine
+from .models import UploadedFile
+from .schemas import ImageVariants
+from .storage import storage
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    size: int  # px (crop이면 정사각 한 변, 아니면 긴 변 최대값)
+    crop: bool
+
+
+VARIANTS = {
+    "thumb": VariantSpec(size=128, crop=True),
+    "medium": VariantSpec(size=1080, crop=False),
+}
+
+
+def is_image(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith("image/")
+
+
+def variant_path(path: str, name: str) -> str:
+    """원본 경로 → 같은 폴더의 변형 경로"""
+    base = os.path.splitext(path)[0]
+    return f"{base}_{name}.webp"
+
+
+def render_variants(data: bytes, quality: int) -> dict[str, bytes]:
+    """원본 이미지 바이트 → {변형 이름: WebP 바이트} (프로세스 풀에서 실행)"""
+    from PIL import Image, ImageOps  # 선택 의존성: 변형 생성 프로세스에서만 필요
+
+    rendered = {}
+    with Image.open(io.BytesIO(data)) as original:
+        # 휴대폰 사진의 EXIF 회전 적용 + 투명도 유지
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for name, spec in VARIANTS.items():
+            if spec.crop:
+                variant = ImageOps.fit(image, (spec.size, spec.size), method=Image.Resampling.LANCZOS)
+            else:
+                variant = image.copy()
+                variant.thumbnail((spec.size, spec.size), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            variant.save(out, format="WEBP", quality=quality, method=4)
+            rendered[name] = out.getvalue()
+    return rendered
+
+
+def store_variants(path: str, rendered: dict[str, bytes]) -> list[str]:
+    for name, data in rendered.items():
+        storage.put_bytes(variant_path(path, name), data, "image/webp")
+    return list(rendered)
+
+
+def mark_variants_ready(sha256: str, names: list[str]):
+    with Session(engine) as session:
+        session.execute(
+            update(UploadedFile).where(UploadedFile.sha256 == sha256).values(variants=",".join(names))
+        )
+        session.commit()
+
+
+class ImageVariantWorker:
+    """
+    변형 생성 작업 하나 = 저장소에서 원본 읽기 → 프로세스 풀에서 변환 → 저장소에 쓰기 → 완료 기록
+    저장소 I/O(S3 등)는 작업 스레드에서, CPU를 쓰는 변환만 프로세스 풀에서 실행
+    """
+
+    def __init__(self, workers: int, max_pending: int, quality: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.quality = quality
+        self.enabled = workers > 0 and importlib.util.find_spec("PIL") is not None
+        if workers > 0 and not self.enabled:
+            print("[image_variants] Pillow not installed, image variants disabled")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._closed:
+                # 서버 종료 중에 진행 중이던 작업이 풀을 다시 만들지 않도록
+                raise RuntimeError("image variant worker is shut down")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _build(self, sha256: str, path: str):
+        data = storage.read_bytes(path)
+        rendered = self._get_executor().submit(render_variants, data, self.quality).result()
+        mark_variants_ready(sha256, store_variants(path, rendered))
+
+    def schedule(self, sha256: str, path: str, content_type: Optional[str]) -> bool:
+        """새 업로드의 변형 생성을 예약 (이미지가 아니거나 대기열이 가득 차면 False)"""
+        if not self.enabled or not is_image(content_type):
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            if self._io_executor is None:
+                # 저장소 I/O를 기다리는 동안 다음 변환이 진행되도록 프로세스 수보다 1개 더
+                self._io_executor = ThreadPoolExecutor(max_workers=self.workers + 1, thread_name_prefix="image-variants")
+            future = self._io_executor.submit(self._build, sha256, path)
+        future.add_done_callback(lambda f: self._on_done(f, path))
+        return True
+
+    def _on_done(self, future: Future, path: str):
+        with self._lock:
+            self._pending -= 1
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[image_variants] failed for {path}: {future.exception()}")
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            if self._io_executor is not None:
+                self._io_executor.shutdown(wait=False, cancel_futures=True)
+                self._io_executor = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "workers": self.workers, "pending": self._pending}
+
+
+image_variant_worker = ImageVariantWorker(
+    settings.IMAGE_VARIANT_WORKERS, settings.IMAGE_VARIANT_MAX_PENDING, settings.IMAGE_VARIANT_QUALITY
+)
+
+
+# ------------------------------------------------------
+# 응답용 변형 URL 조회
+# ------------------------------------------------------
+class ImageVariantCache:
+    """원본 URL → ImageVariants LRU 캐시 (완료된 변형만 저장, 완료 후에는 바뀌지 않으므로 TTL 없음)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, ImageVariants]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[ImageVariants]:
+        with self._lock:
+            variants = self._entries.get(url)
+            if variants is not None:
+                self._entries.move_to_end(url)
+            return variants
+
+    def put(self, url: str, variants: ImageVariants):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[url] = variants
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+image_variant_cache = ImageVariantCache(max_size=10000)
+
+
+def get_image_variants(session: Session, urls: Iterable[Optional[str]]) -> dict[str, ImageVariants]:
+    """
+    원본 URL들 → 완료된 변형 URL (쿼리 최대 1번, 캐시에 있으면 0번)
+    업로드 API로 올린 파일이 아니거나 변형이 아직 없으면 결과에서 빠집니다.
+    """
+    result = {}
+    paths = {}
+    for url in urls:
+        if not url or url in result:
+            continue
+        cached = image_variant_cache.get(url)
+        if cached is not None:
+            result[url] = cached
+            continue
+        path = storage.path_from_url(url)
+        if path:
+            paths[path] = url
+    if paths:
+        rows = session.exec(
+            select(UploadedFile.path, UploadedFile.variants)
+            .where(UploadedFile.path.in_(list(paths)), UploadedFile.variants.isnot(None))
+        ).all()
+        for path, names in rows:
+            variants = ImageVariants(**{
+                name: storage.url(variant_path(path, name))
+                for name in names.split(",") if name in VARIANTS
+            })
+            image_variant_cache.put(paths[path], variants)
+            result[paths[path]] = variants
+    return result
+
+
+def build_missing_variants(session: Session) -> dict:
+    """변형이 없는 업로드 이미지의 변형을 이 프로세스에서 바로 생성 (관리 명령용)"""
+    rows = session.exec(
+        select(UploadedFile.sha256, UploadedFile.path)
+        .where(UploadedFile.variants.is_(None), UploadedFile.content_type.startswith("image/"))
+        .order_by(UploadedFile.id)
+    ).all()
+    built = failed = 0
+    for sha256, path in rows:
+        try:
+            names = store_variants(path, render_variants(storage.read_bytes(path), settings.IMAGE_VARIANT_QUALITY))
+        except Exception as exc:
+            print(f"[image_variants] failed for {path}: {exc}")
+            failed += 1
+            continue
+        session.execute(update(UploadedFile).where(UploadedFile.sha256 == sha256).values(variants=",".join(names)))
+        session.commit()
+        built += 1
+    return {"images": len(rows), "built": built, "failed": failed}
@@ -0,0 +1,295 @@
+"""
+🔎 쿼리 인덱스 점검
+
+실행되는 SELECT / UPDATE / DELETE 의 WHERE / ORDER BY 모양(테이블별)을 뽑아 모델에 선언된 인덱스로 처리되는지 확인합니다.
+(DB_INDEX_AUDIT=warn|error, 엔진 before_execute 이벤트. 같은 모양의 쿼리는 한 번만 분석)
+
+인덱스로 처리된다고 보는 기준:
+- `컬럼 = 값` / `컬럼 IN (...)` 조건이 있으면 그 컬럼 중 하나로 시작하는 인덱스 (PK / unique 포함)
+- 같음 조건 없이 범위(`<`, `>`, keyset 튜플 비교)만 있으면 그 컬럼으로 시작하는 인덱스
+- ORDER BY + LIMIT (페이지네이션)이면 같음 조건 컬럼 다음에 정렬 컬럼이 오는 인덱스 (정렬 없이 앞에서부터 읽기)
+- unique 인덱스의 컬럼이 모두 같음 조건이면 (한 행 조회) 항상 통과
+조인/상관 서브쿼리의 `컬럼 = 컬럼`, IS NULL, LIKE, `!=` 조건은 보지 않습니다.
+
+새 쿼리를 추가했다면 개발 환경에서 DB_INDEX_AUDIT=error 로 실행해 인덱스 누락을 바로 확인하고,
+모델에 인덱스를 추가한 뒤 마이그레이션(alembic revision --autogenerate)을 만드세요.
+`python -m app.maintenance check-indexes` 는 DB 스키마가 모델(인덱스 포함)과 같은지 확인합니다.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Table, UniqueConstraint, event
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import (
+    BinaryExpression,
+    BindParameter,
+    BooleanClauseList,
+    ClauseList,
+    ColumnClause,
+    Grouping,
+    Tuple,
+    UnaryExpression,
+)
+from sqlalchemy.sql.dml import Delete, Update
+from sqlalchemy.sql.selectable import ScalarSelect, Select
+
+from .config import settings
+
+EQUALITY_OPERATORS = {operators.eq, operators.in_op}
+RANGE_OPERATORS = {operators.lt, operators.le, operators.gt, operators.ge}
+# 값을 왼쪽에 쓴 비교 (5 < 컬럼) → 컬럼 기준 연산자
+REVERSED_OPERATORS = {
+    operators.eq: operators.eq,
+    operators.lt: operators.gt,
+    operators.le: operators.ge,
+    operators.gt: operators.lt,
+    operators.ge: operators.le,
+}
+
+
+class MissingIndexError(Exception):
+    """DB_INDEX_AUDIT=error 일 때 인덱스로 처리되지 않는 쿼리"""
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """쿼리 하나에서 테이블 하나에 걸린 조건 모양"""
+    table: str
+    equals: frozenset = frozenset()  # = / IN 조건 컬럼
+    range: Optional[str] = None  # 범위 조건 컬럼 (첫 번째만)
+    order: tuple = ()  # ORDER BY 컬럼 (앞에서부터 컬럼인 것만)
+    limited: bool = False  # LIMIT 있음
+
+    def describe(self) -> str:
+        parts = [f"{column} = ?" for column in sorted(self.equals)]
+        if self.range:
+            parts.append(f"{self.range} < ?")  # 범위 (<, <=, >, >=)
+        text = f"{self.table}({', '.join(parts)})"
+        if self.order:
+            text += f" ORDER BY {', '.join(self.order)}"
+        if self.limited:
+            text += " LIMIT"
+        return text
+
+
+def _table_of(column) -> Optional[Table]:
+    table = getattr(column, "table", None)
+    # aliased(Model) / table.alias() → 원래 테이블
+    while table is not None and not isinstance(table, Table):
+        table = getattr(table, "element", None)
+    return table
+
+
+def _is_value(element) -> bool:
+    """바인드 값(또는 값 목록 / 서브쿼리)인지 (컬럼, 상수 TRUE 등은 아님)"""
+    if isinstance(element, (BindParameter, ScalarSelect, Select)):
+        return True
+    if isinstance(element, Grouping):
+        return _is_value(element.element)
+    if isinstance(element, (Tuple, ClauseList)) and not isinstance(element, BooleanClauseList):
+        return all(_is_value(clause) for clause in element.clauses)
+    return False
+
+
+def _conditions(clause, branch: list, branches: list):
+    """
+    WHERE 절 → (테이블, 컬럼, 종류) 조건 목록
+    AND 조건은 branch 에, OR 의 각 갈래는 branches 에 따로 모음 (갈래마다 인덱스가 필요)
+    """
+    if clause is None:
+        return
+    if isinstance(clause, Grouping):
+        _conditions(clause.element, branch, branches)
+    elif isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        for child in clause.clauses:
+            _conditions(child, branch, branches)
+    elif isinstance(clause, BooleanClauseList) and clause.operator is operators.or_:
+        for child in clause.clauses:
+            alternative = []
+            _conditions(child, alternative, branches)
+            branches.append(alternative)
+    elif isinstance(clause, BinaryExpression):
+        left, right, operator = clause.left, clause.right, clause.operator
+        if _is_value(left) and not _is_value(right) and operator in REVERSED_OPERATORS:
+            left, right, operator = right, left, REVERSED_OPERATORS[operator]
+        if not _is_value(right):
+            return
+        if isinstance(left, Grouping):
+            left = left.element
+        if isinstance(left, Tuple):
+            # keyset 튜플 비교 (a, b) < (?, ?) → a 범위, 튜플 IN → 모두 같음 조건
+            columns = [column for column in left.clauses if isinstance(column, ColumnClause)]
+            if operator in EQUALITY_OPERATORS:
+                branch.extend((_table_of(column), column.name, "eq") for column in columns)
+            elif operator in RANGE_OPERATORS and columns:
+                branch.append((_table_of(columns[0]), columns[0].name, "range"))
+        elif isinstance(left, ColumnClause):
+            if operator in EQUALITY_OPERATORS:
+                branch.append((_table_of(left), left.name, "eq"))
+            elif operator in RANGE_OPERATORS:
+                branch.append((_table_of(left), left.name, "range"))
+
+
+def _order_columns(statement) -> list:
+    columns = []
+    for clause in getattr(statement, "_order_by_clauses", ()):
+        while isinstance(clause, (UnaryExpression, Grouping)):
+            clause = clause.element
+        if not isinstance(clause, ColumnClause) or _table_of(clause) is None:
+            break
+        columns.append(clause)
+    return columns
+
+
+def _statement_shapes(statement) -> list[tuple[Table, QueryShape]]:
+    conditions: list = []
+    branches: list = []
+    _conditions(statement.whereclause, conditions, branches)
+    # OR 가 없으면 AND 조건 전체가 한 갈래, 있으면 갈래마다 AND 조건을 더함
+    branches = [conditions + branch for branch in branches] or [conditions]
+
+    order = _order_columns(statement) if isinstance(statement, Select) else []
+    limited = isinstance(statement, Select) and statement._limit_clause is not None
+    order_table = _table_of(order[0]) if order else None
+
+    shapes = []
+    for branch in branches:
+        tables = {table for table, _, _ in branch if table is not None}
+        if order_table is not None:
+            tables.add(order_table)
+        for table in tables:
+            equals = frozenset(column for t, column, kind in branch if t is table and kind == "eq")
+            ranges = [column for t, column, kind in branch if t is table and kind == "range"]
+            table_order = tuple(column.name for column in order if _table_of(column) is table) if table is order_table else ()
+            shapes.append((table, QueryShape(
+                table=table.name,
+                equals=equals,
+                range=ranges[0] if ranges else None,
+                order=table_order,
+                limited=limited and bool(table_order),
+            )))
+    return shapes
+
+
+def query_shapes(statement) -> list[tuple[Table, QueryShape]]:
+    """문(서브쿼리 포함)의 테이블별 조건 모양"""
+    shapes = []
+    for element in visitors.iterate(statement):
+        if isinstance(element, (Select, Update, Delete)):
+            shapes.extend(_statement_shapes(element))
+    return shapes
+
+
+def table_indexes(table: Table) -> list[tuple[tuple[str, ...], bool]]:
+    """테이블의 (인덱스 컬럼, unique 여부) 목록 (PK / 인덱스 / unique 제약)"""
+    indexes = [(tuple(column.name for column in table.primary_key.columns), True)]
+    indexes += [(tuple(column.name for column in index.columns), bool(index.unique)) for index in table.indexes]
+    indexes += [
+        (tuple(column.name for column in constraint.columns), True)
+        for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+    ]
+    return [(columns, unique) for columns, unique in indexes if columns]
+
+
+def missing_index(shape: QueryShape, indexes: list[tuple[tuple[str, ...], bool]]) -> Optional[str]:
+    """모양을 처리할 인덱스가 없으면 이유, 있으면 None"""
+    if any(unique and set(columns) <= shape.equals for columns, unique in indexes):
+        return None
+    if shape.equals:
+        if not any(columns[0] in shape.equals for columns, _ in indexes):
+            return "no index starts with an equality column"
+    elif shape.range:
+        if not any(columns[0] == shape.range for columns, _ in indexes):
+            return "no index starts with the range column"
+    if shape.limited and shape.order:
+        prefix = len(shape.equals)
+        if not any(
+            set(columns[:prefix]) == shape.equals and len(columns) > prefix and columns[prefix] == shape.order[0]
+            for columns, _ in indexes
+        ):
+            return "ORDER BY ... LIMIT needs an index on the equality columns followed by the sort column"
+    return None
+
+
+class IndexAudit:
+    """실행되는 쿼리의 인덱스 누락을 모아 두고 (warn) 또는 바로 실패시킴 (error)"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._checked: dict = {}  # 쿼리 캐시 키 → 누락 목록
+        self._missing: dict[str, dict] = {}  # 모양 → {reason, count, sql}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("warn", "error")
+
+    def check(self, statement) -> list[tuple[QueryShape, str]]:
+        cache_key = statement._generate_cache_key()
+        key = cache_key[0] if cache_key is not None else None
+        with self._lock:
+            if key is not None and key in self._checked:
+                return self._checked[key]
+        missing = []
+        for table, shape in query_shapes(statement):
+            reason = missing_index(shape, table_indexes(table))
+            if reason is not None:
+                missing.append((shape, reason))
+        with self._lock:
+            if key is not None:
+                self._checked[key] = missing
+        return missing
+
+    def record(self, statement):
+        missing = self.check(statement)
+        if not missing:
+            return
+        for shape, reason in missing:
+            description = shape.describe()
+            with self._lock:
+                entry = self._missing.get(description)
+                if entry is None:
+                    entry = self._missing[description] = {"reason": reason, "count": 0, "sql": str(statement)[:500]}
+                    print(f"[index_audit] missing index: {description} ({reason})")
+                entry["count"] += 1
+        if self.mode == "error":
+            shape, reason = missing[0]
+            raise MissingIndexError(f"{shape.describe()}: {reason}")
+
+    def install(self, engine):
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, "before_execute")
+        def _audit(conn, clauseelement, multiparams, params, execution_options):
+            if isinstance(clauseelement, (Select, Update, Delete)):
+                self.record(clauseelement)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"mode": self.mode, "checked": len(self._checked), "missing": dict(self._missing)}
+
+
+index_audit = IndexAudit(settings.DB_INDEX_AUDIT)
+
+
+def check_schema(connection) -> list[str]:
+    """DB 스키마가 최신 마이그레이션 + 모델(테이블/컬럼/인덱스)과 같은지 확인 → 차이 목록"""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from sqlmodel import SQLModel
+
+    from . import models  # noqa: F401
+    from .db import alembic_config
+
+    problems = []
+    context = MigrationContext.configure(connection, opts={"compare_type": True})
+    current = context.get_current_revision()
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    if current != head:
+        problems.append(f"database revision {current} is not head {head} (alembic upgrade head)")
+    for diff in compare_metadata(context, SQLModel.metadata):
+        problems.append(repr(diff))
+    return problems
@@ -1,8 +1,16 @@
-import os
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles  # 👈 정적 파일 서빙을 위해 추가됨
-from .db import create_db_and_tables
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from .db import create_db_and_tables, engine, get_pool_status
+from .feed_cache import feed_cache
+from .index_audit import index_audit
+from .pagination import NEXT_CURSOR_HEADER
+from .password_hasher import PasswordHasherBusy, password_hasher
+from .image_variants import image_variant_worker
+from .storage import LocalStorage, storage
+from .upload_files import create_upload_files
 
 # 라우터 모듈 불러오기
 from .routers import auth as auth_router
@@ -23,15 +31,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # 🔖 피드/댓글 다음 페이지 커서
 )
 
-# 2. 이미지 업로드 폴더 설정 (서버 실행 시 폴더 자동 생성)
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
-
-# 3. 정적 파일 서빙 설정 (http://주소/uploads/... 로 접근 가능하게 함)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# 2. 업로드 파일 저장소 (UPLOAD_STORAGE: local 폴더는 저장소 생성 시 자동 생성, s3는 S3 호환 저장소)
+# 3. local이면 정적 파일 서빙 설정 (http://주소/uploads/... 로 접근 가능하게 함), s3면 S3_PUBLIC_URL 에서 바로 내려받음
+# 업로드 파일은 바뀌지 않으므로 immutable 캐시 헤더 + 강한 ETag, 파일 메타데이터는 메모리 인덱스에서
+upload_files = None
+if isinstance(storage, LocalStorage):
+    upload_files = create_upload_files(storage.directory)
+    app.mount("/uploads", upload_files, name="uploads")
 
 
 @app.on_event("startup")
@@ -40,6 +49,29 @@ def on_startup():
     create_db_and_tables()
 
 
+@app.on_event("startup")
+async def on_startup_chat_workers():
+    # 💬 채팅 브로커 구독 (워커 간 메시지 전달) + 메시지 배치 저장 시작
+    await chat_router.start_chat_workers()
+
+
+@app.on_event("shutdown")
+async def on_shutdown_chat_workers():
+    await chat_router.stop_chat_workers()
+
+
+@app.on_event("shutdown")
+def on_shutdown_process_pools():
+    password_hasher.shutdown()
+    image_variant_worker.shutdown()
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # 🔑 비밀번호 해시 대기열이 가득 참 → 다른 API를 느리게 만드는 대신 바로 거절
+    return JSONResponse(status_code=503, content={"detail": "Too many login requests, try again"}, headers={"Retry-After": "1"})
+
+
 # 4. 기능별 라우터 등록
 app.include_router(auth_router.router)
 app.include_router(users_router.router)
@@ -54,3 +86,44 @@ app.include_router(moderation_router.router)  # 🚫 차단/신고 기능 등록
 @app.get("/")
 def root():
     return {"message": "Intersection backend running"}
+
+
+@app.get("/health/db")
+def db_health():
+    """DB 연결 확인 + 커넥션 풀 상태 (사용 중 커넥션 수, 체크아웃 대기 시간 등) + 인덱스 없는 쿼리 (DB_INDEX_AUDIT)"""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        ok = True
+    except Exception as exc:
+        print(f"[health.db] DB ping failed: {exc}")
+        ok = False
+    return {
+        "ok": ok,
+        "ping_ms": round((time.perf_counter() - start) * 1000, 3),
+        "pool": get_pool_status(),
+        "index_audit": index_audit.status() if index_audit.enabled else None,
+    }
+
+
+@app.get("/health/cache")
+def cache_health():
+    """피드 캐시 상태 (적중/미스/무효화 횟수, 저장된 페이지 수 등)"""
+    return {"feed": feed_cache.status()}
+
+
+@app.get("/health/auth")
+def auth_health():
+    """비밀번호 해시 프로세스 풀 상태 (대기 깊이, 처리 시간, 거절/재해시 횟수)"""
+    return {"password_hasher": password_hasher.status()}
+
+
+@app.get("/health/images")
+def images_health():
+    """이미지 변형(썸네일/WebP) 생성 상태 + /uploads 메타데이터 인덱스 적중 수"""
+    return {
+        "storage": storage.backend,
+        "image_variants": image_variant_worker.status(),
+        "upload_index": upload_files.index.status() if upload_files is not None else None,
+    }
@@ -0,0 +1,156 @@
+"""
+운영/관리용 명령 모음
+
+사용법 (intersection-backend 폴더에서):
+    python -m app.maintenance rebuild-chat-rooms
+    python -m app.maintenance backfill-post-communities
+    python -m app.maintenance rebuild-post-counters
+    python -m app.maintenance dedupe-friendships
+    python -m app.maintenance dedupe-communities
+    python -m app.maintenance build-recommendations [--top-k 50]
+    python -m app.maintenance import-users <파일 | -> [--format csv|ndjson]
+    python -m app.maintenance build-image-variants
+    python -m app.maintenance check-indexes
+"""
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from .db import engine, create_db_and_tables
+from .services import (
+    backfill_post_communities,
+    dedupe_communities,
+    dedupe_friendships,
+    rebuild_chat_room_summaries,
+    rebuild_post_comment_counts,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "rebuild-chat-rooms",
+        help="채팅방의 마지막 메시지 / 안 읽은 수를 메시지 테이블 기준으로 다시 계산",
+    )
+    subparsers.add_parser(
+        "backfill-post-communities",
+        help="community_id가 없는 게시글을 작성자의 커뮤니티로 채움 (커뮤니티별 피드용)",
+    )
+    subparsers.add_parser(
+        "rebuild-post-counters",
+        help="게시글의 댓글 수(comment_count)를 댓글 테이블 기준으로 다시 계산",
+    )
+    subparsers.add_parser(
+        "dedupe-friendships",
+        help="중복된 친구 관계 행 삭제 (가장 먼저 만든 행만 유지, unique 제약 적용 전 실행)",
+    )
+    subparsers.add_parser(
+        "dedupe-communities",
+        help="중복된 커뮤니티 정리 (사용자/게시글을 가장 먼저 만든 커뮤니티로 옮긴 뒤 삭제, unique 제약 적용 전 실행)",
+    )
+    recommendations_parser = subparsers.add_parser(
+        "build-recommendations",
+        help="추천 친구 스냅샷 재계산 (함께 아는 친구 / 커뮤니티 / 출생년도, numpy·scipy 필요)",
+    )
+    recommendations_parser.add_argument("--top-k", type=int, default=50, help="사용자별 저장할 추천 수")
+    recommendations_parser.add_argument("--block-size", type=int, default=20000, help="한 번에 계산할 사용자 수")
+    import_parser = subparsers.add_parser(
+        "import-users",
+        help="CSV/NDJSON 파일(또는 - 로 표준 입력)의 사용자 대량 가입",
+    )
+    import_parser.add_argument("path", help="입력 파일 경로 (- 이면 표준 입력)")
+    import_parser.add_argument("--format", choices=("csv", "ndjson"), help="기본값: 확장자로 판단 (.csv 외에는 ndjson)")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="커밋 단위 사용자 수")
+    import_parser.add_argument("--workers", type=int, default=None, help="비밀번호 해시 프로세스 수 (기본값: CPU 수)")
+    subparsers.add_parser(
+        "build-image-variants",
+        help="변형(썸네일/WebP)이 없는 업로드 이미지의 변형 생성 (Pillow 필요)",
+    )
+    subparsers.add_parser(
+        "check-indexes",
+        help="DB 스키마(인덱스 포함)가 최신 마이그레이션 + 모델과 같은지 확인 (다르면 종료 코드 1)",
+    )
+    args = parser.parse_args(argv)
+
+    create_db_and_tables()
+
+    if args.command == "rebuild-chat-rooms":
+        with Session(engine) as session:
+            count = rebuild_chat_room_summaries(session)
+        print(f"[maintenance] rebuilt summaries for {count} chat rooms")
+
+    if args.command == "backfill-post-communities":
+        with Session(engine) as session:
+            count = backfill_post_communities(session)
+        print(f"[maintenance] set community_id on {count} posts")
+
+    if args.command == "rebuild-post-counters":
+        with Session(engine) as session:
+            count = rebuild_post_comment_counts(session)
+        print(f"[maintenance] rebuilt comment counts for {count} posts")
+
+    if args.command == "dedupe-friendships":
+        with Session(engine) as session:
+            count = dedupe_friendships(session)
+        print(f"[maintenance] removed {count} duplicate friendships")
+
+    if args.command == "dedupe-communities":
+        with Session(engine) as session:
+            count = dedupe_communities(session)
+        print(f"[maintenance] removed {count} duplicate communities")
+
+    if args.command == "import-users":
+        from .user_import import import_users, print_progress, read_rows
+
+        format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+        stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+        try:
+            with Session(engine) as session:
+                report = import_users(
+                    session,
+                    read_rows(stream, format),
+                    batch_size=args.batch_size,
+                    workers=args.workers,
+                    progress=print_progress,
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        for line_number, message in report.errors:
+            print(f"[import] line {line_number}: {message}")
+        print(
+            f"[maintenance] imported {report.imported} users "
+            f"(skipped {report.skipped_existing} existing, {report.invalid} invalid) in {report.elapsed:.1f}s"
+        )
+
+    if args.command == "build-recommendations":
+        # numpy/scipy는 이 명령에서만 필요하므로 여기서 import
+        from .recommendations import build_recommendation_snapshot
+
+        with Session(engine) as session:
+            stats = build_recommendation_snapshot(session, top_k=args.top_k, block_size=args.block_size)
+        print(f"[maintenance] built recommendations: {stats}")
+
+    if args.command == "build-image-variants":
+        from .image_variants import build_missing_variants
+
+        with Session(engine) as session:
+            stats = build_missing_variants(session)
+        print(f"[maintenance] built image variants: {stats}")
+
+    if args.command == "check-indexes":
+        from .index_audit import check_schema
+
+        with engine.connect() as connection:
+            problems = check_schema(connection)
+        for problem in problems:
+            print(f"[check-indexes] {problem}")
+        if problems:
+            sys.exit(1)
+        print("[maintenance] schema matches models and migrations")
+
+
+if __name__ == "__main__":
+    main()
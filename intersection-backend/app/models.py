@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, UniqueConstraint
 from datetime import datetime, timezone, timedelta
 
 # 한국 시간대 (KST = UTC+9)
@@ -13,6 +14,11 @@ def get_kst_now():
 # 1. Community (커뮤니티) 모델 추가
 # ------------------------------------------------------
 class Community(SQLModel, table=True):
+    # (학교, 입학년도, 지역)당 커뮤니티 1개 (동시 가입 시 중복 생성 방지 + 배정 조회용 인덱스)
+    __table_args__ = (
+        UniqueConstraint("school_name", "admission_year", "region", name="uq_community_school_name_admission_year_region"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str  # 커뮤니티 이름 (예: "서울신동초등학교 2010년 입학")
     
@@ -36,15 +42,16 @@ class User(SQLModel, table=True):
     password_hash: Optional[str] = None
     name: Optional[str] = None
     nickname: Optional[str] = None
-    email: Optional[str] = None
+    email: Optional[str] = Field(default=None, index=True)  # 카카오 로그인 시 기존 계정 조회
     phone: Optional[str] = None
     
     birth_year: Optional[int] = None
     gender: Optional[str] = None
-    region: Optional[str] = None        # 지역
-    school_name: Optional[str] = None   # 학교명
+    # 추천 친구 후보 조회용 인덱스 (속성 값 → 사용자)
+    region: Optional[str] = Field(default=None, index=True)        # 지역
+    school_name: Optional[str] = Field(default=None, index=True)   # 학교명
     school_type: Optional[str] = None
-    admission_year: Optional[int] = None # 입학년도
+    admission_year: Optional[int] = Field(default=None, index=True) # 입학년도
 
     # 📷 [추가됨] 프로필 이미지 & 배경 이미지 URL
     profile_image: Optional[str] = None      
@@ -61,17 +68,31 @@ class User(SQLModel, table=True):
 
 # (나머지 Post, Comment 등 기존 코드는 그대로 두시면 됩니다)
 class Post(SQLModel, table=True):
+    # 피드 keyset 페이지네이션 (created_at DESC, id DESC) 용 인덱스: 전체 / 커뮤니티별
+    __table_args__ = (
+        Index("ix_post_created_at_id", "created_at", "id"),
+        Index("ix_post_community_id_created_at_id", "community_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     author_id: int = Field(foreign_key="user.id")
+    # 작성 시점의 작성자 커뮤니티 (커뮤니티별 피드용)
+    community_id: Optional[int] = Field(default=None, foreign_key="community.id")
     content: str
 
 # 📷 [추가됨] 게시글 이미지 URL (여러 장이면 쉼표로 구분하거나 별도 테이블 필요하지만, 일단 1장으로 시작)
     image_url: Optional[str] = None
 
+    # 💬 댓글 수 (비정규화 카운터: 댓글 작성 트랜잭션에서 함께 증가)
+    comment_count: int = Field(default=0)
+
     created_at: datetime = Field(default_factory=get_kst_now)
     updated_at: Optional[datetime] = None
 
 class Comment(SQLModel, table=True):
+    # 게시글별 댓글 목록 (created_at, id 순 keyset 페이지네이션) 용 인덱스
+    __table_args__ = (Index("ix_comment_post_id_created_at_id", "post_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="post.id")
     user_id: int = Field(foreign_key="user.id")
@@ -79,6 +100,12 @@ class Comment(SQLModel, table=True):
     created_at: datetime = Field(default_factory=get_kst_now)
 
 class UserFriendship(SQLModel, table=True):
+    # 같은 친구 관계 중복 방지 (user_id로 시작하는 조회도 이 인덱스 사용) + 역방향(나를 추가한 사람) 조회용 인덱스
+    __table_args__ = (
+        UniqueConstraint("user_id", "friend_user_id", name="uq_userfriendship_user_id_friend_user_id"),
+        Index("ix_userfriendship_friend_user_id_user_id", "friend_user_id", "user_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     friend_user_id: int = Field(foreign_key="user.id")
@@ -86,25 +113,57 @@ class UserFriendship(SQLModel, table=True):
     created_at: datetime = Field(default_factory=get_kst_now)
 
 
+class RecommendationSnapshot(SQLModel, table=True):
+    """배치 작업(app.recommendations)이 미리 계산한 사용자별 추천 친구 상위 K명"""
+    # 내 추천 목록 (user_id = ? ORDER BY rank LIMIT K) 조회용 인덱스
+    __table_args__ = (Index("ix_recommendationsnapshot_user_id_rank", "user_id", "rank"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    recommended_user_id: int = Field(foreign_key="user.id")
+    score: float
+    rank: int  # 0부터 (점수 높은 순)
+    created_at: datetime = Field(default_factory=get_kst_now)
+
+
 # ------------------------------------------------------
 # 💬 Chat (채팅) 모델
 # ------------------------------------------------------
 class ChatRoom(SQLModel, table=True):
     """1:1 채팅방 모델"""
+    # 두 사용자의 채팅방 찾기 + 내 채팅방 목록 (user1_id = ? OR user2_id = ?) 조회용 인덱스
+    __table_args__ = (
+        Index("ix_chatroom_user1_id_user2_id", "user1_id", "user2_id"),
+        Index("ix_chatroom_user2_id_user1_id", "user2_id", "user1_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user1_id: int = Field(foreign_key="user.id")  # 채팅방 생성자
     user2_id: int = Field(foreign_key="user.id")  # 채팅 상대방
     created_at: datetime = Field(default_factory=get_kst_now)
     updated_at: datetime = Field(default_factory=get_kst_now)  # 마지막 메시지 시간
 
+    # 채팅방 목록용 비정규화 필드 (메시지 저장과 같은 트랜잭션에서 갱신)
+    last_message_id: Optional[int] = None
+    last_message_preview: Optional[str] = None
+    user1_unread_count: int = Field(default=0)  # user1이 안 읽은 메시지 수
+    user2_unread_count: int = Field(default=0)  # user2가 안 읽은 메시지 수
+
+    # 읽음 워터마크: 이 ID 이하의 상대방 메시지는 읽은 것으로 봄
+    user1_last_read_message_id: Optional[int] = None
+    user2_last_read_message_id: Optional[int] = None
+
 
 class ChatMessage(SQLModel, table=True):
     """채팅 메시지 모델"""
+    # 방별 커서 페이지네이션 (room_id = ? AND id > / < cursor) 용 인덱스
+    __table_args__ = (Index("ix_chatmessage_room_id_id", "room_id", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     room_id: int = Field(foreign_key="chatroom.id")
     sender_id: int = Field(foreign_key="user.id")
     content: str  # 메시지 내용
-    is_read: bool = Field(default=False)  # 읽음 여부
+    is_read: bool = Field(default=False)  # (이전 버전 호환용) 읽음 여부는 ChatRoom의 읽음 워터마크 기준
     created_at: datetime = Field(default_factory=get_kst_now)
 
 
@@ -113,6 +172,12 @@ class ChatMessage(SQLModel, table=True):
 # ------------------------------------------------------
 class UserBlock(SQLModel, table=True):
     """사용자 차단 모델"""
+    # 친구/추천 목록에서 "내가 차단한 사용자 제외" / 추천에서 "나를 차단한 사용자 제외" (NOT EXISTS) 조회용 인덱스
+    __table_args__ = (
+        Index("ix_userblock_user_id_blocked_user_id", "user_id", "blocked_user_id"),
+        Index("ix_userblock_blocked_user_id_user_id", "blocked_user_id", "user_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")  # 차단한 사람
     blocked_user_id: int = Field(foreign_key="user.id")  # 차단된 사람
@@ -121,10 +186,28 @@ class UserBlock(SQLModel, table=True):
 
 class UserReport(SQLModel, table=True):
     """사용자 신고 모델"""
+    # 내 신고 내역 (reporter_id = ? ORDER BY created_at DESC) 조회용 인덱스
+    __table_args__ = (Index("ix_userreport_reporter_id_created_at", "reporter_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     reporter_id: int = Field(foreign_key="user.id")  # 신고한 사람
     reported_user_id: int = Field(foreign_key="user.id")  # 신고된 사람
     reason: str  # 신고 사유
     content: Optional[str] = None  # 상세 내용
     status: str = Field(default="pending")  # pending, reviewed, resolved
-    created_at: datetime = Field(default_factory=get_kst_now)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=get_kst_now)
+
+# ------------------------------------------------------
+# 🖼️ 업로드 파일 (내용 주소 기반 저장)
+# ------------------------------------------------------
+class UploadedFile(SQLModel, table=True):
+    """업로드된 파일 내용 1개 (같은 내용을 다시 올리면 새 파일 없이 upload_count만 증가)"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sha256: str = Field(unique=True, index=True)  # 파일 내용 해시 (hex)
+    path: str = Field(index=True)  # 저장소(app.storage) 안의 상대 경로 (예: "ab/cd/abcd...ef.jpg")
+    size: int  # 바이트
+    content_type: Optional[str] = None
+    upload_count: int = Field(default=1)
+    variants: Optional[str] = None  # 생성 완료된 이미지 변형 이름 (쉼표 구분, 예: "thumb,medium")
+    created_at: datetime = Field(default_factory=get_kst_now)
+    last_uploaded_at: datetime = Field(default_factory=get_kst_now)
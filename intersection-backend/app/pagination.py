@@ -0,0 +1,27 @@
+"""
+🔖 keyset(커서) 페이지네이션 공통 도구
+
+커서는 마지막 행의 (created_at, id)를 base64로 감싼 불투명한 문자열입니다.
+다음 페이지 커서는 목록 응답 형식을 바꾸지 않도록 응답 헤더(X-Next-Cursor)로 내려줍니다.
+"""
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """커서 → (created_at, id) (형식이 잘못되면 400)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
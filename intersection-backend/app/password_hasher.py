@@ -0,0 +1,142 @@
+"""
+🔑 비밀번호 해시 전용 프로세스 풀
+
+argon2 해시/검증은 호출마다 수십 ms 동안 CPU를 쓰고 GIL을 잡습니다.
+요청 스레드나 이벤트 루프에서 직접 계산하면 로그인이 몰릴 때 다른 API까지 느려지므로,
+PASSWORD_HASH_WORKERS 개 프로세스에서만 계산하고 호출한 쪽은 결과만 기다립니다.
+
+- 대기 + 실행 중 작업이 PASSWORD_HASH_MAX_PENDING 개를 넘으면 바로 PasswordHasherBusy (→ 503)
+- 대기 깊이 / 처리 시간 / 거절 수는 GET /health/auth 로 확인
+- PASSWORD_HASH_WORKERS=0 이면 호출한 스레드에서 직접 계산 (풀 없음)
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from . import auth
+from .config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """대기 중인 해시 작업이 너무 많음 (잠시 후 다시 시도)"""
+
+
+class PasswordHasherStats:
+    """대기 깊이 / 처리 시간 / 거절 누적 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0  # 지금 대기 + 실행 중인 작업 수
+        self.max_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def try_acquire(self, limit: int) -> bool:
+        with self._lock:
+            if limit > 0 and self.pending >= limit:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            return True
+
+    def release(self, seconds: float):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                # 대기 시간 포함 (제출 → 결과)
+                "avg_ms": round(self.total_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 3),
+            }
+
+
+class PasswordHasher:
+    """auth 모듈의 해시/검증 함수를 프로세스 풀에서 실행 (동기/비동기 호출 모두 지원)"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = PasswordHasherStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 처음 사용할 때 생성 (관리 명령 등 해시를 쓰지 않는 프로세스에서는 만들지 않음)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _submit(self, func, *args) -> Future:
+        if not self.stats.try_acquire(self.max_pending):
+            raise PasswordHasherBusy()
+        started = time.perf_counter()
+        try:
+            if self.workers > 0:
+                future = self._get_executor().submit(func, *args)
+            else:
+                future = Future()
+                try:
+                    future.set_result(func(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+        except Exception:
+            self.stats.release(time.perf_counter() - started)
+            raise
+        future.add_done_callback(lambda _: self.stats.release(time.perf_counter() - started))
+        return future
+
+    def _record(self, result: tuple[bool, Optional[str]]) -> tuple[bool, Optional[str]]:
+        if result[1] is not None:
+            self.stats.record_rehash()
+        return result
+
+    # --- 동기 (요청 스레드에서 호출, 기다리는 동안 GIL을 잡지 않음) ---
+    def hash(self, password: str) -> str:
+        return self._submit(auth.get_password_hash, password).result()
+
+    def verify_and_update(self, password: str, password_hash: Optional[str]) -> tuple[bool, Optional[str]]:
+        return self._record(self._submit(auth.verify_and_update_password, password, password_hash).result())
+
+    # --- 비동기 (이벤트 루프를 막지 않음) ---
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(auth.get_password_hash, password))
+
+    async def verify_and_update_async(self, password: str, password_hash: Optional[str]) -> tuple[bool, Optional[str]]:
+        return self._record(await asyncio.wrap_future(self._submit(auth.verify_and_update_password, password, password_hash)))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def status(self) -> dict:
+        return {"workers": self.workers, "max_pending_limit": self.max_pending, **self.stats.snapshot()}
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,191 @@
+"""
+🤝 추천 친구 배치 계산 (오프라인)
+
+전체 사용자 / 친구 관계 / 차단 목록을 NumPy·SciPy 희소 행렬로 올려 모든 사용자의 추천 점수를
+한 번에 계산하고, 사용자별 상위 K명을 RecommendationSnapshot 테이블에 저장합니다.
+/users/me/recommended 는 저장된 K개 행만 읽습니다. (스냅샷이 없는 사용자는 실시간 계산으로 대체)
+
+점수 = 함께 아는 친구 수 × W_MUTUAL
+     + 같은 커뮤니티 (학교·입학년도·지역) W_COMMUNITY
+     + 출생년도 근접도 W_AGE × max(0, 1 - |차이| / AGE_WINDOW)   (앞의 두 조건으로 후보가 된 사용자에게만)
+이미 추가한 친구, 내가 차단했거나 나를 차단한 사용자, 나 자신은 제외합니다.
+
+사용법 (intersection-backend 폴더에서):
+    python -m app.maintenance build-recommendations --top-k 50
+"""
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from .models import RecommendationSnapshot, User, UserBlock, UserFriendship, get_kst_now
+
+W_MUTUAL = 1.0
+W_COMMUNITY = 3.0
+W_AGE = 1.0
+AGE_WINDOW = 5.0
+
+DEFAULT_TOP_K = 50
+# 한 번에 점수를 계산할 사용자 수 (행 블록 단위로 메모리 사용량 제한)
+DEFAULT_BLOCK_SIZE = 20000
+INSERT_CHUNK_SIZE = 10000
+
+
+@dataclass
+class RecommendationInput:
+    """배치 계산 입력 (사용자는 0..n-1 인덱스로 표현)"""
+    user_ids: np.ndarray  # (n,) 실제 User.id
+    community: np.ndarray  # (n,) 커뮤니티 ID, 없으면 -1
+    birth_year: np.ndarray  # (n,) float, 없으면 nan
+    friend_pairs: np.ndarray  # (f, 2) [사용자 인덱스, 친구 인덱스]
+    block_pairs: np.ndarray  # (b, 2) [차단한 사람 인덱스, 차단된 사람 인덱스]
+
+
+@dataclass
+class RecommendationBlock:
+    """사용자 블록 하나의 상위 K 결과 (사용자 인덱스 기준, 사용자별 rank 0부터)"""
+    user_index: np.ndarray
+    recommended_index: np.ndarray
+    score: np.ndarray
+    rank: np.ndarray
+
+
+def _pairs_matrix(pairs: np.ndarray, n: int) -> sparse.csr_matrix:
+    data = np.ones(len(pairs), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    matrix.data[:] = 1.0  # 중복 행은 1로
+    return matrix
+
+
+def compute_recommendations(
+    data: RecommendationInput,
+    top_k: int = DEFAULT_TOP_K,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[RecommendationBlock]:
+    """모든 사용자의 상위 K 추천을 사용자 블록 단위로 계산"""
+    n = len(data.user_ids)
+    if n == 0:
+        return
+
+    added = _pairs_matrix(data.friend_pairs, n)  # 내가 추가한 친구
+    # 함께 아는 친구는 방향 없이 계산 (한쪽만 추가한 관계도 포함)
+    connected = ((added + added.T) > 0).astype(np.float32)
+    blocked = _pairs_matrix(data.block_pairs, n)
+    excluded = (added + blocked + blocked.T).tocsr()
+
+    has_community = data.community >= 0
+    _, community_codes = np.unique(data.community[has_community], return_inverse=True)
+    members = sparse.csr_matrix(
+        (np.ones(len(community_codes), dtype=np.float32), (np.flatnonzero(has_community), community_codes)),
+        shape=(n, int(community_codes.max()) + 1 if len(community_codes) else 0),
+    )
+
+    # 특징 행렬 X = [연결(√W_MUTUAL) | 커뮤니티(√W_COMMUNITY)] → X·Xᵀ 한 번으로
+    # 함께 아는 친구 수 × W_MUTUAL + 같은 커뮤니티 × W_COMMUNITY 를 계산
+    features = sparse.hstack([connected * np.sqrt(W_MUTUAL), members * np.sqrt(W_COMMUNITY)], format="csr")
+    features_t = features.T.tocsr()
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        scores = (features[start:stop] @ features_t).tocsr()
+        indptr, col = scores.indptr, scores.indices
+        row = np.repeat(np.arange(start, stop), np.diff(indptr))
+
+        # 출생년도 근접도 (후보에게만 가산, 출생년도가 없으면 fmax가 nan을 0으로)
+        year_gap = np.abs(data.birth_year[row] - data.birth_year[col])
+        score = scores.data + (W_AGE * np.fmax(1.0 - year_gap / AGE_WINDOW, 0.0)).astype(np.float32)
+
+        # 사용자별 상위 K개 (점수 내림차순): 제외 대상 수만큼 여유를 두고 argpartition → 제외 후 K개만 정렬
+        user_index, recommended_index, top_score, rank = [], [], [], []
+        for r in range(start, stop):
+            lo, hi = indptr[r - start], indptr[r - start + 1]
+            if lo == hi:
+                continue
+            row_col, row_score = col[lo:hi], score[lo:hi]
+            skip = np.append(excluded.indices[excluded.indptr[r]:excluded.indptr[r + 1]], r)
+            take = top_k + len(skip)
+            if hi - lo > take:
+                candidates = np.argpartition(-row_score, take - 1)[:take]
+            else:
+                candidates = np.arange(hi - lo)
+            candidates = candidates[~(row_col[candidates, None] == skip).any(axis=1)]
+            candidates = candidates[np.argsort(-row_score[candidates], kind="stable")][:top_k]
+            user_index.append(np.full(len(candidates), r))
+            recommended_index.append(row_col[candidates])
+            top_score.append(row_score[candidates])
+            rank.append(np.arange(len(candidates)))
+
+        if user_index:
+            yield RecommendationBlock(
+                user_index=np.concatenate(user_index),
+                recommended_index=np.concatenate(recommended_index),
+                score=np.concatenate(top_score),
+                rank=np.concatenate(rank),
+            )
+
+
+def load_recommendation_input(session: Session) -> RecommendationInput:
+    """DB에서 배치 입력 로드 (유령 회원 = 이름 없는 사용자 제외)"""
+    users = session.exec(
+        select(User.id, User.community_id, User.birth_year).where(User.name.isnot(None)).order_by(User.id)
+    ).all()
+    user_ids = np.array([u[0] for u in users], dtype=np.int64)
+    community = np.array([u[1] if u[1] is not None else -1 for u in users], dtype=np.int64)
+    birth_year = np.array([u[2] if u[2] is not None else np.nan for u in users], dtype=np.float64)
+
+    def to_index_pairs(rows) -> np.ndarray:
+        pairs = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        index = np.searchsorted(user_ids, pairs)
+        index = np.minimum(index, max(len(user_ids) - 1, 0))
+        known = (user_ids[index] == pairs).all(axis=1) if len(user_ids) else np.zeros(len(pairs), dtype=bool)
+        return index[known]
+
+    friend_pairs = to_index_pairs(session.exec(select(UserFriendship.user_id, UserFriendship.friend_user_id)).all())
+    block_pairs = to_index_pairs(session.exec(select(UserBlock.user_id, UserBlock.blocked_user_id)).all())
+    return RecommendationInput(user_ids, community, birth_year, friend_pairs, block_pairs)
+
+
+def build_recommendation_snapshot(
+    session: Session,
+    top_k: int = DEFAULT_TOP_K,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> dict:
+    """
+    추천 스냅샷을 다시 만듭니다. (기존 행 삭제 + 새 행 저장을 한 트랜잭션으로)
+    처리 통계(사용자 수, 저장 행 수, 단계별 시간)를 반환합니다.
+    """
+    started = time.perf_counter()
+    data = load_recommendation_input(session)
+    loaded = time.perf_counter()
+
+    session.execute(delete(RecommendationSnapshot))
+    created_at = get_kst_now()
+    rows_written = 0
+    for block in compute_recommendations(data, top_k=top_k, block_size=block_size):
+        user_ids = data.user_ids[block.user_index].tolist()
+        recommended_ids = data.user_ids[block.recommended_index].tolist()
+        scores = block.score.tolist()
+        ranks = block.rank.tolist()
+        for offset in range(0, len(user_ids), INSERT_CHUNK_SIZE):
+            end = offset + INSERT_CHUNK_SIZE
+            session.execute(
+                insert(RecommendationSnapshot),
+                [
+                    {"user_id": u, "recommended_user_id": r, "score": s, "rank": k, "created_at": created_at}
+                    for u, r, s, k in zip(user_ids[offset:end], recommended_ids[offset:end], scores[offset:end], ranks[offset:end])
+                ],
+            )
+        rows_written += len(user_ids)
+    session.commit()
+    finished = time.perf_counter()
+
+    return {
+        "users": len(data.user_ids),
+        "rows": rows_written,
+        "load_seconds": round(loaded - started, 3),
+        "compute_and_write_seconds": round(finished - loaded, 3),
+    }
@@ -1,47 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.security import OAuth2PasswordBearer
+import asyncio
+import json
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlmodel import Session, select
-from typing import List
+from sqlalchemy import case
+from typing import List, Optional
 
-from ..models import ChatRoom, ChatMessage, User, get_kst_now
-from ..schemas import ChatRoomCreate, ChatRoomRead, ChatMessageCreate, ChatMessageRead
-from ..db import engine
-from ..auth import decode_access_token
+from ..models import ChatRoom, ChatMessage, User
+from ..schemas import (
+    ChatRoomCreate, ChatRoomRead, ChatMessageCreate, ChatMessageRead,
+    ChatReadReceiptCreate, ChatReadReceiptRead,
+)
+from ..db import engine, get_session, run_db
+from ..auth import get_token_principal
+from ..routers.users import get_current_user_id
+from ..broker import create_broker
+from ..chat_writer import create_chat_writer
+from ..services import record_chat_message, mark_chat_room_read, get_last_read_message_id, get_unread_count
 
 router = APIRouter(prefix="/chat", tags=["chat"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
+
+# 메시지 조회 페이지 크기 (기본값 / 최대값)
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_PAGE_SIZE_MAX = 200
 
 
 # WebSocket 연결 관리
 class ConnectionManager:
+    """
+    (사용자, 채팅방)별로 여러 개의 WebSocket 연결을 관리합니다.
+    (같은 사용자가 휴대폰과 웹에서 같은 방을 동시에 열어둔 경우)
+    메시지는 해당 채팅방에 연결된 소켓에만 전달합니다. (다른 방 화면에 섞이지 않게)
+    """
+
+    # 한 연결로 보내는 데 이보다 오래 걸리면 끊긴 연결로 보고 닫음
+    SEND_TIMEOUT = 2.0
+
     def __init__(self):
-        # {user_id: WebSocket}
-        self.active_connections: dict[int, WebSocket] = {}
+        # {(user_id, room_id): {WebSocket, ...}}
+        self.connections: dict[tuple[int, int], set[WebSocket]] = {}
+        # {WebSocket: (user_id, room_id)}
+        self.connection_keys: dict[WebSocket, tuple[int, int]] = {}
+        # 닫는 중인 소켓의 close 태스크 (완료 전에 GC 되지 않게 참조 유지)
+        self._closing: set[asyncio.Task] = set()
 
-    async def connect(self, user_id: int, websocket: WebSocket):
+    async def connect(self, user_id: int, room_id: int, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections[user_id] = websocket
+        key = (user_id, room_id)
+        self.connections.setdefault(key, set()).add(websocket)
+        self.connection_keys[websocket] = key
+
+    def disconnect(self, websocket: WebSocket):
+        key = self.connection_keys.pop(websocket, None)
+        if key is None:
+            return
+        sockets = self.connections.get(key)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.connections[key]
 
-    def disconnect(self, user_id: int):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
+    async def _send(self, websocket: WebSocket, message: dict) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_json(message), timeout=self.SEND_TIMEOUT)
+            return True
+        except Exception:
+            return False
 
-    async def send_message(self, user_id: int, message: dict):
-        """특정 사용자에게 메시지 전송"""
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_json(message)
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
+    async def _send_all(self, sockets: set[WebSocket], message: dict):
+        """
+        여러 연결에 동시에 전송하고, 실패한 연결은 목록에서 제거한 뒤 닫습니다.
+        닫기는 기다리지 않고 예약만 함 (응답 없는 소켓 때문에 다른 전송이 늦어지지 않게)
+        → 해당 연결의 receive 루프가 끝나 클라이언트가 재접속할 수 있음
+        """
+        sockets = list(sockets)
+        if not sockets:
+            return
+        results = await asyncio.gather(*(self._send(ws, message) for ws in sockets))
+        for websocket, ok in zip(sockets, results):
+            if not ok:
+                self.disconnect(websocket)
+                task = asyncio.create_task(self._close(websocket))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    async def send_to_room(self, user_ids: list[int], room_id: int, message: dict):
+        """채팅방 참여자들이 그 방에 연결한 모든 연결에 메시지 전송"""
+        sockets = set()
+        for user_id in user_ids:
+            sockets |= self.connections.get((user_id, room_id), set())
+        await self._send_all(sockets, message)
 
 
 manager = ConnectionManager()
 
+# 워커 간 메시지 전달용 브로커 (설정: CHAT_BROKER)
+broker = create_broker()
+
+# WebSocket 메시지 배치 저장 (설정: CHAT_WRITE_MODE, per_message면 None)
+chat_writer = create_chat_writer()
+
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
-    """토큰에서 사용자 ID 추출"""
-    payload = decode_access_token(token)
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    return user_id
+def chat_message_payload(message: ChatMessage) -> dict:
+    """WebSocket으로 보내는 메시지 데이터"""
+    return {
+        "id": message.id,
+        "room_id": message.room_id,
+        "sender_id": message.sender_id,
+        "content": message.content,
+        "is_read": message.is_read,
+        "created_at": message.created_at.isoformat()
+    }
+
+
+async def publish_chat_message(user_ids: list[int], payload: dict):
+    """
+    브로커로 메시지를 발행합니다. 각 워커가 자기에게 연결된 사용자에게 전달합니다.
+    브로커 크기 제한을 넘는 메시지는 ID만 보내고, 받는 워커가 DB에서 읽어옵니다.
+    """
+    event = {"user_ids": user_ids, "message": payload}
+    limit = broker.max_payload_bytes
+    if limit is not None and len(json.dumps(event, ensure_ascii=False).encode("utf-8")) > limit:
+        event = {"user_ids": user_ids, "message_id": payload["id"]}
+    await broker.publish(event)
+
+
+def _load_chat_message_payload(message_id: int) -> Optional[dict]:
+    with Session(engine) as session:
+        message = session.get(ChatMessage, message_id)
+        return chat_message_payload(message) if message else None
+
+
+async def publish_read_receipt(user_ids: list[int], receipt: ChatReadReceiptRead):
+    """읽음 처리 결과를 브로커로 발행 (상대방 화면의 읽음 표시 갱신용)"""
+    await broker.publish({"user_ids": user_ids, "receipt": receipt.model_dump()})
+
+
+async def deliver_chat_event(event: dict):
+    """브로커에서 받은 이벤트를 이 워커에 연결된 사용자에게 전달"""
+    receipt = event.get("receipt")
+    if receipt is not None:
+        await manager.send_to_room(event["user_ids"], receipt["room_id"], {"type": "read_receipt", **receipt})
+        return
+
+    payload = event.get("message")
+    if payload is None:
+        payload = await run_db(_load_chat_message_payload, event["message_id"])
+        if payload is None:
+            return
+    await manager.send_to_room(event["user_ids"], payload["room_id"], payload)
+
+
+async def start_chat_workers():
+    await broker.start(deliver_chat_event)
+    if chat_writer is not None:
+        await chat_writer.start()
+
+
+async def stop_chat_workers():
+    if chat_writer is not None:
+        await chat_writer.stop()
+    await broker.stop()
+
+
+def build_chat_room_read(room: ChatRoom, current_user_id: int, friend_name: Optional[str]) -> ChatRoomRead:
+    """채팅방 비정규화 필드로 응답 생성 (추가 쿼리 없음)"""
+    friend_id = room.user2_id if room.user1_id == current_user_id else room.user1_id
+    return ChatRoomRead(
+        id=room.id,
+        user1_id=room.user1_id,
+        user2_id=room.user2_id,
+        friend_id=friend_id,
+        friend_name=friend_name if friend_name is not None else "Unknown",
+        last_message=room.last_message_preview,
+        last_message_time=room.updated_at.isoformat() if room.last_message_id else None,
+        unread_count=get_unread_count(room, current_user_id),
+        created_at=room.created_at.isoformat()
+    )
 
 
 # ------------------------------------------------------
@@ -50,118 +193,68 @@ def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
 @router.post("/rooms", response_model=ChatRoomRead)
 def create_or_get_chat_room(
     data: ChatRoomCreate,
-    current_user_id: int = Depends(get_current_user_id)
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session)
 ):
     """
     친구와의 채팅방을 생성하거나 기존 채팅방을 반환합니다.
     """
-    with Session(engine) as session:
-        friend_id = data.friend_id
-        
-        # 자기 자신과는 채팅 불가
-        if current_user_id == friend_id:
-            raise HTTPException(status_code=400, detail="Cannot chat with yourself")
-        
-        # 기존 채팅방 확인 (user1_id와 user2_id 순서 무관)
-        statement = select(ChatRoom).where(
-            ((ChatRoom.user1_id == current_user_id) & (ChatRoom.user2_id == friend_id)) |
-            ((ChatRoom.user1_id == friend_id) & (ChatRoom.user2_id == current_user_id))
-        )
-        existing_room = session.exec(statement).first()
-        
-        if existing_room:
-            room = existing_room
-        else:
-            # 새 채팅방 생성
-            room = ChatRoom(
-                user1_id=current_user_id,
-                user2_id=friend_id
-            )
-            session.add(room)
-            session.commit()
-            session.refresh(room)
-        
-        # 상대방 정보 조회
-        friend = session.get(User, friend_id)
-        friend_name = friend.name if friend else "Unknown"
-        
-        # 마지막 메시지 조회
-        last_msg_statement = select(ChatMessage).where(
-            ChatMessage.room_id == room.id
-        ).order_by(ChatMessage.created_at.desc()).limit(1)
-        last_message = session.exec(last_msg_statement).first()
-        
-        # 읽지 않은 메시지 수 (상대방이 보낸 메시지 중 내가 안 읽은 것)
-        unread_statement = select(ChatMessage).where(
-            ChatMessage.room_id == room.id,
-            ChatMessage.sender_id == friend_id,
-            ChatMessage.is_read == False
-        )
-        unread_count = len(session.exec(unread_statement).all())
-        
-        return ChatRoomRead(
-            id=room.id,
-            user1_id=room.user1_id,
-            user2_id=room.user2_id,
-            friend_id=friend_id,
-            friend_name=friend_name,
-            last_message=last_message.content if last_message else None,
-            last_message_time=last_message.created_at.isoformat() if last_message else None,
-            unread_count=unread_count,
-            created_at=room.created_at.isoformat()
+    friend_id = data.friend_id
+    
+    # 자기 자신과는 채팅 불가
+    if current_user_id == friend_id:
+        raise HTTPException(status_code=400, detail="Cannot chat with yourself")
+    
+    # 기존 채팅방 확인 (user1_id와 user2_id 순서 무관)
+    statement = select(ChatRoom).where(
+        ((ChatRoom.user1_id == current_user_id) & (ChatRoom.user2_id == friend_id)) |
+        ((ChatRoom.user1_id == friend_id) & (ChatRoom.user2_id == current_user_id))
+    )
+    existing_room = session.exec(statement).first()
+    
+    if existing_room:
+        room = existing_room
+    else:
+        # 새 채팅방 생성
+        room = ChatRoom(
+            user1_id=current_user_id,
+            user2_id=friend_id
         )
+        session.add(room)
+        session.commit()
+        session.refresh(room)
+    
+    # 상대방 정보 조회
+    friend = session.get(User, friend_id)
+    
+    return build_chat_room_read(room, current_user_id, friend.name if friend else None)
 
 
 # ------------------------------------------------------
 # 2. 내 채팅방 목록 조회
 # ------------------------------------------------------
 @router.get("/rooms", response_model=List[ChatRoomRead])
-def get_my_chat_rooms(current_user_id: int = Depends(get_current_user_id)):
+def get_my_chat_rooms(current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
     """
     내가 참여한 모든 채팅방 목록을 반환합니다.
+    (마지막 메시지 / 안 읽은 수는 채팅방에 비정규화되어 있어 상대방 이름과 함께 쿼리 1번으로 조회)
     """
-    with Session(engine) as session:
-        # 내가 user1 또는 user2인 채팅방 조회
-        statement = select(ChatRoom).where(
-            (ChatRoom.user1_id == current_user_id) | (ChatRoom.user2_id == current_user_id)
-        ).order_by(ChatRoom.updated_at.desc())
-        
-        rooms = session.exec(statement).all()
-        result = []
-        
-        for room in rooms:
-            # 상대방 ID 찾기
-            friend_id = room.user2_id if room.user1_id == current_user_id else room.user1_id
-            friend = session.get(User, friend_id)
-            friend_name = friend.name if friend else "Unknown"
-            
-            # 마지막 메시지 조회
-            last_msg_statement = select(ChatMessage).where(
-                ChatMessage.room_id == room.id
-            ).order_by(ChatMessage.created_at.desc()).limit(1)
-            last_message = session.exec(last_msg_statement).first()
-            
-            # 읽지 않은 메시지 수
-            unread_statement = select(ChatMessage).where(
-                ChatMessage.room_id == room.id,
-                ChatMessage.sender_id == friend_id,
-                ChatMessage.is_read == False
-            )
-            unread_count = len(session.exec(unread_statement).all())
-            
-            result.append(ChatRoomRead(
-                id=room.id,
-                user1_id=room.user1_id,
-                user2_id=room.user2_id,
-                friend_id=friend_id,
-                friend_name=friend_name,
-                last_message=last_message.content if last_message else None,
-                last_message_time=last_message.created_at.isoformat() if last_message else None,
-                unread_count=unread_count,
-                created_at=room.created_at.isoformat()
-            ))
-        
-        return result
+    # 내가 user1 또는 user2인 채팅방 + 상대방 이름
+    friend_id_expr = case(
+        (ChatRoom.user1_id == current_user_id, ChatRoom.user2_id),
+        else_=ChatRoom.user1_id
+    )
+    statement = (
+        select(ChatRoom, User.name)
+        .outerjoin(User, User.id == friend_id_expr)
+        .where((ChatRoom.user1_id == current_user_id) | (ChatRoom.user2_id == current_user_id))
+        .order_by(ChatRoom.updated_at.desc())
+    )
+    
+    return [
+        build_chat_room_read(room, current_user_id, friend_name)
+        for room, friend_name in session.exec(statement).all()
+    ]
 
 
 # ------------------------------------------------------
@@ -170,45 +263,103 @@ def get_my_chat_rooms(current_user_id: int = Depends(get_current_user_id)):
 @router.get("/rooms/{room_id}/messages", response_model=List[ChatMessageRead])
 def get_chat_messages(
     room_id: int,
-    current_user_id: int = Depends(get_current_user_id)
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_SIZE_MAX),
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session)
 ):
     """
-    특정 채팅방의 모든 메시지를 조회합니다.
+    특정 채팅방의 메시지를 커서 기반으로 조회합니다. (항상 오래된 순으로 반환)
+    - after_id: 이 ID 이후의 새 메시지만 조회 (폴링용)
+    - before_id: 이 ID 이전의 메시지를 최신순으로 limit개 조회 (위로 스크롤 시 과거 메시지 로드)
+    - 둘 다 없으면 가장 최근 메시지 limit개를 반환
     """
-    with Session(engine) as session:
-        # 채팅방 권한 확인
-        room = session.get(ChatRoom, room_id)
-        if not room:
-            raise HTTPException(status_code=404, detail="Chat room not found")
-        
-        if room.user1_id != current_user_id and room.user2_id != current_user_id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-        
-        # 메시지 조회
-        statement = select(ChatMessage).where(
-            ChatMessage.room_id == room_id
-        ).order_by(ChatMessage.created_at.asc())
-        
-        messages = session.exec(statement).all()
-        
-        # 상대방이 보낸 메시지를 읽음 처리
-        for msg in messages:
-            if msg.sender_id != current_user_id and not msg.is_read:
-                msg.is_read = True
-        
-        session.commit()
-        
-        return [
-            ChatMessageRead(
-                id=msg.id,
-                room_id=msg.room_id,
-                sender_id=msg.sender_id,
-                content=msg.content,
-                is_read=msg.is_read,
-                created_at=msg.created_at.isoformat()
-            )
-            for msg in messages
-        ]
+    if after_id is not None and before_id is not None:
+        raise HTTPException(status_code=400, detail="Use either after_id or before_id, not both")
+
+    # 채팅방 권한 확인
+    room = session.get(ChatRoom, room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    
+    if room.user1_id != current_user_id and room.user2_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # 메시지 조회 ((room_id, id) 인덱스를 타는 범위 조회)
+    statement = select(ChatMessage).where(ChatMessage.room_id == room_id)
+    if after_id is not None:
+        statement = statement.where(ChatMessage.id > after_id).order_by(ChatMessage.id.asc())
+    else:
+        if before_id is not None:
+            statement = statement.where(ChatMessage.id < before_id)
+        statement = statement.order_by(ChatMessage.id.desc())
+    
+    messages = list(session.exec(statement.limit(limit)).all())
+    if after_id is None:
+        messages.reverse()
+    
+    # 읽음 여부는 받는 사람의 읽음 워터마크로 판단 (조회는 DB에 쓰지 않음, 읽음 처리는 POST /read)
+    friend_id = room.user2_id if room.user1_id == current_user_id else room.user1_id
+    my_last_read = get_last_read_message_id(room, current_user_id) or 0
+    friend_last_read = get_last_read_message_id(room, friend_id) or 0
+    
+    return [
+        ChatMessageRead(
+            id=msg.id,
+            room_id=msg.room_id,
+            sender_id=msg.sender_id,
+            content=msg.content,
+            is_read=msg.id <= (friend_last_read if msg.sender_id == current_user_id else my_last_read),
+            created_at=msg.created_at.isoformat()
+        )
+        for msg in messages
+    ]
+
+
+# ------------------------------------------------------
+# 3-1. 읽음 처리
+# ------------------------------------------------------
+def _apply_read_receipt(session: Session, room: ChatRoom, user_id: int, up_to_message_id: int) -> ChatReadReceiptRead:
+    mark_chat_room_read(session, room, user_id, up_to_message_id)
+    session.commit()
+    session.refresh(room)
+    
+    friend_id = room.user2_id if room.user1_id == user_id else room.user1_id
+    return ChatReadReceiptRead(
+        room_id=room.id,
+        user_id=user_id,
+        last_read_message_id=get_last_read_message_id(room, user_id),
+        friend_last_read_message_id=get_last_read_message_id(room, friend_id),
+        unread_count=get_unread_count(room, user_id)
+    )
+
+
+@router.post("/rooms/{room_id}/read", response_model=ChatReadReceiptRead)
+def mark_chat_messages_read(
+    room_id: int,
+    data: ChatReadReceiptCreate,
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session)
+):
+    """
+    up_to_message_id까지의 메시지를 읽음 처리합니다.
+    메시지 행을 하나씩 바꾸지 않고 채팅방의 읽음 워터마크만 올립니다.
+    """
+    room = session.get(ChatRoom, room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    
+    if room.user1_id != current_user_id and room.user2_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    receipt = _apply_read_receipt(session, room, current_user_id, data.up_to_message_id)
+    user_ids = [room.user1_id, room.user2_id]
+    
+    # 상대방(과 내 다른 기기)의 WebSocket으로 읽음 알림
+    anyio.from_thread.run(publish_read_receipt, user_ids, receipt)
+    
+    return receipt
 
 
 # ------------------------------------------------------
@@ -218,70 +369,113 @@ def get_chat_messages(
 def send_chat_message(
     room_id: int,
     data: ChatMessageCreate,
-    current_user_id: int = Depends(get_current_user_id)
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session)
 ):
     """
     채팅방에 메시지를 전송합니다.
     """
-    with Session(engine) as session:
-        # 채팅방 권한 확인
-        room = session.get(ChatRoom, room_id)
-        if not room:
-            raise HTTPException(status_code=404, detail="Chat room not found")
-        
-        if room.user1_id != current_user_id and room.user2_id != current_user_id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-        
-        # 메시지 생성
-        message = ChatMessage(
-            room_id=room_id,
-            sender_id=current_user_id,
-            content=data.content
-        )
-        session.add(message)
-        
-        # 채팅방 업데이트 시간 갱신 (한국 시간)
-        room.updated_at = get_kst_now()
-        
-        session.commit()
-        session.refresh(message)
-        
-        return ChatMessageRead(
-            id=message.id,
-            room_id=message.room_id,
-            sender_id=message.sender_id,
-            content=message.content,
-            is_read=message.is_read,
-            created_at=message.created_at.isoformat()
-        )
+    # 채팅방 권한 확인
+    room = session.get(ChatRoom, room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    
+    if room.user1_id != current_user_id and room.user2_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # 메시지 생성
+    message = ChatMessage(
+        room_id=room_id,
+        sender_id=current_user_id,
+        content=data.content
+    )
+    session.add(message)
+    
+    # 채팅방 마지막 메시지 / 상대방 안 읽은 수 갱신 (같은 트랜잭션)
+    record_chat_message(session, room, message)
+    
+    session.commit()
+    session.refresh(message)
+    
+    # 웹소켓으로 연결된 참여자들에게 전달 (다른 워커 포함)
+    anyio.from_thread.run(
+        publish_chat_message, [room.user1_id, room.user2_id], chat_message_payload(message)
+    )
+    
+    return ChatMessageRead(
+        id=message.id,
+        room_id=message.room_id,
+        sender_id=message.sender_id,
+        content=message.content,
+        is_read=message.is_read,
+        created_at=message.created_at.isoformat()
+    )
 
 
 @router.delete("/rooms/{room_id}")
 def delete_chat_room(
     room_id: int,
-    current_user_id: int = Depends(get_current_user_id)
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session)
 ):
     """채팅방 나가기 (삭제)"""
+    room = session.get(ChatRoom, room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+    
+    # 참여자 확인
+    if current_user_id != room.user1_id and current_user_id != room.user2_id:
+        raise HTTPException(status_code=403, detail="이 채팅방의 참여자가 아닙니다")
+    
+    # 채팅방과 관련된 모든 메시지 삭제
+    messages_statement = select(ChatMessage).where(ChatMessage.room_id == room_id)
+    messages = session.exec(messages_statement).all()
+    for message in messages:
+        session.delete(message)
+    
+    # 채팅방 삭제
+    session.delete(room)
+    session.commit()
+    
+    return {"message": "채팅방이 삭제되었습니다"}
+
+
+def _get_chat_friend_id(room_id: int, user_id: int) -> Optional[int]:
+    """채팅방 참여자면 상대방 ID, 아니면 None"""
     with Session(engine) as session:
         room = session.get(ChatRoom, room_id)
-        if not room:
-            raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
-        
-        # 참여자 확인
-        if current_user_id != room.user1_id and current_user_id != room.user2_id:
-            raise HTTPException(status_code=403, detail="이 채팅방의 참여자가 아닙니다")
+        if not room or (room.user1_id != user_id and room.user2_id != user_id):
+            return None
+        return room.user2_id if room.user1_id == user_id else room.user1_id
+
+
+def _store_read_receipt(room_id: int, user_id: int, up_to_message_id: int) -> Optional[ChatReadReceiptRead]:
+    """WebSocket 읽음 처리 (참여자가 아니면 None)"""
+    with Session(engine) as session:
+        room = session.get(ChatRoom, room_id)
+        if not room or (room.user1_id != user_id and room.user2_id != user_id):
+            return None
+        return _apply_read_receipt(session, room, user_id, up_to_message_id)
+
+
+def _store_chat_message(room_id: int, sender_id: int, content: str) -> dict:
+    """메시지를 저장하고 WebSocket 전송용 데이터를 반환"""
+    with Session(engine) as session:
+        message = ChatMessage(
+            room_id=room_id,
+            sender_id=sender_id,
+            content=content
+        )
+        session.add(message)
         
-        # 채팅방과 관련된 모든 메시지 삭제
-        messages_statement = select(ChatMessage).where(ChatMessage.room_id == room_id)
-        messages = session.exec(messages_statement).all()
-        for message in messages:
-            session.delete(message)
+        # 채팅방 마지막 메시지 / 상대방 안 읽은 수 갱신 (같은 트랜잭션)
+        room = session.get(ChatRoom, room_id)
+        record_chat_message(session, room, message)
         
-        # 채팅방 삭제
-        session.delete(room)
         session.commit()
+        session.refresh(message)
         
-        return {"message": "채팅방이 삭제되었습니다"}
+        return chat_message_payload(message)
 
 
 # ------------------------------------------------------
@@ -292,76 +486,70 @@ async def websocket_chat(websocket: WebSocket, room_id: int, token: str):
     """
     WebSocket을 통한 실시간 채팅
     사용법: ws://localhost:8000/chat/ws/{room_id}?token=YOUR_JWT_TOKEN
+    - 메시지 전송: {"content": "..."}
+    - 읽음 처리: {"type": "read", "up_to_message_id": 123} → 양쪽에 {"type": "read_receipt", ...} 전달
+    - 저장 실패: 보낸 사람에게만 {"type": "error", "detail": ..., "content": 보낸 내용}
+    - 잘못된 읽음 처리 요청 / 실패: 보낸 사람에게만 {"type": "error", "detail": ...}
     """
     # 토큰 검증
-    try:
-        payload = decode_access_token(token)
-        user_id = payload.get("user_id")
-        if not user_id:
-            await websocket.close(code=1008)
-            return
-    except:
+    principal = get_token_principal(token)
+    if principal is None:
         await websocket.close(code=1008)
         return
+    user_id = principal.user_id
     
-    # 채팅방 권한 확인
-    with Session(engine) as session:
-        room = session.get(ChatRoom, room_id)
-        if not room:
-            await websocket.close(code=1008)
-            return
-        
-        if room.user1_id != user_id and room.user2_id != user_id:
-            await websocket.close(code=1008)
-            return
-        
-        # 상대방 ID
-        friend_id = room.user2_id if room.user1_id == user_id else room.user1_id
+    # 채팅방 권한 확인 (DB 작업은 이벤트 루프 밖에서)
+    friend_id = await run_db(_get_chat_friend_id, room_id, user_id)
+    if friend_id is None:
+        await websocket.close(code=1008)
+        return
     
     # WebSocket 연결
-    await manager.connect(user_id, websocket)
+    await manager.connect(user_id, room_id, websocket)
     
     try:
         while True:
             # 메시지 수신
             data = await websocket.receive_json()
+            
+            # 읽음 처리: {"type": "read", "up_to_message_id": 123}
+            if data.get("type") == "read":
+                up_to_message_id = data.get("up_to_message_id")
+                if not isinstance(up_to_message_id, int) or isinstance(up_to_message_id, bool) or up_to_message_id <= 0:
+                    await websocket.send_json({"type": "error", "detail": "up_to_message_id must be a positive integer"})
+                    continue
+                try:
+                    receipt = await run_db(_store_read_receipt, room_id, user_id, up_to_message_id)
+                except Exception as exc:
+                    print(f"[chat] read receipt from user {user_id} in room {room_id} was not saved: {exc}")
+                    await websocket.send_json({"type": "error", "detail": "read receipt could not be saved"})
+                    continue
+                if receipt is not None:
+                    await publish_read_receipt([user_id, friend_id], receipt)
+                continue
+            
             content = data.get("content")
             
             if not content:
                 continue
             
-            # DB에 메시지 저장
-            with Session(engine) as session:
-                message = ChatMessage(
-                    room_id=room_id,
-                    sender_id=user_id,
-                    content=content
-                )
-                session.add(message)
-                
-                # 채팅방 업데이트 시간 갱신 (한국 시간)
-                room = session.get(ChatRoom, room_id)
-                room.updated_at = get_kst_now()
-                
-                session.commit()
-                session.refresh(message)
-                
-                # 응답 데이터
-                response = {
-                    "id": message.id,
-                    "room_id": message.room_id,
-                    "sender_id": message.sender_id,
-                    "content": message.content,
-                    "is_read": message.is_read,
-                    "created_at": message.created_at.isoformat()
-                }
-                
-                # 본인에게 전송
-                await manager.send_message(user_id, response)
-                
-                # 상대방에게 전송 (온라인이면)
-                await manager.send_message(friend_id, response)
+            # DB에 메시지 저장 (배치 모드면 다른 메시지들과 함께 커밋된 뒤 반환)
+            # 저장 실패는 연결을 끊지 않고 보낸 사람에게만 알림 (클라이언트가 다시 보낼 수 있게)
+            try:
+                if chat_writer is not None:
+                    response = chat_message_payload(await chat_writer.submit(room_id, user_id, content))
+                else:
+                    response = await run_db(_store_chat_message, room_id, user_id, content)
+            except Exception as exc:
+                print(f"[chat] message from user {user_id} in room {room_id} was not saved: {exc}")
+                await websocket.send_json({"type": "error", "detail": "message could not be saved", "content": content})
+                continue
+            
+            # 본인과 상대방에게 전송 (브로커를 통해 다른 워커에 연결된 경우도 전달)
+            await publish_chat_message([user_id, friend_id], response)
     
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        pass
+    finally:
+        manager.disconnect(websocket)
 
@@ -1,37 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from sqlalchemy import tuple_, update
+from ..feed_cache import feed_cache, post_scopes
 from ..schemas import CommentCreate, CommentRead
 from ..models import Comment, Post, User
-from ..db import engine
+from ..db import get_session
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from sqlmodel import Session, select
-from ..routers.users import get_current_user
+from ..routers.users import get_current_user_id
 
 router = APIRouter(tags=["comments"])
 
+# 💬 댓글 페이지 크기 (기본 / 최대)
+COMMENT_PAGE_SIZE = 100
+COMMENT_PAGE_SIZE_MAX = 500
+
 
 @router.post("/posts/{post_id}/comments", response_model=CommentRead)
-def create_comment(post_id: int, payload: CommentCreate, current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
-        statement = select(Post).where(Post.id == post_id)
-        post = session.exec(statement).first()
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
-        comment = Comment(post_id=post_id, user_id=current_user.id, content=payload.content)
-        session.add(comment)
-        session.commit()
-        session.refresh(comment)
-        author = session.get(User, comment.user_id)
-        return CommentRead(id=comment.id, post_id=comment.post_id, user_id=comment.user_id, content=comment.content, user_name=author.name if author else None, created_at=comment.created_at.isoformat())
+def create_comment(post_id: int, payload: CommentCreate, current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    statement = select(Post).where(Post.id == post_id)
+    post = session.exec(statement).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    comment = Comment(post_id=post_id, user_id=current_user_id, content=payload.content)
+    session.add(comment)
+    # 댓글 수는 같은 트랜잭션에서 SQL 식으로 증가 (동시 작성에도 누락 없음)
+    session.execute(update(Post).where(Post.id == post_id).values(comment_count=Post.comment_count + 1))
+    session.commit()
+    session.refresh(comment)
+    feed_cache.invalidate(post_scopes(post.community_id))
+    author = session.get(User, comment.user_id)
+    return CommentRead(id=comment.id, post_id=comment.post_id, user_id=comment.user_id, content=comment.content, user_name=author.name if author else None, created_at=comment.created_at.isoformat())
 
 
 @router.get("/posts/{post_id}/comments", response_model=List[CommentRead])
-def list_comments(post_id: int):
-    with Session(engine) as session:
-        statement = select(Comment).where(Comment.post_id == post_id).order_by(Comment.created_at.asc())
-        rows = session.exec(statement).all()
-        results = []
-        for r in rows:
-            author = session.get(User, r.user_id)
-            results.append(CommentRead(id=r.id, post_id=r.post_id, user_id=r.user_id, content=r.content, user_name=author.name if author else None, created_at=r.created_at.isoformat()))
+def list_comments(
+    post_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=COMMENT_PAGE_SIZE_MAX),
+    session: Session = Depends(get_session),
+):
+    """
+    작성순 댓글 목록 (작성자 이름 포함, 쿼리 1번)
+    - cursor: 이전 응답의 X-Next-Cursor 헤더 값 → 그 다음 댓글부터
+    """
+    statement = (
+        select(Comment, User.name)
+        .outerjoin(User, User.id == Comment.user_id)
+        .where(Comment.post_id == post_id)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Comment.created_at, Comment.id) > tuple_(cursor_created_at, cursor_id))
+    # 한 건 더 읽어서 다음 페이지가 있는지 확인
+    statement = statement.order_by(Comment.created_at.asc(), Comment.id.asc()).limit(limit + 1)
+    rows = session.exec(statement).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
 
-        return results
+    return [
+        CommentRead(id=r.id, post_id=r.post_id, user_id=r.user_id, content=r.content, user_name=user_name, created_at=r.created_at.isoformat())
+        for r, user_name in rows
+    ]
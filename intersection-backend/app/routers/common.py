@@ -1,26 +1,99 @@
-from fastapi import APIRouter, UploadFile, File
-import shutil
-import os
-import uuid
+import asyncio
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from ..config import settings
+from ..image_variants import image_variant_worker
+from ..routers.users import get_current_user_id
+from ..schemas import DirectUploadRequest, DirectUploadResponse
+from ..uploads import (
+    MULTIPART_OVERHEAD_BYTES, MultipartFileStream, UploadRejected, UploadTooLarge,
+    complete_direct_upload, presign_direct_upload, store_upload,
+)
 
 router = APIRouter(tags=["common"])
 
-UPLOAD_DIR = "uploads"
+# 본문을 직접 파싱하므로 문서(OpenAPI)에 multipart 요청 형식을 따로 적어 둠
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+@router.post("/upload", openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_file(request: Request):
     """
     이미지 파일을 업로드하면, 접속 가능한 URL을 반환해주는 API
+    (multipart/form-data 의 file 필드, 본문을 받는 대로 저장하며 크기 제한을 넘으면 바로 413)
+    """
+    # 1. 요청 크기가 이미 제한을 넘으면 바로 거절
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large (max {settings.UPLOAD_MAX_BYTES} bytes)")
+
+    # 2. 디스크에 나눠 쓰면서 sha256 계산 → 내용 해시 경로에 저장 (같은 내용이면 기존 파일 재사용)
+    # 예: my_photo.jpg -> ab/cd/abcd…ef.jpg
+    try:
+        upload = MultipartFileStream(request)
+        stored = await store_upload(upload)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=f"File too large (max {exc.max_bytes} bytes)")
+    except UploadRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # 3. 새 이미지면 썸네일/WebP 축소본을 백그라운드에서 생성 (응답은 기다리지 않음)
+    if not stored.deduplicated:
+        image_variant_worker.schedule(stored.sha256, stored.path, upload.content_type)
+
+    # 4. 접속 가능한 URL 반환
+    # (local 저장소는 상대 경로, s3 저장소는 S3_PUBLIC_URL 기준 절대 URL)
+    return {"url": stored.url}
+
+
+# ------------------------------------------------------
+# 저장소 직접 업로드 (UPLOAD_STORAGE=s3)
+# 1) POST /upload/presign → upload 요청 그대로 저장소에 PUT (upload가 null이면 이미 있는 파일)
+# 2) POST /upload/complete → 저장소에 올라간 파일 확인 후 URL 확정
+# ------------------------------------------------------
+async def _run_direct_upload(func, data: DirectUploadRequest):
+    # 저장소/DB 호출이 섞여 있으므로 스레드에서 실행
+    try:
+        return await asyncio.to_thread(func, data.sha256, data.size, data.content_type, data.filename)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=f"File too large (max {exc.max_bytes} bytes)")
+    except UploadRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.post("/upload/presign", response_model=DirectUploadResponse)
+async def presign_upload(data: DirectUploadRequest, current_user_id: int = Depends(get_current_user_id)):
+    """
+    저장소 직접 업로드용 서명된 URL 발급 (이미지 바이트가 API 서버를 거치지 않음)
+    """
+    stored, presigned = await _run_direct_upload(presign_direct_upload, data)
+    return DirectUploadResponse(
+        url=stored.url,
+        deduplicated=stored.deduplicated,
+        upload=asdict(presigned) if presigned else None,
+    )
+
+
+@router.post("/upload/complete", response_model=DirectUploadResponse)
+async def complete_upload(data: DirectUploadRequest, current_user_id: int = Depends(get_current_user_id)):
+    """
+    직접 업로드 완료 확인 (저장소에 파일이 있어야 함) → URL 반환 + 변형 생성 예약
     """
-    # 1. 파일 이름이 겹치지 않게 랜덤 ID 생성 (uuid)
-    # 예: my_photo.jpg -> uuid-uuid.jpg
-    filename = f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}"
-    file_location = os.path.join(UPLOAD_DIR, filename)
-    
-    # 2. 서버 디스크에 파일 저장
-    with open(file_location, "wb+") as file_object:
-        shutil.copyfileobj(file.file, file_object)
-    
-    # 3. 접속 가능한 URL 반환
-    # (주의: 실제 배포 시에는 도메인 주소로 변경 필요, 지금은 상대 경로)
-    return {"url": f"/uploads/{filename}"}
\ No newline at end of file
+    stored = await _run_direct_upload(complete_direct_upload, data)
+    if not stored.deduplicated:
+        image_variant_worker.schedule(stored.sha256, stored.path, data.content_type)
+    return DirectUploadResponse(url=stored.url, deduplicated=stored.deduplicated)
@@ -1,50 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
 from ..models import User, UserFriendship, UserBlock
-from ..db import engine
+from ..db import get_session
 from sqlmodel import Session, select
-from ..routers.users import get_current_user
+from ..routers.users import build_user_read, get_current_user_id
+from ..image_variants import get_image_variants
 from ..schemas import UserRead
+from ..services import recommendation_cache
 
 router = APIRouter(tags=["friends"])
 
+# 👥 친구 목록 페이지 크기 (기본 / 최대)
+FRIEND_PAGE_SIZE = 100
+FRIEND_PAGE_SIZE_MAX = 500
+
 
 @router.post("/friends/{target_user_id}")
-def add_friend(target_user_id: int, current_user: User = Depends(get_current_user)):
-    if current_user.id == target_user_id:
+def add_friend(target_user_id: int, current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    if current_user_id == target_user_id:
         raise HTTPException(status_code=400, detail="Cannot add yourself")
 
-    with Session(engine) as session:
-        # check if target exists
-        statement = select(User).where(User.id == target_user_id)
-        target = session.exec(statement).first()
-        if not target:
-            raise HTTPException(status_code=404, detail="Target user not found")
+    # check if target exists
+    target = session.get(User, target_user_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="Target user not found")
 
-        # create friendship (simple, auto-accepted)
-        friendship = UserFriendship(user_id=current_user.id, friend_user_id=target_user_id)
-        session.add(friendship)
-        session.commit()
-        session.refresh(friendship)
+    # 이미 친구면 그대로 성공 (버튼을 여러 번 눌러도 중복 행이 생기지 않음)
+    statement = select(UserFriendship.id).where(
+        UserFriendship.user_id == current_user_id,
+        UserFriendship.friend_user_id == target_user_id,
+    )
+    if session.exec(statement).first() is not None:
         return {"ok": True}
 
+    # create friendship (simple, auto-accepted)
+    friendship = UserFriendship(user_id=current_user_id, friend_user_id=target_user_id)
+    session.add(friendship)
+    try:
+        session.commit()
+    except IntegrityError:
+        # 동시에 들어온 같은 요청이 먼저 저장함 (unique 제약)
+        session.rollback()
+    recommendation_cache.invalidate(current_user_id)
+    return {"ok": True}
+
 
 @router.get("/friends/me", response_model=list[UserRead])
-def list_friends(current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
-        # 차단한 사용자 ID 목록 조회
-        blocked_statement = select(UserBlock.blocked_user_id).where(
-            UserBlock.user_id == current_user.id
-        )
-        blocked_ids = [row for row in session.exec(blocked_statement).all()]
-        
-        statement = select(UserFriendship).where(UserFriendship.user_id == current_user.id)
-        rows = session.exec(statement).all()
-        friends = []
-        for row in rows:
-            # 차단한 사용자는 제외
-            if row.friend_user_id in blocked_ids:
-                continue
-            u = session.get(User, row.friend_user_id)
-            if u:
-                friends.append(UserRead(id=u.id, name=u.name, birth_year=u.birth_year, region=u.region, school_name=u.school_name))
-        return friends
+def list_friends(
+    after_id: Optional[int] = None,
+    limit: int = Query(FRIEND_PAGE_SIZE, ge=1, le=FRIEND_PAGE_SIZE_MAX),
+    current_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    """
+    내 친구 목록 (차단한 사용자 제외, 사용자 ID 순)
+    - after_id: 이전 페이지 마지막 친구의 ID → 그 다음부터
+    친구 관계 + 사용자 + 차단 여부(NOT EXISTS)를 쿼리 1번으로 조회합니다.
+    """
+    blocked = exists().where(
+        UserBlock.user_id == current_user_id,
+        UserBlock.blocked_user_id == UserFriendship.friend_user_id,
+    )
+    statement = (
+        select(User)
+        .join(UserFriendship, UserFriendship.friend_user_id == User.id)
+        .where(UserFriendship.user_id == current_user_id, ~blocked)
+    )
+    if after_id is not None:
+        statement = statement.where(UserFriendship.friend_user_id > after_id)
+    statement = statement.order_by(UserFriendship.friend_user_id).limit(limit)
+
+    friends = session.exec(statement).all()
+    variants = get_image_variants(session, [url for u in friends for url in (u.profile_image, u.background_image)])
+    return [build_user_read(u, variants) for u in friends]
@@ -1,57 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from ..schemas import PostCreate, PostRead
-from ..models import Post, User
-from ..db import engine
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy import delete, tuple_
+from ..feed_cache import FeedPage, feed_cache, feed_scope, post_scopes
+from ..image_variants import get_image_variants
+from ..schemas import ImageVariants, PostAuthor, PostCreate, PostRead
+from ..models import Comment, Post, User
+from ..db import get_session
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from sqlmodel import Session, select
-from ..routers.users import get_current_user
+from ..routers.users import get_current_user_id
 
 router = APIRouter(tags=["posts"])
 
+# 📰 피드 페이지 크기 (기본 / 최대)
+FEED_PAGE_SIZE = 20
+FEED_PAGE_SIZE_MAX = 100
+
+post_list_adapter = TypeAdapter(List[PostRead])
+
+
+def build_post_read(post: Post, author: Optional[User] = None, variants: Optional[dict[str, ImageVariants]] = None) -> PostRead:
+    """Post (+ 작성자) → PostRead (author가 없으면 작성자 요약 생략, variants는 get_image_variants 결과)"""
+    variants = variants or {}
+    return PostRead(
+        id=post.id,
+        author_id=post.author_id,
+        community_id=post.community_id,
+        content=post.content,
+        image_url=post.image_url,
+        image_variants=variants.get(post.image_url),
+        created_at=post.created_at.isoformat(),
+        author=PostAuthor(
+            id=author.id,
+            name=author.name,
+            nickname=author.nickname,
+            profile_image=author.profile_image,
+            profile_image_variants=variants.get(author.profile_image),
+            school_name=author.school_name,
+            region=author.region,
+        ) if author else None,
+        comment_count=post.comment_count,
+    )
+
 
 @router.post("/users/me/posts/", response_model=PostRead)
-def create_post(payload: PostCreate, current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
-        post = Post(author_id=current_user.id, content=payload.content)
-        session.add(post)
-        session.commit()
-        session.refresh(post)
-        return PostRead(id=post.id, author_id=post.author_id, content=post.content, created_at=post.created_at.isoformat())
+def create_post(payload: PostCreate, current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    # 작성자의 현재 커뮤니티를 INSERT 안의 서브쿼리로 채움 (User 조회 왕복 없음)
+    community_id = select(User.community_id).where(User.id == current_user_id).scalar_subquery()
+    post = Post(author_id=current_user_id, community_id=community_id, content=payload.content, image_url=payload.image_url)
+    session.add(post)
+    session.commit()
+    session.refresh(post)
+    feed_cache.invalidate(post_scopes(post.community_id))
+    author = session.get(User, post.author_id)
+    variants = get_image_variants(session, [post.image_url, author.profile_image if author else None])
+    return build_post_read(post, author, variants)
 
 
 @router.get("/posts/", response_model=List[PostRead])
-def list_posts():
-    with Session(engine) as session:
-        statement = select(Post).order_by(Post.created_at.desc()).limit(100)
-        posts = session.exec(statement).all()
-        return [PostRead(id=p.id, author_id=p.author_id, content=p.content, created_at=p.created_at.isoformat()) for p in posts]
+def list_posts(
+    community_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=FEED_PAGE_SIZE_MAX),
+    include_author: bool = True,
+    session: Session = Depends(get_session),
+):
+    """
+    최신순 피드 (keyset 페이지네이션)
+    - community_id: 해당 커뮤니티 게시글만
+    - cursor: 이전 응답의 X-Next-Cursor 헤더 값 → 그 다음(더 오래된) 게시글부터
+    - include_author: 작성자 요약(author)을 같은 쿼리(JOIN)로 함께 반환 (기본값 true)
+    OFFSET 없이 (created_at, id) 인덱스를 타므로 깊은 페이지도 비용이 같습니다.
+    직렬화된 페이지는 피드 캐시에 저장되어, 게시글이 바뀌기 전까지는 DB를 읽지 않습니다.
+    """
+    scope = feed_scope(community_id)
+    page_key = f"{cursor or ''}:{limit}:{int(include_author)}"
+    generation = feed_cache.generation(scope)
+    page = feed_cache.get(scope, generation, page_key)
+    if page is None:
+        page = _load_feed_page(session, community_id, cursor, limit, include_author)
+        feed_cache.put(scope, generation, page_key, page)
+
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
+def _load_feed_page(session: Session, community_id: Optional[int], cursor: Optional[str], limit: int, include_author: bool) -> FeedPage:
+    if include_author:
+        statement = select(Post, User).outerjoin(User, User.id == Post.author_id)
+    else:
+        statement = select(Post)
+    if community_id is not None:
+        statement = statement.where(Post.community_id == community_id)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Post.created_at, Post.id) < tuple_(cursor_created_at, cursor_id))
+    # 한 건 더 읽어서 다음 페이지가 있는지 확인
+    statement = statement.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+    rows = session.exec(statement).all()
+    if not include_author:
+        rows = [(post, None) for post in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    # 게시글 이미지 / 작성자 프로필 이미지의 축소본 URL (쿼리 최대 1번)
+    variants = get_image_variants(
+        session, [url for post, author in rows for url in (post.image_url, author.profile_image if author else None)]
+    )
+    body = post_list_adapter.dump_json([build_post_read(post, author, variants) for post, author in rows])
+    return FeedPage(body=body, next_cursor=next_cursor)
 
 
 @router.put("/posts/{post_id}", response_model=PostRead)
-def update_post(post_id: int, payload: PostCreate, current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
-        statement = select(Post).where(Post.id == post_id)
-        post = session.exec(statement).first()
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
-        if post.author_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not post author")
-        post.content = payload.content
-        session.add(post)
-        session.commit()
-        session.refresh(post)
-        return PostRead(id=post.id, author_id=post.author_id, content=post.content, created_at=post.created_at.isoformat())
+def update_post(post_id: int, payload: PostCreate, current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    statement = select(Post).where(Post.id == post_id)
+    post = session.exec(statement).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.author_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not post author")
+    post.content = payload.content
+    session.add(post)
+    session.commit()
+    session.refresh(post)
+    feed_cache.invalidate(post_scopes(post.community_id))
+    author = session.get(User, post.author_id)
+    variants = get_image_variants(session, [post.image_url, author.profile_image if author else None])
+    return build_post_read(post, author, variants)
 
 
 @router.delete("/posts/{post_id}")
-def delete_post(post_id: int, current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
-        statement = select(Post).where(Post.id == post_id)
-        post = session.exec(statement).first()
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
-        if post.author_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not post author")
-        session.delete(post)
-        session.commit()
-        return {"ok": True}
+def delete_post(post_id: int, current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    statement = select(Post).where(Post.id == post_id)
+    post = session.exec(statement).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.author_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not post author")
+    community_id = post.community_id
+    # 게시글과 댓글을 한 트랜잭션에서 삭제 (댓글 수 카운터도 게시글과 함께 사라짐)
+    session.execute(delete(Comment).where(Comment.post_id == post_id))
+    session.delete(post)
+    session.commit()
+    feed_cache.invalidate(post_scopes(community_id))
+    return {"ok": True}
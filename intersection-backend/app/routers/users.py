@@ -1,159 +1,217 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional
 from pydantic import BaseModel
-from ..schemas import UserCreate, UserRead, UserUpdate, Token
+from sqlalchemy.exc import IntegrityError
+from ..schemas import ImageVariants, UserCreate, UserRead, UserUpdate, Token
 from ..models import User
-from ..db import engine
+from ..db import engine, get_session, run_db
 from sqlmodel import Session, select
-from ..auth import get_password_hash, verify_password, create_access_token, decode_access_token
+from sqlalchemy import update
+from ..auth import create_access_token, get_token_principal
+from ..password_hasher import password_hasher
+from ..image_variants import get_image_variants
+from ..feed_cache import feed_cache, post_scopes
 from fastapi.security import OAuth2PasswordBearer
 
 # 💡 [수정됨] 추천 함수 get_recommended_friends 추가
-from ..services import assign_community, get_recommended_friends
+from ..services import assign_community, get_recommended_friends, get_snapshot_recommendations, recommendation_cache
 
 router = APIRouter(tags=["users"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 
+def build_user_read(user: User, variants: Optional[dict[str, ImageVariants]] = None) -> UserRead:
+    """User → UserRead (variants: get_image_variants 결과, 없으면 이미지 변형 URL 생략)"""
+    variants = variants or {}
+    return UserRead(
+        id=user.id,
+        name=user.name,
+        birth_year=user.birth_year,
+        region=user.region,
+        school_name=user.school_name,
+        profile_image=user.profile_image,
+        profile_image_variants=variants.get(user.profile_image),
+        background_image=user.background_image,
+        background_image_variants=variants.get(user.background_image),
+    )
+
+
 def get_user_by_id(session: Session, user_id: int) -> Optional[User]:
     statement = select(User).where(User.id == user_id)
     return session.exec(statement).first()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication token")
-    user_id = payload.get("user_id")
-    if not user_id:
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    토큰의 사용자 ID만 반환합니다. (DB 조회 없음)
+    User 행이 필요 없는 엔드포인트는 get_current_user 대신 이 의존성을 사용합니다.
+    """
+    principal = get_token_principal(token)
+    if principal is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication token")
+    return principal.user_id
 
-    with Session(engine) as session:
-        user = get_user_by_id(session, int(user_id))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
+
+def get_current_user(user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)) -> User:
+    """
+    토큰의 사용자를 요청 단위 세션으로 조회합니다.
+    핸들러도 같은 세션(Depends(get_session))을 받으므로 요청당 커넥션 1개만 사용하고,
+    반환된 User로 관계(community 등)도 그대로 조회할 수 있습니다.
+    """
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 
 class LoginRequest(BaseModel):
     email: str
     password: str
 
-@router.post("/token", response_model=Token, tags=["auth"])
-def login_for_token(login_data: LoginRequest):
-    with Session(engine) as session:
-        from sqlalchemy import or_
-        statement = select(User).where(
-            or_(
-                User.email == login_data.email,
-                User.login_id == login_data.email
-            )
+def _get_login_credentials(login: str) -> Optional[tuple[int, Optional[str]]]:
+    """email 또는 login_id로 (user_id, password_hash) 조회"""
+    from sqlalchemy import or_
+    statement = select(User.id, User.password_hash).where(
+        or_(
+            User.email == login,
+            User.login_id == login
         )
-        user = session.exec(statement).first()
-
-        if not user or not verify_password(login_data.password, user.password_hash):
-            raise HTTPException(status_code=401, detail="Incorrect email or password")
-
-        token = create_access_token({"user_id": user.id})
-        return {"access_token": token, "token_type": "bearer"}
+    )
+    with Session(engine) as session:
+        row = session.exec(statement).first()
+    return tuple(row) if row is not None else None
 
 
-@router.post("/users/", response_model=UserRead)
-def create_user(data: UserCreate):
+def _store_rehashed_password(user_id: int, old_hash: str, new_hash: str):
+    """로그인 시 다시 계산한 해시 저장 (그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음)"""
     with Session(engine) as session:
-        statement = select(User).where(User.login_id == data.login_id)
-        exists = session.exec(statement).first()
-        if exists:
-            raise HTTPException(status_code=400, detail="login_id already exists")
-
-        user = User(
-            login_id=data.login_id, 
-            name=data.name, 
-            nickname=data.nickname, 
-            birth_year=data.birth_year, 
-            gender=data.gender,
-            region=data.region, 
-            school_name=data.school_name,
-            school_type=data.school_type,
-            admission_year=data.admission_year,
-            email=data.login_id
+        session.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
         )
-        user.password_hash = get_password_hash(data.password)
-        session.add(user)
         session.commit()
-        session.refresh(user)
 
+
+@router.post("/token", response_model=Token, tags=["auth"])
+async def login_for_token(login_data: LoginRequest):
+    # DB 조회는 DB 스레드 풀, argon2 검증은 비밀번호 해시 프로세스 풀에서 (요청 스레드/이벤트 루프를 막지 않음)
+    credentials = await run_db(_get_login_credentials, login_data.email)
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    user_id, password_hash = credentials
+
+    verified, new_hash = await password_hasher.verify_and_update_async(login_data.password, password_hash)
+    if not verified:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    # 해시 파라미터/방식이 바뀐 경우 새 해시로 교체
+    if new_hash is not None:
+        await run_db(_store_rehashed_password, user_id, password_hash, new_hash)
+
+    token = create_access_token({"user_id": user_id})
+    return {"access_token": token, "token_type": "bearer"}
+
+
+def _create_user(data: UserCreate, password_hash: str) -> UserRead:
+    user = User(
+        login_id=data.login_id, 
+        name=data.name, 
+        nickname=data.nickname, 
+        birth_year=data.birth_year, 
+        gender=data.gender,
+        region=data.region, 
+        school_name=data.school_name,
+        school_type=data.school_type,
+        admission_year=data.admission_year,
+        email=data.login_id
+    )
+    user.password_hash = password_hash
+
+    # 커뮤니티 배정 + 사용자 저장을 한 트랜잭션으로 (login_id 중복은 unique 제약으로 확인)
+    with Session(engine) as session:
         assign_community(session, user)
         session.add(user)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(status_code=400, detail="login_id already exists")
         session.refresh(user)
 
-        return UserRead(id=user.id, name=user.name, birth_year=user.birth_year, region=user.region, school_name=user.school_name)
+        return build_user_read(user)
+
+
+@router.post("/users/", response_model=UserRead)
+async def create_user(data: UserCreate):
+    password_hash = await password_hasher.hash_async(data.password)
+    return await run_db(_create_user, data, password_hash)
 
 
 @router.get("/users/me", response_model=UserRead)
-def get_my_info(current_user: User = Depends(get_current_user)):
-    return UserRead(id=current_user.id, name=current_user.name, birth_year=current_user.birth_year, region=current_user.region, school_name=current_user.school_name)
+def get_my_info(current_user: User = Depends(get_current_user), session: Session = Depends(get_session)):
+    variants = get_image_variants(session, [current_user.profile_image, current_user.background_image])
+    return build_user_read(current_user, variants)
 
 
 # 💡 [수정됨] 추천 친구 API 로직 교체
 @router.get("/users/me/recommended", response_model=list[UserRead])
-def recommended(current_user: User = Depends(get_current_user)):
-    with Session(engine) as session:
+def recommended(current_user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
+    # 캐시에 있으면 DB 조회 없이 반환 (프로필/친구/차단 변경 시 무효화)
+    cached = recommendation_cache.get(current_user_id)
+    if cached is not None:
+        return cached
+
+    current_user = get_current_user(current_user_id, session)
+    # 배치 작업이 미리 계산한 추천 (함께 아는 친구 / 커뮤니티 / 나이) → 없으면 실시간 계산
+    friends = get_snapshot_recommendations(session, current_user)
+    if not friends:
         # 방금 만든 추천 알고리즘 서비스 호출!
         friends = get_recommended_friends(session, current_user)
-        
-        return [
-            UserRead(
-                id=u.id, 
-                name=u.name, 
-                birth_year=u.birth_year, 
-                region=u.region, 
-                school_name=u.school_name
-            ) for u in friends
-        ]
 
+    variants = get_image_variants(session, [url for u in friends for url in (u.profile_image, u.background_image)])
+    results = [build_user_read(u, variants) for u in friends]
+    recommendation_cache.put(current_user_id, results)
+    return results
 
-@router.put("/users/me", response_model=UserRead)
-def update_my_info(data: UserUpdate, token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication token")
 
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication token")
+# 피드 페이지(PostRead.author)에 함께 캐시되는 작성자 필드
+FEED_AUTHOR_FIELDS = ("name", "nickname", "profile_image", "school_name", "region")
 
-    with Session(engine) as session:
-        user = get_user_by_id(session, int(user_id))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        if data.name is not None:
-            user.name = data.name
-        if data.nickname is not None:
-            user.nickname = data.nickname
-        if data.birth_year is not None:
-            user.birth_year = data.birth_year
-        if data.gender is not None:
-            user.gender = data.gender
-        if data.region is not None:
-            user.region = data.region
-        if data.school_name is not None:
-            user.school_name = data.school_name
-        if data.school_type is not None:
-            user.school_type = data.school_type
-        if data.admission_year is not None:
-            user.admission_year = data.admission_year
 
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-
-        assign_community(session, user)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-
-        return UserRead(id=user.id, name=user.name, birth_year=user.birth_year, region=user.region, school_name=user.school_name)
\ No newline at end of file
+@router.put("/users/me", response_model=UserRead)
+def update_my_info(data: UserUpdate, user: User = Depends(get_current_user), session: Session = Depends(get_session)):
+    author_before = tuple(getattr(user, field) for field in FEED_AUTHOR_FIELDS)
+    community_before = user.community_id
+    if data.name is not None:
+        user.name = data.name
+    if data.nickname is not None:
+        user.nickname = data.nickname
+    if data.birth_year is not None:
+        user.birth_year = data.birth_year
+    if data.gender is not None:
+        user.gender = data.gender
+    if data.region is not None:
+        user.region = data.region
+    if data.school_name is not None:
+        user.school_name = data.school_name
+    if data.school_type is not None:
+        user.school_type = data.school_type
+    if data.admission_year is not None:
+        user.admission_year = data.admission_year
+    if data.profile_image is not None:
+        user.profile_image = data.profile_image
+    if data.background_image is not None:
+        user.background_image = data.background_image
+
+    assign_community(session, user)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    recommendation_cache.invalidate(user.id)
+    # 캐시된 피드의 작성자 이름/프로필이 바뀌었으면 내 게시글이 있는 피드 무효화 (커뮤니티가 바뀌었으면 이전 커뮤니티도)
+    if tuple(getattr(user, field) for field in FEED_AUTHOR_FIELDS) != author_before:
+        feed_cache.invalidate(set(post_scopes(community_before) + post_scopes(user.community_id)))
+
+    variants = get_image_variants(session, [user.profile_image, user.background_image])
+    return build_user_read(user, variants)
\ No newline at end of file
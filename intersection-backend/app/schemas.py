@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class Token(BaseModel):
     access_token: str
@@ -22,12 +22,34 @@ class UserCreate(BaseModel):
     profile_image: Optional[str] = None
     background_image: Optional[str] = None    
 
+class ImageVariants(BaseModel):
+    """업로드 이미지의 축소본 URL (생성 전이거나 이미지가 아니면 응답에서 null)"""
+    thumb: Optional[str] = None  # 정사각 썸네일 (아바타/목록용, WebP)
+    medium: Optional[str] = None  # 긴 변 기준 축소본 (피드용, WebP)
+
+class DirectUploadRequest(BaseModel):
+    """저장소 직접 업로드 요청 / 완료 확인 (클라이언트가 계산한 파일 sha256)"""
+    sha256: str  # 소문자 hex 64자
+    size: int  # bytes
+    content_type: str
+    filename: Optional[str] = None  # 확장자만 사용
+
+class DirectUploadResponse(BaseModel):
+    """직접 업로드 응답 (upload 가 null이면 이미 있는 파일 → 업로드 생략하고 url 사용)"""
+    url: str
+    deduplicated: bool
+    upload: Optional[dict] = None  # {method, url, headers, expires_in}: 이 요청 그대로 저장소에 전송
+
 class UserRead(BaseModel):
     id: int
     name: Optional[str] = None
     birth_year: Optional[int] = None
     region: Optional[str] = None
     school_name: Optional[str] = None
+    profile_image: Optional[str] = None
+    profile_image_variants: Optional[ImageVariants] = None
+    background_image: Optional[str] = None
+    background_image_variants: Optional[ImageVariants] = None
 
 
 class UserUpdate(BaseModel):
@@ -46,12 +68,26 @@ class PostCreate(BaseModel):
     content: str
     image_url: Optional[str] = None  # 📷 [추가됨]
 
+class PostAuthor(BaseModel):
+    """피드에 함께 내려주는 작성자 요약 (작성자 조회 요청 없이 렌더링)"""
+    id: int
+    name: Optional[str] = None
+    nickname: Optional[str] = None
+    profile_image: Optional[str] = None
+    profile_image_variants: Optional[ImageVariants] = None
+    school_name: Optional[str] = None
+    region: Optional[str] = None
+
 class PostRead(BaseModel):
     id: int
     author_id: int
+    community_id: Optional[int] = None
     content: str
     image_url: Optional[str] = None  # 📷 [추가됨]
+    image_variants: Optional[ImageVariants] = None
     created_at: Optional[str] = None
+    author: Optional[PostAuthor] = None  # include_author=false 이면 생략
+    comment_count: int = 0
 
 class CommentCreate(BaseModel):
     content: str
@@ -101,6 +137,20 @@ class ChatMessageRead(BaseModel):
     created_at: str
 
 
+class ChatReadReceiptCreate(BaseModel):
+    """읽음 처리 요청"""
+    up_to_message_id: int = Field(gt=0)  # 이 메시지까지 읽음
+
+
+class ChatReadReceiptRead(BaseModel):
+    """읽음 처리 응답"""
+    room_id: int
+    user_id: int
+    last_read_message_id: Optional[int] = None  # 내 읽음 워터마크
+    friend_last_read_message_id: Optional[int] = None  # 상대방 읽음 워터마크 (내 메시지 읽음 표시용)
+    unread_count: int = 0
+
+
 # ------------------------------------------------------
 # 🚫 차단 & 신고 스키마
 # ------------------------------------------------------
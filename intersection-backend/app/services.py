@@ -1,35 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from sqlmodel import Session, select
-from sqlalchemy import case, desc
-from .models import Community, User, UserFriendship, UserBlock  # 👈 UserBlock 추가됨
+from sqlalchemy.orm import aliased
+from sqlalchemy import bindparam, case, delete, exists, func, insert, tuple_, union, update
+from sqlalchemy.exc import IntegrityError
+from .config import settings
+from .models import Comment, Community, Post, RecommendationSnapshot, User, UserFriendship, UserBlock, ChatRoom, ChatMessage, get_kst_now  # 👈 UserBlock 추가됨
+
+# 채팅방 목록에 보여줄 마지막 메시지 미리보기 길이
+CHAT_PREVIEW_LENGTH = 100
+
+class CommunityIdCache:
+    """(학교, 입학년도, 지역) → 커뮤니티 ID (프로세스 단위, 커밋된 커뮤니티만 저장)"""
+
+    def __init__(self):
+        self._ids: dict[tuple[str, int, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, int, str]) -> Optional[int]:
+        with self._lock:
+            return self._ids.get(key)
+
+    def put(self, key: tuple[str, int, str], community_id: int):
+        with self._lock:
+            self._ids[key] = community_id
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+community_id_cache = CommunityIdCache()
+
+
+# INSERT ... ON CONFLICT DO NOTHING 을 지원하는 DB (그 외에는 SAVEPOINT 안에서 INSERT 후 충돌만 무시)
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+
+def _community_row(key: tuple[str, int, str], created_at) -> dict:
+    school_name, admission_year, region = key
+    return {
+        "name": f"{school_name} {admission_year}년 입학",
+        "school_name": school_name,
+        "admission_year": admission_year,
+        "region": region,
+        "created_at": created_at,
+    }
+
+
+def _community_upsert(session: Session, keys: list[tuple[str, int, str]]):
+    """커뮤니티 INSERT ... ON CONFLICT (school_name, admission_year, region) DO NOTHING 문 (UPSERT_DIALECTS 전용)"""
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    created_at = get_kst_now()
+    return (
+        dialect_insert(Community)
+        .values([_community_row(key, created_at) for key in keys])
+        .on_conflict_do_nothing(index_elements=["school_name", "admission_year", "region"])
+    )
+
+
+def _insert_community_in_savepoint(session: Session, key: tuple[str, int, str]) -> Optional[int]:
+    """SAVEPOINT 안에서 INSERT → 새 ID, unique 충돌(동시 생성 / 이미 있음)이면 그 INSERT만 롤백하고 None"""
+    try:
+        with session.begin_nested():
+            result = session.execute(insert(Community).values(_community_row(key, get_kst_now())))
+    except IntegrityError:
+        return None
+    return result.inserted_primary_key[0]
+
+
+def _insert_community_if_missing(session: Session, key: tuple[str, int, str]) -> Optional[int]:
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING id (이미 있으면 None, 그 외 DB는 SAVEPOINT 안에서 INSERT)"""
+    if session.get_bind().dialect.name not in UPSERT_DIALECTS:
+        return _insert_community_in_savepoint(session, key)
+    statement = _community_upsert(session, [key]).returning(Community.id)
+    return session.execute(statement).scalar_one_or_none()
+
+
+def _insert_missing_communities(session: Session, keys: list[tuple[str, int, str]]):
+    """없는 커뮤니티만 생성 (이미 있는 키는 무시, ID는 호출한 쪽에서 다시 조회)"""
+    if session.get_bind().dialect.name not in UPSERT_DIALECTS:
+        for key in keys:
+            _insert_community_in_savepoint(session, key)
+        return
+    session.execute(_community_upsert(session, keys))
+
+
+def resolve_communities(session: Session, keys: set[tuple[str, int, str]]) -> dict[tuple[str, int, str], int]:
+    """
+    여러 (학교, 입학년도, 지역) 키를 한 번에 커뮤니티 ID로 변환합니다. (대량 가입용, 커밋하지 않음)
+    캐시 → 한 번의 SELECT → 없는 키만 한 번의 INSERT ... ON CONFLICT DO NOTHING → 다시 SELECT
+    (ON CONFLICT 를 지원하지 않는 DB는 없는 키마다 SAVEPOINT 안에서 INSERT)
+    """
+    resolved = {}
+    missing = []
+    for key in keys:
+        community_id = community_id_cache.get(key)
+        if community_id is None:
+            missing.append(key)
+        else:
+            resolved[key] = community_id
+    if not missing:
+        return resolved
+
+    def select_ids(wanted: list) -> dict:
+        statement = select(Community.id, Community.school_name, Community.admission_year, Community.region).where(
+            tuple_(Community.school_name, Community.admission_year, Community.region).in_(wanted)
+        )
+        return {(school, year, region): community_id for community_id, school, year, region in session.exec(statement).all()}
+
+    existing = select_ids(missing)
+    for key, community_id in existing.items():
+        community_id_cache.put(key, community_id)
+    resolved.update(existing)
+
+    created = [key for key in missing if key not in existing]
+    if created:
+        _insert_missing_communities(session, created)
+        # 새로 만든 커뮤니티는 커밋 전이므로 캐시하지 않음
+        resolved.update(select_ids(created))
+    return resolved
+
 
 def assign_community(session: Session, user: User) -> User:
     """
     유저의 학교/입학년도/지역 정보를 바탕으로 커뮤니티를 자동 배정합니다.
+    커밋하지 않으므로 호출한 쪽의 사용자 저장과 같은 트랜잭션에서 처리됩니다.
+    - 캐시에 있으면 DB 조회 없이 배정
+    - 없으면 INSERT ... ON CONFLICT DO NOTHING RETURNING 으로 생성, 이미 있으면 조회
+      (ON CONFLICT 를 지원하지 않는 DB는 SAVEPOINT 안에서 INSERT, unique 충돌이면 조회)
+      (unique 제약으로 동시 가입에도 커뮤니티가 중복 생성되지 않음)
     """
     if not (user.school_name and user.admission_year and user.region):
         return user
 
-    statement = select(Community).where(
-        Community.school_name == user.school_name,
-        Community.admission_year == user.admission_year,
-        Community.region == user.region
-    )
-    results = session.exec(statement)
-    community = results.first()
-
-    if not community:
-        community_name = f"{user.school_name} {user.admission_year}년 입학"
-        community = Community(
-            name=community_name,
-            school_name=user.school_name,
-            admission_year=user.admission_year,
-            region=user.region
-        )
-        session.add(community)
-        session.commit()
-        session.refresh(community)
+    key = (user.school_name, user.admission_year, user.region)
+    community_id = community_id_cache.get(key)
+    if community_id is None:
+        community_id = _insert_community_if_missing(session, key)
+        if community_id is None:
+            statement = select(Community.id).where(
+                Community.school_name == user.school_name,
+                Community.admission_year == user.admission_year,
+                Community.region == user.region
+            )
+            community_id = session.exec(statement).one()
+            # 이미 커밋된 커뮤니티만 캐시 (새로 만든 것은 트랜잭션이 롤백될 수 있음)
+            community_id_cache.put(key, community_id)
 
-    user.community_id = community.id
+    user.community_id = community_id
     return user
 
 
@@ -40,17 +165,36 @@ def get_recommended_friends(session: Session, user: User, limit: int = 20) -> li
     - 🔥 [수정됨] 이미 친구 추가한 사람은 목록에서 제외합니다.
     - 🔥 [수정됨] 차단한 사용자도 목록에서 제외합니다.
     - 점수가 높은 순으로 정렬하여 반환
+    - 후보는 속성 인덱스(학교 / 입학년도 / 지역 → 사용자)로 먼저 좁혀서,
+      하나라도 겹치는 사용자만 점수를 계산합니다. (전체 사용자 스캔 없음)
     """
-    
-    # 1. 내가 이미 추가한 친구들의 ID 목록 조회 (SubQuery)
-    #    (친구 관계 테이블에서 user_id가 '나'인 데이터의 friend_id를 찾음)
-    friend_subquery = select(UserFriendship.friend_user_id).where(
-        UserFriendship.user_id == user.id
+
+    # 1. 후보: 속성 값이 하나라도 같은 사용자 (속성별 인덱스 조회의 합집합)
+    candidate_queries = [
+        select(User.id).where(column == value)
+        for column, value in (
+            (User.school_name, user.school_name),
+            (User.admission_year, user.admission_year),
+            (User.region, user.region),
+        )
+        if value is not None
+    ]
+    if not candidate_queries:
+        return []
+    candidate_subquery = union(*candidate_queries)
+
+    # 2. 내가 이미 추가한 친구 / 차단한 사용자 / 나를 차단한 사용자 (후보마다 인덱스로 확인)
+    is_friend = exists().where(
+        UserFriendship.user_id == user.id,
+        UserFriendship.friend_user_id == User.id,
+    )
+    is_blocked = exists().where(
+        UserBlock.user_id == user.id,
+        UserBlock.blocked_user_id == User.id,
     )
-    
-    # 2. 내가 차단한 사용자들의 ID 목록 조회 (SubQuery)
-    blocked_subquery = select(UserBlock.blocked_user_id).where(
-        UserBlock.user_id == user.id
+    blocked_me = exists().where(
+        UserBlock.user_id == User.id,
+        UserBlock.blocked_user_id == user.id,
     )
 
     # 3. 점수 계산 로직
@@ -58,22 +202,353 @@ def get_recommended_friends(session: Session, user: User, limit: int = 20) -> li
         case((User.school_name == user.school_name, 1), else_=0) +
         case((User.admission_year == user.admission_year, 1), else_=0) +
         case((User.region == user.region, 1), else_=0)
-    ).label("score")
+    )
 
-    # 4. 쿼리 작성 (친구 제외 + 차단 제외 조건 추가)
+    # 4. 쿼리 작성 (점수 1점 이상 조건을 LIMIT 전에 적용 → limit개를 최대한 채움)
     statement = (
-        select(User, score_expression)
+        select(User)
+        .where(User.id.in_(candidate_subquery))
         .where(User.id != user.id)   # 나 자신 제외
         .where(User.name.isnot(None)) # 유령 회원 제외
-        .where(User.id.notin_(friend_subquery)) # 🔥 핵심: 이미 친구인 사람 제외!
-        .where(User.id.notin_(blocked_subquery)) # 🔥 핵심: 차단한 사람 제외!
-        .order_by(desc("score"))     # 점수순 정렬
+        .where(~is_friend)            # 🔥 핵심: 이미 친구인 사람 제외!
+        .where(~is_blocked)           # 🔥 핵심: 차단한 사람 제외!
+        .where(~blocked_me)           # 나를 차단한 사람도 제외 (배치 계산과 같은 기준)
+        .where(score_expression > 0)
+        .order_by(score_expression.desc(), User.id)  # 점수순 정렬 (동점은 가입순)
+        .limit(limit)
+    )
+
+    return list(session.exec(statement).all())
+
+
+def get_snapshot_recommendations(session: Session, user: User, limit: int = 20) -> list[User]:
+    """
+    배치 작업이 미리 계산한 추천(RecommendationSnapshot)을 순위대로 반환합니다.
+    스냅샷 이후에 친구 추가/차단한 사용자와 나를 차단한 사용자는 제외합니다. (스냅샷이 없으면 빈 목록)
+    """
+    is_friend = exists().where(
+        UserFriendship.user_id == user.id,
+        UserFriendship.friend_user_id == RecommendationSnapshot.recommended_user_id,
+    )
+    is_blocked = exists().where(
+        UserBlock.user_id == user.id,
+        UserBlock.blocked_user_id == RecommendationSnapshot.recommended_user_id,
+    )
+    blocked_me = exists().where(
+        UserBlock.user_id == RecommendationSnapshot.recommended_user_id,
+        UserBlock.blocked_user_id == user.id,
+    )
+    statement = (
+        select(User)
+        .join(RecommendationSnapshot, RecommendationSnapshot.recommended_user_id == User.id)
+        .where(RecommendationSnapshot.user_id == user.id)
+        .where(~is_friend)
+        .where(~is_blocked)
+        .where(~blocked_me)
+        .order_by(RecommendationSnapshot.rank)
         .limit(limit)
     )
+    return list(session.exec(statement).all())
+
+
+class RecommendationCache:
+    """
+    사용자 ID → 추천 친구 목록 LRU 캐시 (항목마다 TTL)
+    내 프로필/친구/차단 목록이 바뀌면 invalidate로 바로 지웁니다.
+    (새로 가입한 사용자나 다른 워커에서의 변경은 TTL 이후 반영)
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple[list, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[list]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            value, valid_until = entry
+            if now >= valid_until:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def put(self, user_id: int, value: list):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+recommendation_cache = RecommendationCache(settings.RECOMMEND_CACHE_SIZE, settings.RECOMMEND_CACHE_TTL)
+
 
-    results = session.exec(statement).all()
-    
-    # 교집합 점수가 1점 이상인 사람만 반환
-    recommended_users = [row[0] for row in results if row[1] > 0]
-    
-    return recommended_users
\ No newline at end of file
+# ------------------------------------------------------
+# 💬 채팅방 요약 (마지막 메시지 / 안 읽은 수) 관리
+# ------------------------------------------------------
+def record_chat_message(session: Session, room: ChatRoom, message: ChatMessage) -> None:
+    """
+    새 메시지를 채팅방의 비정규화 필드에 반영합니다.
+    메시지 저장과 같은 트랜잭션에서 호출하고, commit은 호출하는 쪽에서 합니다.
+    """
+    session.flush()  # message.id 확보
+
+    room.last_message_id = message.id
+    room.last_message_preview = message.content[:CHAT_PREVIEW_LENGTH]
+    room.updated_at = message.created_at
+
+    # 받는 사람의 안 읽은 수 +1 (동시 전송에도 값이 유실되지 않도록 SQL 식으로 증가)
+    if message.sender_id == room.user1_id:
+        room.user2_unread_count = ChatRoom.user2_unread_count + 1
+    else:
+        room.user1_unread_count = ChatRoom.user1_unread_count + 1
+    session.add(room)
+
+
+def record_chat_messages_batch(session: Session, rows: list[dict]) -> list[int]:
+    """
+    여러 채팅방의 메시지를 한 번에 저장합니다. (WebSocket 배치 저장용)
+    multi-row INSERT 1번 + 채팅방 요약 UPDATE 1번(executemany)으로 처리하고,
+    rows 순서대로 새 메시지 ID를 반환합니다. commit은 호출하는 쪽에서 합니다.
+
+    rows: [{"room_id", "sender_id", "content", "is_read", "created_at"}, ...]
+    """
+    message_table = ChatMessage.__table__
+    ids = session.execute(
+        insert(message_table).returning(message_table.c.id, sort_by_parameter_order=True),
+        rows,
+    ).scalars().all()
+
+    # 받는 사람 판별용 (방마다 user1_id)
+    room_ids = {row["room_id"] for row in rows}
+    user1_ids = dict(session.exec(
+        select(ChatRoom.id, ChatRoom.user1_id).where(ChatRoom.id.in_(room_ids))
+    ).all())
+
+    summaries = {}
+    for message_id, row in zip(ids, rows):
+        summary = summaries.setdefault(
+            row["room_id"], {"b_room_id": row["room_id"], "b_user1_unread": 0, "b_user2_unread": 0}
+        )
+        summary["b_last_message_id"] = message_id
+        summary["b_preview"] = row["content"][:CHAT_PREVIEW_LENGTH]
+        summary["b_updated_at"] = row["created_at"]
+        if row["sender_id"] == user1_ids.get(row["room_id"]):
+            summary["b_user2_unread"] += 1
+        else:
+            summary["b_user1_unread"] += 1
+
+    room_table = ChatRoom.__table__
+    room_update = (
+        update(room_table)
+        .where(room_table.c.id == bindparam("b_room_id"))
+        .values(
+            last_message_id=bindparam("b_last_message_id"),
+            last_message_preview=bindparam("b_preview"),
+            updated_at=bindparam("b_updated_at"),
+            user1_unread_count=room_table.c.user1_unread_count + bindparam("b_user1_unread"),
+            user2_unread_count=room_table.c.user2_unread_count + bindparam("b_user2_unread"),
+        )
+    )
+    session.execute(room_update, list(summaries.values()))
+    return ids
+
+
+def mark_chat_room_read(session: Session, room: ChatRoom, user_id: int, up_to_message_id: int) -> Optional[int]:
+    """
+    user_id의 읽음 워터마크를 up_to_message_id까지 올리고 (내려가지는 않음),
+    안 읽은 수를 워터마크 이후 상대방 메시지 수로 다시 계산합니다. (commit은 호출하는 쪽에서)
+    새 워터마크를 반환합니다.
+    """
+    is_user1 = room.user1_id == user_id
+    friend_id = room.user2_id if is_user1 else room.user1_id
+    current = get_last_read_message_id(room, user_id)
+
+    # 아직 없는 메시지까지 읽음 처리되지 않도록 마지막 메시지 ID로 제한 (메시지가 없는 방은 0)
+    up_to_message_id = min(up_to_message_id, room.last_message_id or 0)
+    watermark = max(current or 0, up_to_message_id)
+    if current is not None and watermark == current:
+        return current
+
+    # (room_id, id) 인덱스 범위 카운트. 동시에 들어온 메시지의 +1과 겹치지 않도록 UPDATE 안에서 계산
+    unread_count = (
+        select(func.count())
+        .select_from(ChatMessage)
+        .where(
+            ChatMessage.room_id == room.id,
+            ChatMessage.id > watermark,
+            ChatMessage.sender_id == friend_id,
+        )
+        .scalar_subquery()
+    )
+    if is_user1:
+        room.user1_last_read_message_id = watermark
+        room.user1_unread_count = unread_count
+    else:
+        room.user2_last_read_message_id = watermark
+        room.user2_unread_count = unread_count
+    session.add(room)
+    return watermark
+
+
+def get_last_read_message_id(room: ChatRoom, user_id: int) -> Optional[int]:
+    """채팅방에서 user_id의 읽음 워터마크"""
+    return room.user1_last_read_message_id if room.user1_id == user_id else room.user2_last_read_message_id
+
+
+def get_unread_count(room: ChatRoom, user_id: int) -> int:
+    """채팅방에서 user_id가 안 읽은 메시지 수"""
+    return room.user1_unread_count if room.user1_id == user_id else room.user2_unread_count
+
+
+def rebuild_chat_room_summaries(session: Session) -> int:
+    """
+    메시지 테이블을 기준으로 모든 채팅방의 요약 필드를 다시 계산합니다.
+    (기존 데이터 백필 / 카운터가 어긋났을 때 복구용) 처리한 채팅방 수를 반환합니다.
+    """
+    # 방별 마지막 메시지
+    last_ids = dict(session.exec(
+        select(ChatMessage.room_id, func.max(ChatMessage.id)).group_by(ChatMessage.room_id)
+    ).all())
+    last_messages = {}
+    if last_ids:
+        last_messages = {
+            m.room_id: m
+            for m in session.exec(select(ChatMessage).where(ChatMessage.id.in_(last_ids.values()))).all()
+        }
+
+    # 워터마크가 없는 방은 (이전 버전의) is_read 기준으로 초기화: 보낸 사람별 마지막으로 읽힌 메시지
+    legacy_read = {}
+    legacy_statement = (
+        select(ChatMessage.room_id, ChatMessage.sender_id, func.max(ChatMessage.id))
+        .where(ChatMessage.is_read == True)
+        .group_by(ChatMessage.room_id, ChatMessage.sender_id)
+    )
+    for room_id, sender_id, max_id in session.exec(legacy_statement).all():
+        legacy_read[(room_id, sender_id)] = max_id
+
+    rooms = session.exec(select(ChatRoom)).all()
+    for room in rooms:
+        last_message = last_messages.get(room.id)
+        room.last_message_id = last_message.id if last_message else None
+        room.last_message_preview = last_message.content[:CHAT_PREVIEW_LENGTH] if last_message else None
+        if last_message:
+            room.updated_at = last_message.created_at
+        # user1이 읽은 것 = user2가 보낸 메시지 중 읽힌 것
+        if room.user1_last_read_message_id is None:
+            room.user1_last_read_message_id = legacy_read.get((room.id, room.user2_id))
+        if room.user2_last_read_message_id is None:
+            room.user2_last_read_message_id = legacy_read.get((room.id, room.user1_id))
+        session.add(room)
+    session.flush()
+
+    # 안 읽은 수 = 워터마크 이후 상대방이 보낸 메시지 수
+    for reader_column, sender_column, watermark_column in (
+        (ChatRoom.user1_unread_count, ChatRoom.user2_id, ChatRoom.user1_last_read_message_id),
+        (ChatRoom.user2_unread_count, ChatRoom.user1_id, ChatRoom.user2_last_read_message_id),
+    ):
+        unread_count = (
+            select(func.count())
+            .select_from(ChatMessage)
+            .where(
+                ChatMessage.room_id == ChatRoom.id,
+                ChatMessage.sender_id == sender_column,
+                ChatMessage.id > func.coalesce(watermark_column, 0),
+            )
+            .scalar_subquery()
+        )
+        session.execute(update(ChatRoom).values({reader_column.key: unread_count}))
+
+    session.commit()
+    return len(rooms)
+
+
+def backfill_post_communities(session: Session) -> int:
+    """
+    community_id가 비어 있는 게시글을 작성자의 현재 커뮤니티로 채웁니다.
+    (커뮤니티별 피드 도입 전 게시글 백필용) 갱신한 게시글 수를 반환합니다.
+    """
+    author_community = select(User.community_id).where(User.id == Post.author_id).scalar_subquery()
+    result = session.execute(
+        update(Post).where(Post.community_id.is_(None)).values(community_id=author_community)
+    )
+    session.commit()
+    return result.rowcount
+
+
+def rebuild_post_comment_counts(session: Session) -> int:
+    """
+    댓글 테이블을 기준으로 모든 게시글의 comment_count를 다시 계산합니다.
+    (기존 데이터 백필 / 카운터가 어긋났을 때 복구용) 갱신한 게시글 수를 반환합니다.
+    """
+    comment_count = (
+        select(func.count())
+        .select_from(Comment)
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    result = session.execute(update(Post).values(comment_count=comment_count))
+    session.commit()
+    return result.rowcount
+
+
+def dedupe_friendships(session: Session) -> int:
+    """
+    같은 (user_id, friend_user_id) 친구 관계가 여러 행이면 가장 먼저 만든 행만 남기고 삭제합니다.
+    (unique 제약 도입 전 데이터 정리용) 삭제한 행 수를 반환합니다.
+    """
+    first_ids = (
+        select(func.min(UserFriendship.id))
+        .group_by(UserFriendship.user_id, UserFriendship.friend_user_id)
+    )
+    result = session.execute(delete(UserFriendship).where(UserFriendship.id.not_in(first_ids)))
+    session.commit()
+    return result.rowcount
+
+
+def dedupe_communities(session: Session) -> int:
+    """
+    같은 (학교, 입학년도, 지역) 커뮤니티가 여러 개면 가장 먼저 만든 것만 남기고,
+    사용자/게시글의 community_id를 남은 커뮤니티로 옮긴 뒤 나머지를 삭제합니다.
+    (unique 제약 도입 전 데이터 정리용) 삭제한 커뮤니티 수를 반환합니다.
+    """
+    current = aliased(Community)
+    same_key = aliased(Community)
+    for model in (User, Post):
+        survivor = (
+            select(func.min(same_key.id))
+            .select_from(current)
+            .join(
+                same_key,
+                (same_key.school_name == current.school_name)
+                & (same_key.admission_year == current.admission_year)
+                & (same_key.region == current.region),
+            )
+            .where(current.id == model.community_id)
+            .scalar_subquery()
+        )
+        session.execute(update(model).where(model.community_id.isnot(None)).values(community_id=survivor))
+
+    first_ids = (
+        select(func.min(Community.id))
+        .group_by(Community.school_name, Community.admission_year, Community.region)
+    )
+    result = session.execute(delete(Community).where(Community.id.not_in(first_ids)))
+    session.commit()
+    community_id_cache.clear()
+    return result.rowcount
@@ -0,0 +1,258 @@
+"""
+🗄️ 업로드 파일 저장소
+
+업로드 원본과 이미지 변형을 저장하는 위치를 UPLOAD_STORAGE 설정으로 고릅니다.
+경로(path)는 저장소 안의 상대 경로(예: "ab/cd/<해시>.jpg")이고, 응답/DB에는 url(path) 를 씁니다.
+
+- local: UPLOAD_DIR 폴더 (기본값, 서버의 /uploads 로 서빙). 서버가 여러 대면 공유 볼륨이 필요
+- s3:    S3 호환 저장소 (AWS S3, MinIO 등, `pip install boto3` 필요)
+         서버 여러 대가 같은 버킷을 쓰고, 파일은 S3_PUBLIC_URL(버킷/CDN)에서 바로 내려받음
+         presigned URL로 클라이언트가 저장소에 직접 업로드 (이미지 바이트가 API 서버를 거치지 않음)
+
+모든 메서드는 블로킹 I/O이므로 비동기 핸들러에서는 스레드에서 호출합니다.
+"""
+import base64
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .config import settings
+
+# 업로드 파일은 이름(내용 해시)이 같으면 내용도 같으므로 영구 캐시
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE}, immutable"
+
+
+class StorageError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    size: int
+    content_type: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PresignedUpload:
+    """클라이언트가 저장소에 직접 올릴 요청 (method url + headers 그대로 전송)"""
+    method: str
+    url: str
+    headers: dict = field(default_factory=dict)
+    expires_in: int = 0
+
+
+class UploadStorage:
+    """저장소 공통 인터페이스"""
+
+    backend = "base"
+    # 클라이언트 직접 업로드(presigned URL) 지원 여부
+    supports_presigned_upload = False
+
+    def url(self, path: str) -> str:
+        raise NotImplementedError
+
+    def path_from_url(self, url: Optional[str]) -> Optional[str]:
+        """이 저장소가 만든 URL → 경로 (다른 URL이면 None)"""
+        prefix = self.url("")
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
+
+    def put_file(self, local_path: str, path: str, content_type: Optional[str]) -> None:
+        """로컬 임시 파일을 저장소로 이동 (임시 파일은 이후 없어질 수 있음)"""
+        raise NotImplementedError
+
+    def put_bytes(self, path: str, data: bytes, content_type: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def read_bytes(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def stat(self, path: str) -> Optional[StoredObject]:
+        raise NotImplementedError
+
+    def delete(self, path: str) -> None:
+        raise NotImplementedError
+
+    def presign_upload(self, path: str, content_type: str, size: int, sha256: str, expires_in: int) -> PresignedUpload:
+        raise StorageError(f"{self.backend} storage does not support direct uploads")
+
+    def tmp_dir(self) -> str:
+        """업로드 스트림을 받아 둘 로컬 임시 폴더"""
+        raise NotImplementedError
+
+
+class LocalStorage(UploadStorage):
+    """UPLOAD_DIR 폴더에 저장 (main.py가 /uploads 로 서빙)"""
+
+    backend = "local"
+    TMP_DIR_NAME = ".tmp"
+
+    def __init__(self, directory: str, url_prefix: str = "/uploads/"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        os.makedirs(os.path.join(directory, self.TMP_DIR_NAME), exist_ok=True)
+
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.directory, path)
+
+    def url(self, path: str) -> str:
+        return f"{self.url_prefix}{path}"
+
+    def put_file(self, local_path: str, path: str, content_type: Optional[str]) -> None:
+        target = self._full_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 임시 폴더가 같은 파일 시스템 안에 있어 원자적 이동 (동시에 같은 내용이 와도 결과 파일은 동일)
+        os.replace(local_path, target)
+
+    def put_bytes(self, path: str, data: bytes, content_type: Optional[str]) -> None:
+        target = self._full_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_target = f"{target}.tmp"
+        with open(tmp_target, "wb") as f:
+            f.write(data)
+        os.replace(tmp_target, target)
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(self._full_path(path), "rb") as f:
+            return f.read()
+
+    def stat(self, path: str) -> Optional[StoredObject]:
+        try:
+            return StoredObject(size=os.stat(self._full_path(path)).st_size)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, path: str) -> None:
+        try:
+            os.remove(self._full_path(path))
+        except FileNotFoundError:
+            pass
+
+    def tmp_dir(self) -> str:
+        return os.path.join(self.directory, self.TMP_DIR_NAME)
+
+
+class S3Storage(UploadStorage):
+    """
+    S3 호환 저장소 (S3_ENDPOINT_URL 을 주면 MinIO 등)
+    객체 키 = S3_PREFIX + 경로, 공개 URL = S3_PUBLIC_URL + 키 (버킷 공개 읽기 또는 CDN)
+    """
+
+    backend = "s3"
+    supports_presigned_upload = True
+
+    def __init__(
+        self,
+        bucket: str,
+        public_url: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        prefix: str = "",
+        tmp_dir: Optional[str] = None,
+    ):
+        import boto3  # 선택 의존성: s3 모드에서만 필요
+        from botocore.config import Config
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(signature_version="s3v4"),
+        )
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/") + "/"
+        self.prefix = prefix
+        self._tmp_dir = tmp_dir or os.path.join(settings.UPLOAD_DIR, LocalStorage.TMP_DIR_NAME)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def _key(self, path: str) -> str:
+        return f"{self.prefix}{path}"
+
+    def _extra_args(self, content_type: Optional[str]) -> dict:
+        extra = {"CacheControl": IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra["ContentType"] = content_type
+        return extra
+
+    def url(self, path: str) -> str:
+        return f"{self.public_url}{self._key(path)}"
+
+    def put_file(self, local_path: str, path: str, content_type: Optional[str]) -> None:
+        # 큰 파일은 boto3가 멀티파트로 나눠 올림
+        self.client.upload_file(local_path, self.bucket, self._key(path), ExtraArgs=self._extra_args(content_type))
+        os.remove(local_path)
+
+    def put_bytes(self, path: str, data: bytes, content_type: Optional[str]) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(path), Body=data, **self._extra_args(content_type))
+
+    def read_bytes(self, path: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(path))["Body"].read()
+
+    def stat(self, path: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(path))
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(size=head["ContentLength"], content_type=head.get("ContentType"))
+
+    def delete(self, path: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(path))
+
+    def presign_upload(self, path: str, content_type: str, size: int, sha256: str, expires_in: int) -> PresignedUpload:
+        """
+        서명된 PUT URL (크기 / Content-Type / sha256 체크섬이 서명에 포함)
+        → 저장소가 다른 크기나 내용의 업로드를 거절하므로 경로(해시)와 내용이 항상 일치
+        """
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        params = {
+            "Bucket": self.bucket,
+            "Key": self._key(path),
+            "ContentType": content_type,
+            "ContentLength": size,
+            "ChecksumSHA256": checksum,
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+        url = self.client.generate_presigned_url("put_object", Params=params, ExpiresIn=expires_in)
+        return PresignedUpload(
+            method="PUT",
+            url=url,
+            headers={
+                "Content-Type": content_type,
+                "Content-Length": str(size),
+                "x-amz-checksum-sha256": checksum,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            },
+            expires_in=expires_in,
+        )
+
+    def tmp_dir(self) -> str:
+        return self._tmp_dir
+
+
+def create_storage() -> UploadStorage:
+    """설정(UPLOAD_STORAGE)에 맞는 저장소 생성"""
+    if settings.UPLOAD_STORAGE == "s3":
+        if not settings.S3_BUCKET or not settings.S3_PUBLIC_URL:
+            raise RuntimeError("UPLOAD_STORAGE=s3 requires S3_BUCKET and S3_PUBLIC_URL")
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            public_url=settings.S3_PUBLIC_URL,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            prefix=settings.S3_PREFIX,
+        )
+    return LocalStorage(settings.UPLOAD_DIR)
+
+
+storage = create_storage()
@@ -0,0 +1,127 @@
+"""
+🖼️ /uploads 정적 파일 서빙 (캐시 친화적)
+
+업로드 파일은 한 번 쓰면 바뀌지 않는 이름(내용 해시 / UUID)으로 저장되므로:
+- Cache-Control: public, max-age=1년, immutable → 클라이언트가 재검증 없이 재사용
+- 강한 ETag: 내용 해시 경로는 파일 이름(해시) 그대로, 그 외에는 크기/수정 시각 기반
+- 경로 → (절대 경로, stat) 메타데이터 인덱스(LRU)를 메모리에 두어 요청마다 stat 하지 않음
+  (UPLOAD_INDEX_PRELOAD=true 이면 서버 시작 시 폴더를 한 번 훑어 미리 채움)
+- Range 요청(206)과 zero-copy 전송(ASGI pathsend 확장을 지원하는 서버)은 FileResponse가 처리
+"""
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .config import settings
+from .storage import IMMUTABLE_CACHE_CONTROL, LocalStorage
+
+TMP_DIR_NAME = LocalStorage.TMP_DIR_NAME
+
+# ab/cd/<sha256>[_<변형>].<확장자>
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?$")
+
+
+class UploadIndex:
+    """요청 경로 → (절대 경로, stat) LRU (업로드 파일은 바뀌지 않으므로 TTL 없음)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[str, os.stat_result]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Optional[tuple[str, os.stat_result]]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(path)
+            return entry
+
+    def put(self, path: str, full_path: str, stat_result: os.stat_result):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[path] = (full_path, stat_result)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, path: str):
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class UploadStaticFiles(StaticFiles):
+    """업로드 폴더 전용 StaticFiles (불변 캐시 헤더 + 메타데이터 인덱스)"""
+
+    def __init__(self, directory: str, index_size: int):
+        super().__init__(directory=directory)
+        self.index = UploadIndex(index_size)
+
+    def preload(self) -> int:
+        """업로드 폴더를 훑어 인덱스를 미리 채움 (인덱스 크기까지)"""
+        root = os.path.realpath(self.directory)
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if name != TMP_DIR_NAME]
+            for filename in filenames:
+                if count >= self.index.max_size:
+                    return count
+                full_path = os.path.join(dirpath, filename)
+                self.index.put(os.path.relpath(full_path, root), full_path, os.stat(full_path))
+                count += 1
+        return count
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        # 저장 중인 임시 파일은 서빙하지 않음
+        if path.split(os.sep, 1)[0] == TMP_DIR_NAME:
+            raise HTTPException(status_code=404)
+
+        entry = self.index.get(path)
+        if entry is None:
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+            except (OSError, ValueError):
+                raise HTTPException(status_code=404)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                raise HTTPException(status_code=404)
+            self.index.put(path, full_path, stat_result)
+            entry = (full_path, stat_result)
+        return self.file_response(entry[0], entry[1], scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL}
+        name = os.path.splitext(os.path.basename(full_path))[0]
+        if CONTENT_ADDRESSED_NAME.match(name):
+            headers["etag"] = f'"{name}"'
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def create_upload_files(directory: str) -> UploadStaticFiles:
+    files = UploadStaticFiles(directory, settings.UPLOAD_INDEX_SIZE)
+    if settings.UPLOAD_INDEX_PRELOAD:
+        print(f"[upload_files] preloaded {files.preload()} entries")
+    return files
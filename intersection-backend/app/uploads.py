@@ -0,0 +1,275 @@
+"""
+🖼️ 업로드 파일 저장 (내용 주소 기반)
+
+multipart 요청 본문을 직접 파싱하면서(MultipartFileStream) 파일 부분을 UPLOAD_CHUNK_SIZE 단위로 임시 파일에 비동기로 쓰고 sha256을 계산한 뒤,
+저장소(app.storage)의 `<해시 앞 2자리>/<다음 2자리>/<해시><확장자>` 경로로 옮겨 저장합니다.
+같은 내용이 이미 있으면 임시 파일을 지우고 UploadedFile.upload_count 만 올립니다. (저장소 쓰기 없음)
+
+- UPLOAD_MAX_BYTES 를 넘으면 읽는 도중 중단하고 UploadTooLarge (요청 본문을 먼저 다 받아 두지 않음, Content-Length 없어도 동일)
+- 동시에 같은 내용이 올라오면 unique 제약으로 한 행만 남기고 나머지는 중복으로 처리
+
+직접 업로드 (S3 저장소): 클라이언트가 sha256을 계산해 presign_direct_upload → 저장소에 PUT → complete_direct_upload
+이미 있는 내용이면 presign 단계에서 바로 URL을 돌려주므로 업로드 자체가 생략됩니다.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from .config import settings
+from .db import engine, run_db
+from .models import UploadedFile, get_kst_now
+from .storage import PresignedUpload, storage
+
+# 저장 파일 이름에 붙일 확장자 최대 길이 (".jpeg" 등, 그 이상은 버림)
+MAX_EXTENSION_LENGTH = 10
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+# multipart 경계/헤더 등 파일 외 부분의 여유분 (요청 본문 전체 크기 제한 = UPLOAD_MAX_BYTES + 이 값)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"file exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class UploadRejected(Exception):
+    """직접 업로드 요청/완료 확인 실패 (400)"""
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: str  # 저장소 안의 경로
+    sha256: str
+    size: int
+    deduplicated: bool  # 이미 있던 내용인지
+
+    @property
+    def url(self) -> str:
+        return storage.url(self.path)
+
+
+def content_path(sha256: str, extension: str) -> str:
+    """해시 → 저장 경로 (폴더 하나에 파일이 몰리지 않게 앞 4자리로 2단계 분산)"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def _safe_extension(filename: Optional[str]) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if len(extension) > MAX_EXTENSION_LENGTH or not extension[1:].isalnum():
+        return ""
+    return extension
+
+
+def _record_upload(sha256: str, path: str, size: int, content_type: Optional[str]) -> tuple[str, bool]:
+    """
+    UploadedFile 행을 만들거나(새 내용) upload_count를 올립니다(중복).
+    → (실제 저장 경로, 중복 여부)
+    """
+    with Session(engine) as session:
+        existing = session.exec(select(UploadedFile.path).where(UploadedFile.sha256 == sha256)).first()
+        if existing is None:
+            session.add(UploadedFile(sha256=sha256, path=path, size=size, content_type=content_type))
+            try:
+                session.commit()
+                return path, False
+            except IntegrityError:
+                # 같은 내용이 동시에 올라와 다른 요청이 먼저 저장함
+                session.rollback()
+                existing = session.exec(select(UploadedFile.path).where(UploadedFile.sha256 == sha256)).one()
+        session.execute(
+            update(UploadedFile)
+            .where(UploadedFile.sha256 == sha256)
+            .values(upload_count=UploadedFile.upload_count + 1, last_uploaded_at=get_kst_now())
+        )
+        session.commit()
+        return existing, True
+
+
+def _find_upload(sha256: str) -> Optional[str]:
+    with Session(engine) as session:
+        return session.exec(select(UploadedFile.path).where(UploadedFile.sha256 == sha256)).first()
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data 요청 본문에서 파일 필드 하나를 읽는 대로 내보냅니다.
+    (UploadFile 처럼 본문 전체를 먼저 임시 파일에 받아 두지 않으므로, 크기 제한을 넘으면 바로 중단)
+    다른 필드는 버리고, 같은 이름의 파일 필드가 여러 개면 첫 번째만 사용합니다.
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+            raise UploadRejected("multipart/form-data request with a boundary is required")
+        self.request = request
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._found = False  # 파일 필드를 찾았는지
+        self._in_file = False  # 지금 파일 필드 본문을 읽는 중인지
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._pending: list[bytes] = []
+        self._pending_size = 0
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if self._found or name != self.field_name or b"filename" not in options:
+            return
+        self._found = self._in_file = True
+        self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        content_type = self._headers.get(b"content-type")
+        self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._pending.append(bytes(data[start:end]))
+            self._pending_size += end - start
+
+    def _on_part_end(self):
+        self._in_file = False
+
+    def _take_pending(self) -> bytes:
+        chunk = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        return chunk
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """파일 필드 내용을 UPLOAD_CHUNK_SIZE 정도씩 (본문 전체가 크기 제한을 넘으면 UploadTooLarge)"""
+        max_body = settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+        received = 0
+        try:
+            async for body in self.request.stream():
+                received += len(body)
+                if received > max_body:
+                    raise UploadTooLarge(settings.UPLOAD_MAX_BYTES)
+                self._parser.write(body)
+                if self._pending_size >= settings.UPLOAD_CHUNK_SIZE:
+                    yield self._take_pending()
+            self._parser.finalize()
+        except MultipartParseError as exc:
+            raise UploadRejected(f"malformed multipart body: {exc}")
+        if not self._found:
+            raise UploadRejected(f"file field '{self.field_name}' is required")
+        if self._pending:
+            yield self._take_pending()
+
+
+async def store_upload(upload: MultipartFileStream) -> StoredUpload:
+    """업로드 파일을 스트리밍으로 저장 (크기 제한 + 내용 해시 기반 중복 제거)"""
+    tmp_dir = storage.tmp_dir()
+    await aiofiles.os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            async for chunk in upload.chunks():
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise UploadTooLarge(settings.UPLOAD_MAX_BYTES)
+                digest.update(chunk)
+                await out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        existing = await run_db(_find_upload, sha256)
+        if existing is None:
+            path = content_path(sha256, _safe_extension(upload.filename))
+            await asyncio.to_thread(storage.put_file, tmp_path, path, upload.content_type)
+        else:
+            path = existing
+        stored_path, deduplicated = await run_db(_record_upload, sha256, path, size, upload.content_type)
+        if existing is None and stored_path != path:
+            # 동시에 같은 내용이 다른 확장자로 저장됨 → 먼저 기록된 파일만 남김
+            await asyncio.to_thread(storage.delete, path)
+        path = stored_path
+    finally:
+        if await aiofiles.os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+
+    return StoredUpload(path=path, sha256=sha256, size=size, deduplicated=deduplicated)
+
+
+# ------------------------------------------------------
+# 직접 업로드 (presigned URL)
+# ------------------------------------------------------
+def _validate_direct_upload(sha256: str, size: int, content_type: str):
+    if not storage.supports_presigned_upload:
+        raise UploadRejected(f"direct uploads are not supported by {storage.backend} storage")
+    if not SHA256_HEX.match(sha256):
+        raise UploadRejected("sha256 must be 64 lowercase hex characters")
+    if size > settings.UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(settings.UPLOAD_MAX_BYTES)
+    if size <= 0 or not content_type:
+        raise UploadRejected("size and content_type are required")
+
+
+def presign_direct_upload(sha256: str, size: int, content_type: str, filename: Optional[str]) -> tuple[StoredUpload, Optional[PresignedUpload]]:
+    """
+    직접 업로드 준비 → (저장될 위치, 저장소 업로드 요청)
+    같은 내용이 이미 있으면 업로드 요청 없이 (기존 위치, None) (메타데이터만 기록)
+    """
+    _validate_direct_upload(sha256, size, content_type)
+    existing = _find_upload(sha256)
+    if existing is not None:
+        path, _ = _record_upload(sha256, existing, size, content_type)
+        return StoredUpload(path=path, sha256=sha256, size=size, deduplicated=True), None
+    path = content_path(sha256, _safe_extension(filename))
+    presigned = storage.presign_upload(path, content_type, size, sha256, settings.UPLOAD_PRESIGN_EXPIRES)
+    return StoredUpload(path=path, sha256=sha256, size=size, deduplicated=False), presigned
+
+
+def complete_direct_upload(sha256: str, size: int, content_type: str, filename: Optional[str]) -> StoredUpload:
+    """저장소에 직접 올린 파일 확인 후 기록 (크기/체크섬은 서명된 업로드 요청에서 저장소가 확인)"""
+    _validate_direct_upload(sha256, size, content_type)
+    path = content_path(sha256, _safe_extension(filename))
+    stored = storage.stat(path)
+    if stored is None:
+        raise UploadRejected("uploaded object not found")
+    if stored.size != size:
+        raise UploadRejected("uploaded object size mismatch")
+    stored_path, deduplicated = _record_upload(sha256, path, size, content_type)
+    if stored_path != path:
+        storage.delete(path)
+    return StoredUpload(path=stored_path, sha256=sha256, size=size, deduplicated=deduplicated)
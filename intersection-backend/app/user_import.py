@@ -0,0 +1,191 @@
+"""
+👥 사용자 대량 가입 (학교 단위 온보딩)
+
+CSV 또는 NDJSON(한 줄에 JSON 하나) 스트림을 읽어 배치 단위로 가입시킵니다.
+- 비밀번호 해시: 프로세스 풀에서 병렬 계산 (argon2는 CPU를 많이 씀)
+- 커뮤니티: 배치의 (학교, 입학년도, 지역) 키를 한 번에 조회/생성
+- 저장: PostgreSQL은 COPY, 그 외에는 executemany INSERT → 배치당 커밋 1번
+이미 있는 login_id, 파일 안의 중복 login_id, 형식이 잘못된 행은 건너뛰고 집계합니다.
+
+컬럼/키 이름은 POST /users/ 요청(UserCreate)과 같습니다. (login_id, password 필수)
+
+사용법 (intersection-backend 폴더에서):
+    python -m app.maintenance import-users alumni.csv
+    cat alumni.ndjson | python -m app.maintenance import-users - --format ndjson
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from .auth import get_password_hash
+from .models import User, get_kst_now
+from .schemas import UserCreate
+from .services import resolve_communities
+
+DEFAULT_BATCH_SIZE = 1000
+# 보고서에 남길 오류 행 최대 개수
+MAX_REPORTED_ERRORS = 100
+
+USER_COLUMNS = (
+    "login_id", "password_hash", "email", "name", "nickname", "birth_year", "gender", "region",
+    "school_name", "school_type", "admission_year", "profile_image", "background_image",
+    "community_id", "created_at",
+)
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped_existing: int = 0  # 이미 가입된 login_id 또는 파일 안의 중복
+    invalid: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)  # (행 번호, 오류)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line: int, message: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def read_rows(stream: TextIO, format: str) -> Iterator[tuple[int, dict]]:
+    """스트림 → (행 번호, dict). CSV의 빈 칸은 값 없음(None), 읽을 수 없는 JSON 행은 None"""
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: (value if value != "" else None) for key, value in row.items()}
+    elif format == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+    else:
+        raise ValueError(f"unknown format: {format}")
+
+
+def _batches(rows: Iterable[tuple[int, dict]], batch_size: int, report: ImportReport) -> Iterator[list[tuple[int, UserCreate]]]:
+    batch = []
+    for line_number, row in rows:
+        if row is None:
+            report.add_error(line_number, "invalid JSON")
+            continue
+        try:
+            batch.append((line_number, UserCreate.model_validate(row)))
+        except ValidationError as exc:
+            report.add_error(line_number, str(exc.errors()[0].get("msg")))
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_users(session: Session, rows: list[dict]):
+    """PostgreSQL COPY로 사용자 행 저장 (세션과 같은 트랜잭션)"""
+    connection = session.connection().connection.driver_connection
+    columns = ", ".join(USER_COLUMNS)
+    with connection.cursor() as cursor:
+        with cursor.copy(f'COPY "user" ({columns}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(tuple(row[column] for column in USER_COLUMNS))
+
+
+def _new_users(session: Session, batch: list[tuple[int, UserCreate]], report: ImportReport, seen: set[str]) -> list[UserCreate]:
+    """이미 가입된 login_id / 파일 안의 중복을 뺀 사용자 (해시 계산 전에 걸러냄)"""
+    login_ids = [user.login_id for _, user in batch]
+    existing = set(session.exec(select(User.login_id).where(User.login_id.in_(login_ids))).all())
+    users = []
+    for _, user in batch:
+        if user.login_id in existing or user.login_id in seen:
+            report.skipped_existing += 1
+            continue
+        seen.add(user.login_id)
+        users.append(user)
+    return users
+
+
+def _store_users(session: Session, users: list[UserCreate], password_hashes: list[str], report: ImportReport):
+    keys = {
+        (user.school_name, user.admission_year, user.region)
+        for user in users
+        if user.school_name and user.admission_year and user.region
+    }
+    community_ids = resolve_communities(session, keys) if keys else {}
+
+    created_at = get_kst_now()
+    rows = []
+    for user, password_hash in zip(users, password_hashes):
+        row = user.model_dump(exclude={"password"})
+        row.update(
+            password_hash=password_hash,
+            email=user.login_id,
+            community_id=community_ids.get((user.school_name, user.admission_year, user.region)),
+            created_at=created_at,
+        )
+        rows.append(row)
+
+    if session.get_bind().dialect.name == "postgresql":
+        _copy_users(session, rows)
+    else:
+        session.execute(insert(User), rows)
+    session.commit()
+    report.imported += len(rows)
+
+
+def import_users(
+    session: Session,
+    rows: Iterable[tuple[int, dict]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    executor: Optional[Executor] = None,
+) -> ImportReport:
+    """
+    사용자를 배치 단위로 가입시키고 결과 집계를 반환합니다.
+    비밀번호 해시는 executor(없으면 workers개 프로세스 풀)에서 계산하고,
+    배치마다 progress(report)를 호출합니다.
+    """
+    report = ImportReport()
+    seen: set[str] = set()
+    started = time.perf_counter()
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        for batch in _batches(rows, batch_size, report):
+            users = _new_users(session, batch, report, seen)
+            if users:
+                passwords = [user.password for user in users]
+                chunksize = max(1, len(passwords) // ((workers or os.cpu_count() or 1) * 4))
+                password_hashes = list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+                _store_users(session, users, password_hashes, report)
+            report.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def print_progress(report: ImportReport):
+    print(
+        f"[import] {report.imported} imported, {report.skipped_existing} skipped, {report.invalid} invalid "
+        f"({report.elapsed:.1f}s, {report.rate:,.0f} users/s)"
+    )
@@ -0,0 +1,123 @@
+"""
+채팅 WebSocket 부하 벤치마크: 동시 전송자 N명일 때 이벤트 루프 지연(lag) 측정
+
+서버(uvicorn)를 같은 프로세스에서 띄우고, 이벤트 루프에 5ms 주기 타이머를 걸어
+예정보다 얼마나 늦게 깨어나는지를 기록합니다. DB 작업이 루프를 막으면 이 값이 커집니다.
+
+사용법 (intersection-backend 폴더에서):
+    python -m benchmarks.chat_ws_loop_lag --senders 50 --messages 20
+    python -m benchmarks.chat_ws_loop_lag --senders 50 --messages 20 --inline   # 비교용: DB 작업을 루프에서 직접 실행
+
+DATABASE_URL 환경 변수의 DB를 사용합니다. (벤치마크용 사용자/채팅방이 생성됩니다)
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import uvicorn
+import websockets
+from sqlmodel import Session
+
+from app.auth import create_access_token
+from app.config import settings
+from app.db import engine, create_db_and_tables
+from app.main import app
+from app.models import ChatRoom, User
+from app.routers import chat as chat_router
+
+LAG_INTERVAL = 0.005
+
+
+def create_rooms(count: int) -> list[tuple[str, int]]:
+    """벤치마크용 사용자 쌍과 채팅방 생성 → [(token, room_id), ...]"""
+    create_db_and_tables()
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    result = []
+    with Session(engine) as session:
+        for i in range(count):
+            sender = User(login_id=f"{prefix}-{i}-a", name=f"{prefix}-{i}-a")
+            receiver = User(login_id=f"{prefix}-{i}-b", name=f"{prefix}-{i}-b")
+            session.add(sender)
+            session.add(receiver)
+            session.flush()
+            room = ChatRoom(user1_id=sender.id, user2_id=receiver.id)
+            session.add(room)
+            session.flush()
+            result.append((create_access_token({"user_id": sender.id}), room.id))
+        session.commit()
+    return result
+
+
+async def measure_lag(samples: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+async def sender(port: int, token: str, room_id: int, messages: int, latencies: list[float]):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/chat/ws/{room_id}?token={token}") as ws:
+        for i in range(messages):
+            start = time.perf_counter()
+            await ws.send(f'{{"content": "bench message {i}"}}')
+            await ws.recv()
+            latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(args):
+    if args.inline:
+        async def run_inline(func, *func_args, **kwargs):
+            return func(*func_args, **kwargs)
+        chat_router.run_db = run_inline
+
+    rooms = create_rooms(args.senders)
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    lag_samples: list[float] = []
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(lag_samples, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        sender(args.port, token, room_id, args.messages, latencies) for token, room_id in rooms
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+    server.should_exit = True
+    await server_task
+
+    total = args.senders * args.messages
+    mode = "inline (DB on event loop)" if args.inline else f"executor ({chat_router.run_db.__module__}.run_db)"
+    print(f"mode:            {mode}, CHAT_WRITE_MODE={settings.CHAT_WRITE_MODE}")
+    print(f"senders:         {args.senders}  messages/sender: {args.messages}")
+    print(f"throughput:      {total / elapsed:,.0f} msg/s ({total} msgs in {elapsed:.2f}s)")
+    print(f"send->ack p50:   {statistics.median(latencies) * 1000:.1f} ms  p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"loop lag p50:    {statistics.median(lag_samples) * 1000:.2f} ms  "
+          f"p99: {percentile(lag_samples, 0.99) * 1000:.2f} ms  max: {max(lag_samples) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.chat_ws_loop_lag")
+    parser.add_argument("--senders", type=int, default=50, help="동시 전송자 수")
+    parser.add_argument("--messages", type=int, default=20, help="전송자당 메시지 수")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--inline", action="store_true", help="DB 작업을 이벤트 루프에서 직접 실행 (비교용)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+로그인 처리량 벤치마크: 동시 로그인 N개가 몰릴 때 /token 처리량과 다른 API 지연 측정
+
+서버(uvicorn)를 같은 프로세스에서 띄우고, --clients 개의 클라이언트가 --seconds 동안 /token 을 반복 호출합니다.
+그동안 별도 클라이언트 하나가 가벼운 API(GET /users/me)를 계속 호출해 지연을 기록합니다.
+argon2 계산이 요청 스레드/이벤트 루프를 막으면 이 값이 커집니다.
+
+사용법 (intersection-backend 폴더에서):
+    python -m benchmarks.login_throughput --clients 32 --seconds 10
+    python -m benchmarks.login_throughput --clients 32 --seconds 10 --inline   # 비교용: 해시 풀 없이 직접 계산
+
+DATABASE_URL 환경 변수의 DB를 사용합니다. (벤치마크용 사용자가 생성됩니다)
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+import uvicorn
+from sqlmodel import Session
+
+from app.auth import create_access_token, get_password_hash
+from app.db import engine, create_db_and_tables
+from app.main import app
+from app.models import User
+from app.password_hasher import password_hasher
+
+PASSWORD = "bench-password"
+
+
+def create_users(count: int) -> tuple[list[str], str]:
+    """벤치마크용 사용자 생성 → (login_id 목록, 조회용 토큰)"""
+    create_db_and_tables()
+    prefix = f"bench-login-{uuid.uuid4().hex[:8]}"
+    password_hash = get_password_hash(PASSWORD)
+    with Session(engine) as session:
+        users = [User(login_id=f"{prefix}-{i}", name=f"{prefix}-{i}", password_hash=password_hash) for i in range(count)]
+        session.add_all(users)
+        session.commit()
+        token = create_access_token({"user_id": users[0].id})
+        login_ids = [user.login_id for user in users]
+    return login_ids, token
+
+
+async def login_client(client: httpx.AsyncClient, login_id: str, deadline: float, latencies: list[float], statuses: dict):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/token", json={"email": login_id, "password": PASSWORD})
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def probe_client(client: httpx.AsyncClient, token: str, deadline: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(args):
+    if args.inline:
+        password_hasher.workers = 0
+    login_ids, token = create_users(args.clients)
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # 프로세스 풀 시작 (측정에서 제외)
+        await client.post("/token", json={"email": login_ids[0], "password": PASSWORD})
+
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        await asyncio.gather(
+            probe_client(client, token, deadline, probe_latencies),
+            *(login_client(client, login_id, deadline, login_latencies, statuses) for login_id in login_ids),
+        )
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/health/auth")).json()["password_hasher"]
+
+    server.should_exit = True
+    await server_task
+    password_hasher.shutdown()
+
+    mode = "inline (argon2 in request handler)" if args.inline else f"process pool ({password_hasher.workers} workers)"
+    print(f"mode:            {mode}")
+    print(f"clients:         {args.clients}  duration: {elapsed:.1f}s  status: {statuses}")
+    print(f"logins:          {statuses.get(200, 0) / elapsed:,.1f}/s  "
+          f"p50: {statistics.median(login_latencies) * 1000:.0f} ms  p99: {percentile(login_latencies, 0.99) * 1000:.0f} ms")
+    print(f"GET /users/me:   p50: {statistics.median(probe_latencies) * 1000:.1f} ms  "
+          f"p99: {percentile(probe_latencies, 0.99) * 1000:.1f} ms  max: {max(probe_latencies) * 1000:.1f} ms  "
+          f"({len(probe_latencies)} requests)")
+    print(f"hasher:          max pending {health['max_pending']}  rejected {health['rejected']}  avg {health['avg_ms']:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.login_throughput")
+    parser.add_argument("--clients", type=int, default=32, help="동시 로그인 클라이언트 수")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--inline", action="store_true", help="비밀번호 해시 풀 없이 요청 처리 중에 직접 계산 (비교용)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+추천 친구 배치 계산 벤치마크: 합성 데이터(기본 100만 명)로 점수 계산 처리량 측정
+
+DB 없이 app.recommendations.compute_recommendations 만 실행합니다. (로드/저장 시간 제외)
+- 커뮤니티: 평균 --community-size 명
+- 친구: 사용자당 평균 --friends 명 (70%는 같은 커뮤니티, 30%는 무작위)
+- 차단: 사용자당 평균 0.1명
+
+사용법 (intersection-backend 폴더에서):
+    python -m benchmarks.recommend_batch --users 1000000 --top-k 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.recommendations import DEFAULT_BLOCK_SIZE, RecommendationInput, compute_recommendations
+
+
+def synthetic_input(users: int, community_size: int, friends: int, seed: int = 0) -> RecommendationInput:
+    rng = np.random.default_rng(seed)
+    communities = max(1, users // community_size)
+    community = rng.integers(0, communities, users)
+    birth_year = rng.integers(1960, 2006, users).astype(np.float64)
+
+    # 같은 커뮤니티 친구: 커뮤니티별로 정렬한 뒤 가까운 위치의 사용자와 연결
+    by_community = np.argsort(community, kind="stable")
+    local = int(friends * 0.7)
+    src = np.repeat(by_community, local)
+    offsets = rng.integers(1, community_size, len(src))
+    dst = by_community[(np.repeat(np.arange(users), local) + offsets) % users]
+    # 무작위 친구
+    random_src = rng.integers(0, users, users * (friends - local))
+    random_dst = rng.integers(0, users, len(random_src))
+    friend_pairs = np.stack([np.concatenate([src, random_src]), np.concatenate([dst, random_dst])], axis=1)
+    friend_pairs = friend_pairs[friend_pairs[:, 0] != friend_pairs[:, 1]]
+
+    block_pairs = rng.integers(0, users, (users // 10, 2))
+    block_pairs = block_pairs[block_pairs[:, 0] != block_pairs[:, 1]]
+
+    return RecommendationInput(
+        user_ids=np.arange(1, users + 1, dtype=np.int64),
+        community=community,
+        birth_year=birth_year,
+        friend_pairs=friend_pairs,
+        block_pairs=block_pairs,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.recommend_batch")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--community-size", type=int, default=200, help="평균 커뮤니티 인원")
+    parser.add_argument("--friends", type=int, default=20, help="사용자당 평균 친구 수")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = synthetic_input(args.users, args.community_size, args.friends)
+    generated = time.perf_counter()
+
+    rows = 0
+    users_with_results = 0
+    for block in compute_recommendations(data, top_k=args.top_k, block_size=args.block_size):
+        rows += len(block.user_index)
+        users_with_results += len(np.unique(block.user_index))
+    elapsed = time.perf_counter() - generated
+
+    print(f"users:           {args.users:,}  friendships: {len(data.friend_pairs):,}  blocks: {len(data.block_pairs):,}")
+    print(f"generate:        {generated - start:.2f}s")
+    print(f"compute:         {elapsed:.2f}s  ({args.users / elapsed:,.0f} users/s)")
+    print(f"output rows:     {rows:,} (top-{args.top_k}, {users_with_results:,} users with recommendations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+사용자 대량 가입 벤치마크: 합성 NDJSON N행을 app.user_import 로 가입시키며 처리량(users/s) 측정
+
+--workers 에 준 프로세스 수마다 새 login_id 접두어로 한 번씩 실행합니다.
+--baseline 을 주면 비교용으로 POST /users/ 와 같은 방식(한 명씩 해시 + 커밋)도 측정합니다.
+
+사용법 (intersection-backend 폴더에서):
+    python -m benchmarks.user_import --users 5000 --workers 1 4 8 --baseline 200
+
+DATABASE_URL 환경 변수의 DB를 사용합니다. (벤치마크용 사용자/커뮤니티가 생성됩니다)
+"""
+import argparse
+import io
+import json
+import random
+import time
+import uuid
+
+from sqlmodel import Session
+
+from app.auth import get_password_hash
+from app.db import engine, create_db_and_tables
+from app.models import User
+from app.services import assign_community
+from app.user_import import import_users, read_rows
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산"]
+
+
+def synthetic_ndjson(users: int, prefix: str, schools: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(users):
+        lines.append(json.dumps({
+            "login_id": f"{prefix}-{i}",
+            "password": f"pw-{prefix}-{i}",
+            "name": f"동문{i}",
+            "birth_year": rng.randint(1980, 2005),
+            "region": rng.choice(REGIONS),
+            "school_name": f"벤치고등학교{rng.randrange(schools)}",
+            "school_type": "high",
+            "admission_year": rng.randint(1995, 2020),
+        }, ensure_ascii=False))
+    return "\n".join(lines)
+
+
+def run_baseline(rows: list[dict]) -> float:
+    """한 명씩 해시 → 커뮤니티 배정 → 커밋 (POST /users/ 와 같은 경로)"""
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for row in rows:
+            user = User(
+                login_id=row["login_id"],
+                name=row["name"],
+                birth_year=row["birth_year"],
+                region=row["region"],
+                school_name=row["school_name"],
+                school_type=row["school_type"],
+                admission_year=row["admission_year"],
+                email=row["login_id"],
+            )
+            user.password_hash = get_password_hash(row["password"])
+            assign_community(session, user)
+            session.add(user)
+            session.commit()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.user_import")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--schools", type=int, default=20, help="학교 수 (커뮤니티 수 ≈ 학교 × 입학년도 × 지역)")
+    parser.add_argument("--baseline", type=int, default=0, help="비교용 한 명씩 가입 인원 (0이면 생략)")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    run_id = uuid.uuid4().hex[:8]
+    print(f"users: {args.users:,}  batch size: {args.batch_size}  engine: {engine.dialect.name}")
+
+    if args.baseline:
+        text = synthetic_ndjson(args.baseline, f"bench-{run_id}-base", args.schools)
+        elapsed = run_baseline([json.loads(line) for line in text.splitlines()])
+        print(f"one-by-one:      {args.baseline:,} users in {elapsed:.2f}s  ({args.baseline / elapsed:,.0f} users/s)")
+
+    for workers in args.workers:
+        text = synthetic_ndjson(args.users, f"bench-{run_id}-w{workers}", args.schools)
+        with Session(engine) as session:
+            report = import_users(
+                session,
+                read_rows(io.StringIO(text), "ndjson"),
+                batch_size=args.batch_size,
+                workers=workers,
+            )
+        print(
+            f"import x{workers:<3}     {report.imported:,} users in {report.elapsed:.2f}s  "
+            f"({report.rate:,.0f} users/s, {report.invalid} invalid)"
+        )
+
+
+if __name__ == "__main__":
+    main()
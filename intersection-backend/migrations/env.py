@@ -0,0 +1,53 @@
+"""
+Alembic 실행 환경
+
+- DB 주소: app.config 의 DATABASE_URL (alembic.ini 에는 두지 않음)
+- 비교 대상 스키마: app.models 의 SQLModel.metadata (--autogenerate)
+- 서버 시작 시(app.db.create_db_and_tables)에는 statement_timeout 없는 마이그레이션 전용 연결을 config.attributes["connection"] 으로 넘겨받음
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlmodel import SQLModel, create_engine
+
+from app import models  # noqa: F401  (테이블을 metadata 에 등록)
+from app.config import settings
+
+config = context.config
+target_metadata = SQLModel.metadata
+
+# alembic 명령으로 실행할 때만 alembic.ini 의 로그 설정 사용 (서버 로그 설정은 건드리지 않음)
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite는 ALTER TABLE 지원이 제한적이라 테이블 복사 방식(batch)으로 변경
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    # alembic upgrade head --sql : 실행할 SQL만 출력 (DBA 검토용)
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    run_migrations(config.attributes["connection"])
+else:
+    with create_engine(settings.DATABASE_URL).connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # 인덱스 생성/백필이 DB/역할 기본 statement_timeout 에 끊기지 않게
+            connection.exec_driver_sql("SET statement_timeout = 0")
+            connection.commit()
+        run_migrations(connection)
@@ -0,0 +1,143 @@
+"""baseline: 마이그레이션 도입 전, 처음 배포된 모델의 테이블 (create_all 로 만들어진 그대로)
+
+이후 추가된 컬럼/테이블/unique 제약은 0002_schema_additions, 조회용 인덱스는 0003_query_indexes 에서 만듭니다.
+마이그레이션 도입 전 create_all 로 만든 DB는 이 리비전으로 표시(stamp)된 뒤 0002 부터 적용됩니다. (app.db.create_db_and_tables)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _created_at():
+    return sa.Column("created_at", sa.DateTime(timezone=True), nullable=False)
+
+
+def upgrade():
+    op.create_table(
+        "community",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("school_name", sa.String(), nullable=False),
+        sa.Column("admission_year", sa.Integer(), nullable=False),
+        sa.Column("region", sa.String(), nullable=False),
+        _created_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("login_id", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("nickname", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("birth_year", sa.Integer(), nullable=True),
+        sa.Column("gender", sa.String(), nullable=True),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("school_name", sa.String(), nullable=True),
+        sa.Column("school_type", sa.String(), nullable=True),
+        sa.Column("admission_year", sa.Integer(), nullable=True),
+        sa.Column("profile_image", sa.String(), nullable=True),
+        sa.Column("background_image", sa.String(), nullable=True),
+        sa.Column("community_id", sa.Integer(), nullable=True),
+        _created_at(),
+        sa.ForeignKeyConstraint(["community_id"], ["community.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_login_id", "user", ["login_id"], unique=True)
+    op.create_table(
+        "post",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("image_url", sa.String(), nullable=True),
+        _created_at(),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["author_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "comment",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        _created_at(),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "userfriendship",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("friend_user_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        _created_at(),
+        sa.ForeignKeyConstraint(["friend_user_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "chatroom",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user1_id", sa.Integer(), nullable=False),
+        sa.Column("user2_id", sa.Integer(), nullable=False),
+        _created_at(),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user1_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["user2_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "chatmessage",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("sender_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("is_read", sa.Boolean(), nullable=False),
+        _created_at(),
+        sa.ForeignKeyConstraint(["room_id"], ["chatroom.id"]),
+        sa.ForeignKeyConstraint(["sender_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "userblock",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("blocked_user_id", sa.Integer(), nullable=False),
+        _created_at(),
+        sa.ForeignKeyConstraint(["blocked_user_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "userreport",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("reporter_id", sa.Integer(), nullable=False),
+        sa.Column("reported_user_id", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("content", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        _created_at(),
+        sa.ForeignKeyConstraint(["reported_user_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["reporter_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    for table in (
+        "userreport", "userblock", "chatmessage", "chatroom",
+        "userfriendship", "comment", "post", "user", "community",
+    ):
+        op.drop_table(table)
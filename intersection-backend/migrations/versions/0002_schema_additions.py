@@ -0,0 +1,238 @@
+"""schema additions: baseline 이후 모델에 추가된 컬럼 / 테이블 / unique 제약
+
+- chatroom: 채팅방 목록 비정규화 필드 (last_message_id, last_message_preview, user1/2_unread_count)
+  + 읽음 워터마크 (user1/2_last_read_message_id) → 메시지 테이블 기준으로 채움
+- post: community_id (커뮤니티별 피드, 작성자의 커뮤니티로 채움), comment_count (댓글 수로 채움)
+- recommendationsnapshot: 미리 계산한 추천 친구 (python -m app.maintenance build-recommendations 로 채움)
+- uploadedfile: 내용 주소 기반 업로드 메타데이터 (+ 이미지 변형 variants)
+- userfriendship (user_id, friend_user_id), community (school_name, admission_year, region) unique 제약
+  → 제약을 만들기 전에 중복 행을 정리 (maintenance dedupe-friendships / dedupe-communities 와 같은 처리)
+
+마이그레이션 도입 전 create_all 로 만든 DB는 어느 시점의 모델로 만들었는지에 따라 일부가 이미 있을 수 있으므로
+없는 것만 만들고, 새로 만든 컬럼만 채웁니다.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# app.services.CHAT_PREVIEW_LENGTH (마이그레이션은 앱 코드가 바뀌어도 같은 결과를 내도록 값을 고정)
+CHAT_PREVIEW_LENGTH = 100
+
+CHATROOM_COLUMNS = [
+    "last_message_id", "last_message_preview", "user1_unread_count", "user2_unread_count",
+    "user1_last_read_message_id", "user2_last_read_message_id",
+]
+# (이름, 테이블, 컬럼)
+UNIQUE_CONSTRAINTS = [
+    ("uq_userfriendship_user_id_friend_user_id", "userfriendship", ["user_id", "friend_user_id"]),
+    ("uq_community_school_name_admission_year_region", "community", ["school_name", "admission_year", "region"]),
+]
+
+user = sa.table("user", sa.column("id"), sa.column("community_id"))
+community = sa.table(
+    "community", sa.column("id"), sa.column("school_name"), sa.column("admission_year"), sa.column("region"),
+)
+post = sa.table("post", sa.column("id"), sa.column("author_id"), sa.column("community_id"), sa.column("comment_count"))
+comment = sa.table("comment", sa.column("post_id"))
+friendship = sa.table("userfriendship", sa.column("id"), sa.column("user_id"), sa.column("friend_user_id"))
+chatroom = sa.table(
+    "chatroom",
+    sa.column("id"), sa.column("user1_id"), sa.column("user2_id"),
+    sa.column("last_message_id"), sa.column("last_message_preview"),
+    sa.column("user1_unread_count"), sa.column("user2_unread_count"),
+    sa.column("user1_last_read_message_id"), sa.column("user2_last_read_message_id"),
+)
+chatmessage = sa.table(
+    "chatmessage", sa.column("id"), sa.column("room_id"), sa.column("sender_id"), sa.column("content"), sa.column("is_read"),
+)
+
+
+def _existing_schema():
+    """{테이블: 컬럼 이름 집합}, {테이블: unique 컬럼 묶음 집합} (--sql 오프라인 모드는 baseline 그대로라고 봄)"""
+    if context.is_offline_mode():
+        return {}, {}
+    inspector = sa.inspect(op.get_bind())
+    columns, uniques = {}, {}
+    for table in inspector.get_table_names():
+        columns[table] = {column["name"] for column in inspector.get_columns(table)}
+        uniques[table] = {tuple(sorted(constraint["column_names"])) for constraint in inspector.get_unique_constraints(table)}
+        uniques[table] |= {
+            tuple(sorted(index["column_names"])) for index in inspector.get_indexes(table) if index.get("unique")
+        }
+    return columns, uniques
+
+
+def _chatroom_columns() -> list:
+    return [
+        sa.Column("last_message_id", sa.Integer(), nullable=True),
+        sa.Column("last_message_preview", sa.String(), nullable=True),
+        sa.Column("user1_unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("user2_unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("user1_last_read_message_id", sa.Integer(), nullable=True),
+        sa.Column("user2_last_read_message_id", sa.Integer(), nullable=True),
+    ]
+
+
+def _add_missing_columns(table: str, new_columns: list, existing: set) -> set:
+    """없는 컬럼만 추가 → 추가한 컬럼 이름"""
+    missing = [column for column in new_columns if column.name not in existing]
+    if missing:
+        with op.batch_alter_table(table) as batch:
+            for column in missing:
+                batch.add_column(column)
+    return {column.name for column in missing}
+
+
+def _dedupe_friendships():
+    """같은 (user_id, friend_user_id) 친구 관계는 가장 먼저 만든 행만 남김"""
+    first_ids = sa.select(sa.func.min(friendship.c.id)).group_by(friendship.c.user_id, friendship.c.friend_user_id)
+    op.execute(friendship.delete().where(friendship.c.id.not_in(first_ids)))
+
+
+def _dedupe_communities():
+    """같은 (학교, 입학년도, 지역) 커뮤니티는 가장 먼저 만든 것으로 사용자/게시글을 옮긴 뒤 나머지 삭제"""
+    assigned = community.alias("assigned")
+    same_key = community.alias("same_key")
+    for table in (user, post):
+        survivor = (
+            sa.select(sa.func.min(same_key.c.id))
+            .select_from(assigned.join(
+                same_key,
+                (same_key.c.school_name == assigned.c.school_name)
+                & (same_key.c.admission_year == assigned.c.admission_year)
+                & (same_key.c.region == assigned.c.region),
+            ))
+            .where(assigned.c.id == table.c.community_id)
+            .scalar_subquery()
+        )
+        op.execute(table.update().where(table.c.community_id.is_not(None)).values(community_id=survivor))
+    first_ids = sa.select(sa.func.min(community.c.id)).group_by(
+        community.c.school_name, community.c.admission_year, community.c.region,
+    )
+    op.execute(community.delete().where(community.c.id.not_in(first_ids)))
+
+
+def _fill_chatroom_summaries():
+    """마지막 메시지 / 읽음 워터마크(이전 버전의 is_read 기준) / 안 읽은 수 (maintenance rebuild-chat-rooms 와 같은 결과)"""
+    last_message_id = (
+        sa.select(sa.func.max(chatmessage.c.id)).where(chatmessage.c.room_id == chatroom.c.id).scalar_subquery()
+    )
+    op.execute(chatroom.update().values(last_message_id=last_message_id))
+    preview = (
+        sa.select(sa.func.substr(chatmessage.c.content, 1, CHAT_PREVIEW_LENGTH))
+        .where(chatmessage.c.id == chatroom.c.last_message_id)
+        .scalar_subquery()
+    )
+    op.execute(chatroom.update().where(chatroom.c.last_message_id.is_not(None)).values(last_message_preview=preview))
+
+    # user1이 읽은 것 = user2가 보낸 메시지 중 읽힌 것 (반대도 같음)
+    for reader, sender in (("user1", "user2_id"), ("user2", "user1_id")):
+        watermark_column = chatroom.c[f"{reader}_last_read_message_id"]
+        legacy_watermark = (
+            sa.select(sa.func.max(chatmessage.c.id))
+            .where(
+                chatmessage.c.room_id == chatroom.c.id,
+                chatmessage.c.sender_id == chatroom.c[sender],
+                chatmessage.c.is_read == sa.true(),
+            )
+            .scalar_subquery()
+        )
+        op.execute(chatroom.update().where(watermark_column.is_(None)).values({watermark_column.name: legacy_watermark}))
+        unread_count = (
+            sa.select(sa.func.count())
+            .select_from(chatmessage)
+            .where(
+                chatmessage.c.room_id == chatroom.c.id,
+                chatmessage.c.sender_id == chatroom.c[sender],
+                chatmessage.c.id > sa.func.coalesce(watermark_column, 0),
+            )
+            .scalar_subquery()
+        )
+        op.execute(chatroom.update().values({f"{reader}_unread_count": unread_count}))
+
+
+def upgrade():
+    columns, uniques = _existing_schema()
+
+    # 1. 컬럼 / 테이블
+    added_chatroom = _add_missing_columns("chatroom", _chatroom_columns(), columns.get("chatroom", set()))
+    added_post = _add_missing_columns("post", [
+        sa.Column("community_id", sa.Integer(), sa.ForeignKey("community.id", name="fk_post_community_id_community"), nullable=True),
+        sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"),
+    ], columns.get("post", set()))
+
+    if "recommendationsnapshot" not in columns:
+        op.create_table(
+            "recommendationsnapshot",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("recommended_user_id", sa.Integer(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+            sa.Column("rank", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(["recommended_user_id"], ["user.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "uploadedfile" not in columns:
+        op.create_table(
+            "uploadedfile",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("sha256", sa.String(), nullable=False),
+            sa.Column("path", sa.String(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=True),
+            sa.Column("upload_count", sa.Integer(), nullable=False),
+            sa.Column("variants", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("last_uploaded_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_uploadedfile_sha256", "uploadedfile", ["sha256"], unique=True)
+    else:
+        # 이미지 변형 도입 전에 만든 업로드 테이블
+        _add_missing_columns("uploadedfile", [sa.Column("variants", sa.String(), nullable=True)], columns["uploadedfile"])
+
+    # 2. 중복 정리 → unique 제약 (중복이 남아 있으면 제약 생성이 실패하므로 먼저 정리)
+    _dedupe_friendships()
+    _dedupe_communities()
+    for name, table, constraint_columns in UNIQUE_CONSTRAINTS:
+        if tuple(sorted(constraint_columns)) in uniques.get(table, set()):
+            continue
+        with op.batch_alter_table(table) as batch:
+            batch.create_unique_constraint(name, constraint_columns)
+
+    # 3. 새로 추가한 컬럼 채우기 (이미 있던 컬럼은 앱이 관리해 온 값을 그대로 둠)
+    if "community_id" in added_post:
+        author_community = sa.select(user.c.community_id).where(user.c.id == post.c.author_id).scalar_subquery()
+        op.execute(post.update().values(community_id=author_community))
+    if "comment_count" in added_post:
+        comment_count = (
+            sa.select(sa.func.count()).select_from(comment).where(comment.c.post_id == post.c.id).scalar_subquery()
+        )
+        op.execute(post.update().values(comment_count=comment_count))
+    if added_chatroom:
+        _fill_chatroom_summaries()
+
+
+def downgrade():
+    for name, table, _ in reversed(UNIQUE_CONSTRAINTS):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_constraint(name, type_="unique")
+    op.drop_index("ix_uploadedfile_sha256", table_name="uploadedfile")
+    op.drop_table("uploadedfile")
+    op.drop_table("recommendationsnapshot")
+    with op.batch_alter_table("post") as batch:
+        batch.drop_column("comment_count")
+        batch.drop_column("community_id")
+    with op.batch_alter_table("chatroom") as batch:
+        for name in reversed(CHATROOM_COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,57 @@
+"""query indexes: 라우터/서비스의 자주 쓰는 조회마다 인덱스 (app.index_audit 규칙 기준)
+
+- user: region / school_name / admission_year (추천 친구 후보), email (카카오 로그인 시 기존 계정 찾기)
+- post: (created_at, id) 전체 피드, (community_id, created_at, id) 커뮤니티 피드 keyset 페이지
+- comment: (post_id, created_at, id) 댓글 목록 / 게시글 삭제 시 댓글 삭제
+- userfriendship: (friend_user_id, user_id) 나를 친구로 추가한 사용자 (정방향은 unique 제약)
+- recommendationsnapshot: (user_id, rank) 미리 계산한 추천 목록
+- chatroom: (user1_id, user2_id) / (user2_id, user1_id) 두 사용자의 채팅방 찾기, 내 채팅방 목록 (OR 양쪽)
+- chatmessage: (room_id, id) 방별 메시지 커서 페이지 / 안 읽은 수
+- userblock: (user_id, blocked_user_id) 차단 목록 / 차단 여부 / 친구·추천에서 차단한 사용자 제외
+- userreport: (reporter_id, created_at) 내 신고 내역 / 특정 사용자 신고 여부
+- uploadedfile: path 응답의 이미지 변형 URL 조회 (원본 경로 → 변형)
+
+이전에 create_all 로 만든 DB에는 일부가 이미 있을 수 있어 IF NOT EXISTS 로 만듭니다.
+PostgreSQL에서는 쓰기를 막지 않도록 CONCURRENTLY 로 만듭니다. (실패하면 INVALID 인덱스가 남으므로 지우고 다시 실행)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_user_region", "user", ["region"]),
+    ("ix_user_school_name", "user", ["school_name"]),
+    ("ix_user_admission_year", "user", ["admission_year"]),
+    ("ix_user_email", "user", ["email"]),
+    ("ix_post_created_at_id", "post", ["created_at", "id"]),
+    ("ix_post_community_id_created_at_id", "post", ["community_id", "created_at", "id"]),
+    ("ix_comment_post_id_created_at_id", "comment", ["post_id", "created_at", "id"]),
+    ("ix_userfriendship_friend_user_id_user_id", "userfriendship", ["friend_user_id", "user_id"]),
+    ("ix_recommendationsnapshot_user_id_rank", "recommendationsnapshot", ["user_id", "rank"]),
+    ("ix_chatroom_user1_id_user2_id", "chatroom", ["user1_id", "user2_id"]),
+    ("ix_chatroom_user2_id_user1_id", "chatroom", ["user2_id", "user1_id"]),
+    ("ix_chatmessage_room_id_id", "chatmessage", ["room_id", "id"]),
+    ("ix_userblock_user_id_blocked_user_id", "userblock", ["user_id", "blocked_user_id"]),
+    ("ix_userreport_reporter_id_created_at", "userreport", ["reporter_id", "created_at"]),
+    ("ix_uploadedfile_path", "uploadedfile", ["path"]),
+]
+
+
+def upgrade():
+    # CONCURRENTLY 는 트랜잭션 밖에서만 실행 가능
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
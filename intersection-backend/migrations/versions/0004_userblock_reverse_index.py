@@ -0,0 +1,29 @@
+"""userblock reverse index: (blocked_user_id, user_id) 추천 친구에서 나를 차단한 사용자 제외
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY 는 트랜잭션 밖에서만 실행 가능
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_userblock_blocked_user_id_user_id", "userblock", ["blocked_user_id", "user_id"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_userblock_blocked_user_id_user_id", table_name="userblock",
+            if_exists=True, postgresql_concurrently=True,
+        )
@@ -26,6 +26,17 @@ class ChatMessage {
     );
   }
 
+  ChatMessage copyWith({bool? isRead}) {
+    return ChatMessage(
+      id: id,
+      roomId: roomId,
+      senderId: senderId,
+      content: content,
+      isRead: isRead ?? this.isRead,
+      createdAt: createdAt,
+    );
+  }
+
   Map<String, dynamic> toJson() {
     return {
       'id': id,
@@ -5,21 +5,40 @@ class Post {
   final List<String> mediaUrls;
   final DateTime createdAt;
 
+  // 서버가 함께 내려주는 작성자 요약 / 댓글 수 (작성자 조회 요청 불필요)
+  final String? authorName;
+  final String? authorSchool;
+  final String? authorRegion;
+  final String? authorProfileImage;
+  final int commentCount;
+
   const Post({
     required this.id,
     required this.authorId,
     required this.content,
     this.mediaUrls = const [],
     required this.createdAt,
+    this.authorName,
+    this.authorSchool,
+    this.authorRegion,
+    this.authorProfileImage,
+    this.commentCount = 0,
   });
 
   factory Post.fromJson(Map<String, dynamic> json) {
+    final author = json['author'] as Map<String, dynamic>?;
     return Post(
       id: json['id'] is int ? json['id'] : int.parse(json['id'].toString()),
       authorId: json['author_id'] is int ? json['author_id'] : int.parse(json['author_id'].toString()),
       content: json['content'] ?? '',
       mediaUrls: json['media_urls'] != null ? List<String>.from(json['media_urls']) : [],
       createdAt: json['created_at'] != null ? DateTime.tryParse(json['created_at']) ?? DateTime.now() : DateTime.now(),
+      authorName: author?['nickname'] ?? author?['name'],
+      authorSchool: author?['school_name'],
+      authorRegion: author?['region'],
+      // 아바타는 작은 썸네일(WebP)이 있으면 그걸로 (원본 다운로드/디코딩 방지)
+      authorProfileImage: author?['profile_image_variants']?['thumb'] ?? author?['profile_image'],
+      commentCount: json['comment_count'] ?? 0,
     );
   }
 }
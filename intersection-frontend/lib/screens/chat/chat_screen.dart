@@ -33,6 +33,9 @@ class _ChatScreenState extends State<ChatScreen> {
   bool _theyBlockedMe = false;
   bool _iReportedThem = false;
   bool _showEmojiPicker = false;
+  bool _isLoadingOlder = false;
+  bool _hasMoreOlder = true;
+  int _lastMarkedReadId = 0;
   Timer? _pollingTimer;
 
   @override
@@ -41,9 +44,10 @@ class _ChatScreenState extends State<ChatScreen> {
     _checkBlockStatus();
     _checkReportStatus();
     _loadMessages();
-    // 3초마다 새 메시지 확인 (실시간처럼 동작)
+    _scrollController.addListener(_onScroll);
+    // 3초마다 새 메시지만 확인 (실시간처럼 동작)
     _pollingTimer = Timer.periodic(const Duration(seconds: 3), (timer) {
-      _loadMessages(showLoading: false);
+      _pollNewMessages();
     });
   }
 
@@ -99,6 +103,7 @@ class _ChatScreenState extends State<ChatScreen> {
           _isLoading = false;
         });
         _scrollToBottom();
+        _markAsRead();
       }
     } catch (e) {
       debugPrint("메시지 불러오기 오류: $e");
@@ -108,6 +113,86 @@ class _ChatScreenState extends State<ChatScreen> {
     }
   }
 
+  /// 마지막으로 받은 메시지 이후의 새 메시지만 가져오기
+  Future<void> _pollNewMessages() async {
+    if (_isLoading) return;
+
+    try {
+      final afterId = _messages.isEmpty ? null : _messages.last.id;
+      final messages = await ApiService.getChatMessages(
+        widget.roomId,
+        afterId: afterId,
+      );
+      final knownIds = _messages.map((m) => m.id).toSet();
+      final newMessages =
+          messages.where((m) => !knownIds.contains(m.id)).toList();
+      if (mounted && newMessages.isNotEmpty) {
+        setState(() => _messages.addAll(newMessages));
+        _scrollToBottom();
+        _markAsRead();
+      }
+    } catch (e) {
+      debugPrint("새 메시지 확인 오류: $e");
+    }
+  }
+
+  /// 화면에 보이는 상대방 메시지까지 읽음 처리하고, 내 메시지의 읽음 표시 갱신
+  Future<void> _markAsRead() async {
+    final myId = AppState.currentUser?.id;
+    final friendMessages = _messages.where((m) => m.senderId != myId);
+    if (friendMessages.isEmpty) return;
+    final upToId = friendMessages.last.id;
+    if (upToId <= _lastMarkedReadId) return;
+    _lastMarkedReadId = upToId;
+
+    try {
+      final receipt = await ApiService.markChatRead(widget.roomId, upToId);
+      final friendLastRead = receipt['friend_last_read_message_id'] as int?;
+      if (mounted && friendLastRead != null) {
+        setState(() {
+          _messages = _messages
+              .map((m) => m.senderId == myId && !m.isRead && m.id <= friendLastRead
+                  ? m.copyWith(isRead: true)
+                  : m)
+              .toList();
+        });
+      }
+    } catch (e) {
+      debugPrint("읽음 처리 오류: $e");
+    }
+  }
+
+  /// 위로 스크롤하면 이전 메시지 페이지 가져오기
+  Future<void> _loadOlderMessages() async {
+    if (_isLoadingOlder || !_hasMoreOlder || _messages.isEmpty) return;
+    _isLoadingOlder = true;
+
+    try {
+      final older = await ApiService.getChatMessages(
+        widget.roomId,
+        beforeId: _messages.first.id,
+      );
+      if (mounted) {
+        setState(() {
+          _hasMoreOlder = older.isNotEmpty;
+          _messages.insertAll(0, older);
+        });
+      }
+    } catch (e) {
+      debugPrint("이전 메시지 불러오기 오류: $e");
+    } finally {
+      _isLoadingOlder = false;
+    }
+  }
+
+  void _onScroll() {
+    if (_scrollController.hasClients &&
+        _scrollController.position.pixels <=
+            _scrollController.position.minScrollExtent + 50) {
+      _loadOlderMessages();
+    }
+  }
+
   Future<void> _sendMessage() async {
     if (_isBlocked || _iReportedThem) {
       _showBlockedDialog();
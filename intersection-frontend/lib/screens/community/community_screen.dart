@@ -125,7 +125,7 @@ class _ThreadPost extends StatelessWidget {
               Row(
                 children: [
                   Text(
-                    author?.name ?? "알 수 없음",
+                    author?.name ?? post.authorName ?? "알 수 없음",
                     style: const TextStyle(
                       fontWeight: FontWeight.bold,
                       fontSize: 16,
@@ -135,7 +135,9 @@ class _ThreadPost extends StatelessWidget {
                   Text(
                     author != null
                         ? "${author!.school} · ${author!.region}"
-                        : "",
+                        : [post.authorSchool, post.authorRegion]
+                            .whereType<String>()
+                            .join(" · "),
                     style: const TextStyle(
                       fontSize: 12,
                       color: Colors.grey,
@@ -180,7 +182,7 @@ class _ThreadPost extends StatelessWidget {
                             size: 18, color: Colors.grey.shade700),
                         const SizedBox(width: 4),
                         Text(
-                          '댓글 보기',
+                          post.commentCount > 0 ? '댓글 ${post.commentCount}' : '댓글 보기',
                           style: TextStyle(
                             color: Colors.grey.shade700,
                             fontSize: 13,
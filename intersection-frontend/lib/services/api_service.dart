@@ -166,13 +166,30 @@ class ApiService {
     throw Exception("게시글 작성 실패: ${response.body}");
   }
 
-  static Future<List<Map<String, dynamic>>> listPosts() async {
-    final url = Uri.parse("${ApiConfig.baseUrl}/posts/");
+  static Future<List<Map<String, dynamic>>> listPosts({int? communityId, int limit = 100}) async {
+    return (await listPostsPage(communityId: communityId, limit: limit)).posts;
+  }
+
+  /// 게시물 목록 한 페이지 + 다음 페이지 커서 (마지막 페이지면 null)
+  static Future<({List<Map<String, dynamic>> posts, String? nextCursor})> listPostsPage({
+    int? communityId,
+    String? cursor,
+    int limit = 20,
+  }) async {
+    final query = <String, String>{
+      "limit": "$limit",
+      if (communityId != null) "community_id": "$communityId",
+      if (cursor != null) "cursor": cursor,
+    };
+    final url = Uri.parse("${ApiConfig.baseUrl}/posts/").replace(queryParameters: query);
     final response = await http.get(url, headers: _headers(json: false));
 
     if (response.statusCode == 200) {
       final list = jsonDecode(response.body) as List;
-      return List<Map<String, dynamic>>.from(list);
+      return (
+        posts: List<Map<String, dynamic>>.from(list),
+        nextCursor: response.headers["x-next-cursor"],
+      );
     }
 
     throw Exception("게시물 목록 불러오기 실패: ${response.body}");
@@ -190,12 +207,28 @@ class ApiService {
   }
 
   static Future<List<Map<String, dynamic>>> listComments(int postId) async {
-    final url = Uri.parse("${ApiConfig.baseUrl}/posts/$postId/comments");
+    return (await listCommentsPage(postId)).comments;
+  }
+
+  /// 댓글 한 페이지 (작성순) + 다음 페이지 커서 (마지막 페이지면 null)
+  static Future<({List<Map<String, dynamic>> comments, String? nextCursor})> listCommentsPage(
+    int postId, {
+    String? cursor,
+    int limit = 100,
+  }) async {
+    final query = <String, String>{
+      "limit": "$limit",
+      if (cursor != null) "cursor": cursor,
+    };
+    final url = Uri.parse("${ApiConfig.baseUrl}/posts/$postId/comments").replace(queryParameters: query);
     final response = await http.get(url, headers: _headers(json: false));
 
     if (response.statusCode == 200) {
       final list = jsonDecode(response.body) as List;
-      return List<Map<String, dynamic>>.from(list);
+      return (
+        comments: List<Map<String, dynamic>>.from(list),
+        nextCursor: response.headers["x-next-cursor"],
+      );
     }
 
     throw Exception("댓글 목록 불러오기 실패: ${response.body}");
@@ -205,17 +238,30 @@ class ApiService {
   // 6) 친구 목록 가져오기
   // ----------------------------------------------------
   static Future<List<User>> getFriends() async {
-    final url = Uri.parse("${ApiConfig.baseUrl}/friends/me");
+    // 서버는 페이지 단위(after_id)로 내려주므로 마지막 페이지까지 이어서 조회
+    const pageSize = 500;
+    final friends = <User>[];
+    int? afterId;
+
+    while (true) {
+      final url = Uri.parse("${ApiConfig.baseUrl}/friends/me").replace(
+        queryParameters: {
+          "limit": "$pageSize",
+          if (afterId != null) "after_id": "$afterId",
+        },
+      );
 
-    final response = await http.get(
-      url,
-      headers: _headers(json: false),
-    );
+      final response = await http.get(
+        url,
+        headers: _headers(json: false),
+      );
 
-    if (response.statusCode == 200) {
-      final list = jsonDecode(response.body) as List;
+      if (response.statusCode != 200) {
+        throw Exception("친구 목록 불러오기 실패: ${response.body}");
+      }
 
-      return list.map((data) {
+      final list = jsonDecode(response.body) as List;
+      friends.addAll(list.map((data) {
         return User(
           id: data["id"],
           name: data["name"],
@@ -223,9 +269,10 @@ class ApiService {
           region: data["region"],
           school: data["school_name"],
         );
-      }).toList();
-    } else {
-      throw Exception("친구 목록 불러오기 실패: ${response.body}");
+      }));
+
+      if (list.length < pageSize) return friends;
+      afterId = list.last["id"];
     }
   }
 
@@ -268,8 +315,19 @@ class ApiService {
   }
 
   /// 채팅방의 메시지 목록 가져오기
-  static Future<List<ChatMessage>> getChatMessages(int roomId) async {
-    final url = Uri.parse("${ApiConfig.baseUrl}/chat/rooms/$roomId/messages");
+  /// - afterId: 이 ID 이후의 새 메시지만 (폴링)
+  /// - beforeId: 이 ID 이전의 과거 메시지 (위로 스크롤)
+  static Future<List<ChatMessage>> getChatMessages(
+    int roomId, {
+    int? afterId,
+    int? beforeId,
+  }) async {
+    final query = <String, String>{
+      if (afterId != null) "after_id": "$afterId",
+      if (beforeId != null) "before_id": "$beforeId",
+    };
+    final url = Uri.parse("${ApiConfig.baseUrl}/chat/rooms/$roomId/messages")
+        .replace(queryParameters: query.isEmpty ? null : query);
 
     final response = await http.get(
       url,
@@ -284,6 +342,26 @@ class ApiService {
     }
   }
 
+  /// 메시지 읽음 처리 (upToMessageId까지)
+  static Future<Map<String, dynamic>> markChatRead(
+    int roomId,
+    int upToMessageId,
+  ) async {
+    final url = Uri.parse("${ApiConfig.baseUrl}/chat/rooms/$roomId/read");
+
+    final response = await http.post(
+      url,
+      headers: _headers(),
+      body: jsonEncode({"up_to_message_id": upToMessageId}),
+    );
+
+    if (response.statusCode == 200) {
+      return jsonDecode(response.body) as Map<String, dynamic>;
+    } else {
+      throw Exception("읽음 처리 실패: ${response.body}");
+    }
+  }
+
   /// 메시지 전송 (REST API 방식)
   static Future<ChatMessage> sendChatMessage(int roomId, String content) async {
     final url = Uri.parse("${ApiConfig.baseUrl}/chat/rooms/$roomId/messages");